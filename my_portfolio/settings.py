@@ -36,8 +36,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'portfolio.middleware.QueryInstrumentationMiddleware',
 ]
 
+# Expose X-Query-Count / Server-Timing headers (see portfolio.middleware)
+QUERY_STATS_HEADERS = config('QUERY_STATS_HEADERS', default=DEBUG, cast=bool)
+# Requests repeating more statements than this are logged as a WARNING (else DEBUG)
+QUERY_DUPLICATES_WARNING = config('QUERY_DUPLICATES_WARNING', default=3, cast=int)
+
 ROOT_URLCONF = 'my_portfolio.urls'
 
 TEMPLATES = [
@@ -50,6 +56,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'portfolio.context_processors.fragment_cache',
             ],
         },
     },
@@ -82,16 +89,52 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Serve the per-page bundles from `manage.py build_assets` (static/dist/)
+# when they exist; the individual source files otherwise.
+ASSET_BUNDLES = config('ASSET_BUNDLES', default=not DEBUG, cast=bool)
+
 # Enable WhiteNoise compression and caching
 STORAGES = {
+    # Content-hashed upload names, served as immutable by portfolio.media.serve.
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "BACKEND": "portfolio.media.HashedMediaStorage",
     },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
 }
 
+# Cache (page renders are versioned, see portfolio/cache.py).
+# Use a shared backend (file, Redis, Memcached) when running several workers
+# so that an admin edit invalidates every process at once. WEB_CONCURRENCY
+# (the worker count, as gunicorn reads it) above 1 with the per-process
+# default fails the system checks (see portfolio/checks.py).
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='portfolio'),
+    }
+}
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+# Per-project {% cache %} fragments (cards, detail sidebar and gallery)
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=60 * 60 * 24 * 7, cast=int)
+
+# Contact form token buckets, "<tokens>/<seconds to refill them all>", checked
+# in this order (see portfolio/ratelimit.py). They live in the cache above,
+# so it must be shared between workers for the limits to be too.
+CONTACT_RATE_LIMITS = {
+    'ip': config('CONTACT_RATE_LIMIT_IP', default='5/3600'),
+    'email': config('CONTACT_RATE_LIMIT_EMAIL', default='3/3600'),
+}
+# Set to e.g. X-Forwarded-For behind a reverse proxy that appends the client address.
+CLIENT_IP_HEADER = config('CLIENT_IP_HEADER', default='')
+
+# archive_messages moves contact messages older than this into compressed
+# segment files here (see portfolio/archive.py). Keep it out of MEDIA_ROOT.
+CONTACT_RETENTION_DAYS = config('CONTACT_RETENTION_DAYS', default=365, cast=int)
+CONTACT_ARCHIVE_DIR = config('CONTACT_ARCHIVE_DIR', default=str(BASE_DIR / 'archive' / 'contact'))
+
 # Media files (User uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
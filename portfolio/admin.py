@@ -1,8 +1,19 @@
+from datetime import datetime, time
+
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from . import archive, exports, ratelimit
+from .forms import ArchiveSearchForm
 from .models import (
     Profile, Skill, Education, Certification, Interest,
-    Project, ProjectImage, ProjectTag, CareerGoal, ContactMessage
+    Project, ProjectImage, ProjectTag, CareerGoal, ContactMessage, OutboxEmail
 )
+from .pagination import EstimatedCountPaginator
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
@@ -81,7 +92,110 @@ class CareerGoalAdmin(admin.ModelAdmin):
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'subject', 'created_at', 'read']
-    list_filter = ['read', 'created_at']
-    list_editable = ['read']
-    readonly_fields = ['name', 'email', 'subject', 'message', 'created_at']
\ No newline at end of file
+    list_display = ['name', 'email', 'subject', 'created_at', 'read', 'archived']
+    list_filter = ['read', 'archived', 'created_at']
+    readonly_fields = ['name', 'email', 'subject', 'message', 'created_at']
+    # The inbox can grow to millions of rows: no COUNT(*) per page load,
+    # and the actions below are one UPDATE (or one streamed query) each.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['mark_read', 'mark_unread', 'archive', 'export_csv', 'export_jsonl']
+    export_fields = ['id', 'created_at', 'name', 'email', 'subject', 'message', 'read', 'archived']
+    archive_search_limit = 100
+
+    def _update(self, request, queryset, done, **values):
+        updated = queryset.update(**values)
+        self.message_user(request, f'{updated} message(s) {done}.')
+
+    @admin.action(description='Mark selected messages as read', permissions=['change'])
+    def mark_read(self, request, queryset):
+        self._update(request, queryset, 'marked as read', read=True)
+
+    @admin.action(description='Mark selected messages as unread', permissions=['change'])
+    def mark_unread(self, request, queryset):
+        self._update(request, queryset, 'marked as unread', read=False)
+
+    @admin.action(description='Archive selected messages', permissions=['change'])
+    def archive(self, request, queryset):
+        self._update(request, queryset, 'archived', archived=True)
+
+    @admin.action(description='Export selected messages as CSV')
+    def export_csv(self, request, queryset):
+        return exports.streaming_export(request, queryset, self.export_fields, 'csv', 'contact-messages')
+
+    @admin.action(description='Export selected messages as JSON Lines')
+    def export_jsonl(self, request, queryset):
+        return exports.streaming_export(request, queryset, self.export_fields, 'jsonl', 'contact-messages')
+
+    def get_urls(self):
+        return [
+            path(
+                'rate-limits/', self.admin_site.admin_view(self.rate_limits_view),
+                name='portfolio_contactmessage_rate_limits',
+            ),
+            path(
+                'archive/', self.admin_site.admin_view(self.archive_view),
+                name='portfolio_contactmessage_archive',
+            ),
+        ] + super().get_urls()
+
+    def archive_view(self, request):
+        """Search the messages ``archive_messages`` moved out, through the segment index."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        form = ArchiveSearchForm(request.GET)
+        result = None
+        if form.is_valid():
+            since, until = form.cleaned_data['since'], form.cleaned_data['until']
+            result = archive.search(
+                form.cleaned_data['q'],
+                since=since and timezone.make_aware(datetime.combine(since, time.min)),
+                until=until and timezone.make_aware(datetime.combine(until, time.max)),
+                limit=self.archive_search_limit,
+            )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Archived messages',
+            'form': form,
+            'result': result,
+            'limit': self.archive_search_limit,
+        }
+        return TemplateResponse(request, 'admin/portfolio/contactmessage/archive.html', context)
+
+    def rate_limits_view(self, request):
+        """Per-key counters of the contact form's rate limiter, with a reset button."""
+        if request.method == 'POST':
+            if not self.has_change_permission(request):
+                raise PermissionDenied
+            ratelimit.reset(request.POST.get('cache_key', ''))
+            self.message_user(request, 'Bucket reset.')
+            return redirect('admin:portfolio_contactmessage_rate_limits')
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Contact form rate limits',
+            'buckets': ratelimit.contact_buckets().values(),
+            'rows': ratelimit.tracked_keys(),
+            'can_reset': self.has_change_permission(request),
+        }
+        return TemplateResponse(request, 'admin/portfolio/contactmessage/rate_limits.html', context)
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['to', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    readonly_fields = [
+        'contact_message', 'subject', 'body', 'from_email', 'to', 'attempts',
+        'last_error', 'created_at', 'sent_at',
+    ]
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='pending', attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) queued for retry.')
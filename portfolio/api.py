@@ -0,0 +1,201 @@
+"""
+Read-only JSON API (v1) for projects.
+
+``GET /api/v1/projects/``           list, filters ``category=`` and ``tag=``
+                                    (repeatable, all must match), ``fields=``,
+                                    ``limit=`` and the opaque ``cursor=``
+``GET /api/v1/projects/<slug>/``    one project, ``fields=``
+``GET /api/v1/search/?q=``          full-text search (see ``portfolio.search``)
+
+Each project is serialized once per ``updated_at`` and kept in the cache, so
+a warm list page costs one narrow query for the page of keys plus one
+``get_many`` against the cache, however large the table grows.
+"""
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from .models import Project
+from .pagination import InvalidCursor, keyset_page
+from .search import search_projects
+
+API_CACHE_PREFIX = 'portfolio:api:project'
+API_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Meta.ordering plus the primary key as the unique tie-breaker.
+PROJECT_ORDERING = ['order', '-created_at', '-id']
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+PROJECT_FIELDS = (
+    'id', 'slug', 'url', 'title', 'category', 'category_display', 'short_description',
+    'description', 'detailed_content_html', 'tech_stack', 'project_date', 'live_url',
+    'github_url', 'featured', 'order', 'thumbnail', 'tags', 'images', 'created_at', 'updated_at',
+)
+# The list leaves out the long-form fields unless they are asked for.
+LIST_FIELDS = tuple(f for f in PROJECT_FIELDS if f not in ('description', 'detailed_content_html', 'images'))
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _image(field_file, width, height, placeholder, color):
+    if not field_file:
+        return None
+    return {'url': field_file.url, 'width': width, 'height': height, 'placeholder': placeholder, 'color': color}
+
+
+def serialize_project(project):
+    """Full JSON-able representation; expects ``tags`` and ``images`` prefetched."""
+    return {
+        'id': project.pk,
+        'slug': project.slug,
+        'url': reverse('portfolio-details', args=[project.slug]),
+        'title': project.title,
+        'category': project.category,
+        'category_display': project.get_category_display(),
+        'short_description': project.short_description,
+        'description': project.description,
+        'detailed_content_html': project.detailed_content_html,
+        'tech_stack': [tech.strip() for tech in project.tech_stack.split(',') if tech.strip()],
+        'project_date': project.project_date,
+        'live_url': project.live_url or None,
+        'github_url': project.github_url or None,
+        'featured': project.featured,
+        'order': project.order,
+        'thumbnail': _image(
+            project.thumbnail, project.thumbnail_width, project.thumbnail_height,
+            project.thumbnail_placeholder, project.thumbnail_color,
+        ),
+        'tags': [tag.name for tag in project.tags.all()],
+        'images': [
+            _image(img.image, img.width, img.height, img.placeholder, img.dominant_color)
+            for img in project.images.all()
+        ],
+        'created_at': project.created_at.isoformat(),
+        'updated_at': project.updated_at.isoformat(),
+    }
+
+
+def project_cache_key(pk, updated_at):
+    return f'{API_CACHE_PREFIX}:{pk}:{updated_at.timestamp()}'
+
+
+def serialized_projects(keys):
+    """Return the payloads for ``[(pk, updated_at), ...]`` in that order.
+
+    Cache misses are loaded in one query (plus the two prefetches) and stored
+    under their version; an edited project simply gets a new key.
+    """
+    cache_keys = {pk: project_cache_key(pk, updated_at) for pk, updated_at in keys}
+    found = cache.get_many(cache_keys.values())
+    missing = [pk for pk, key in cache_keys.items() if key not in found]
+    if missing:
+        fresh = {}
+        for project in Project.objects.filter(pk__in=missing).prefetch_related('tags', 'images'):
+            # The row may have changed since the key was read; store it under its own version.
+            fresh[project_cache_key(project.pk, project.updated_at)] = payload = serialize_project(project)
+            found[cache_keys[project.pk]] = payload
+        cache.set_many(fresh, API_CACHE_TIMEOUT)
+    return [found[cache_keys[pk]] for pk, _updated_at in keys if cache_keys[pk] in found]
+
+
+def _fields(request, default):
+    """The ``fields=`` projection, or None (with an error response) if invalid."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return default, None
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = sorted(set(fields) - set(PROJECT_FIELDS))
+    if unknown:
+        return None, _error(f"Unknown field(s): {', '.join(unknown)}.")
+    return fields, None
+
+
+def _render(request, payload, fields):
+    data = {name: payload[name] for name in fields}
+    # Stored payloads hold paths; the API hands out absolute URLs.
+    if 'url' in data:
+        data['url'] = request.build_absolute_uri(data['url'])
+    if data.get('thumbnail'):
+        data['thumbnail'] = {**data['thumbnail'], 'url': request.build_absolute_uri(data['thumbnail']['url'])}
+    if data.get('images'):
+        data['images'] = [{**img, 'url': request.build_absolute_uri(img['url'])} for img in data['images']]
+    return data
+
+
+@require_GET
+def project_list(request):
+    fields, error = _fields(request, LIST_FIELDS)
+    if error:
+        return error
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return _error('limit must be an integer.')
+
+    projects = Project.objects.all()
+    if request.GET.get('category'):
+        projects = projects.filter(category=request.GET['category'])
+    for tag in request.GET.getlist('tag'):
+        projects = projects.filter(tags__name__iexact=tag)
+
+    try:
+        rows, next_cursor = keyset_page(
+            projects.values('id', 'updated_at', 'order', 'created_at').distinct(),
+            PROJECT_ORDERING, request.GET.get('cursor'), limit,
+        )
+    except InvalidCursor as e:
+        return _error(str(e))
+
+    payloads = serialized_projects([(row['id'], row['updated_at']) for row in rows])
+    next_url = None
+    if next_cursor:
+        query = request.GET.copy()
+        query['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    return JsonResponse({
+        'results': [_render(request, payload, fields) for payload in payloads],
+        'next': next_url,
+    })
+
+
+@require_GET
+def project_detail(request, slug):
+    fields, error = _fields(request, PROJECT_FIELDS)
+    if error:
+        return error
+    key = Project.objects.filter(slug=slug).values_list('id', 'updated_at').first()
+    if key is None:
+        return _error('Not found.', status=404)
+    payloads = serialized_projects([key])
+    if not payloads:
+        # Deleted between the two queries.
+        return _error('Not found.', status=404)
+    return JsonResponse(_render(request, payloads[0], fields))
+
+
+@require_GET
+def project_search(request):
+    """Ranked full-text matches with highlighted snippets (``<mark>``)."""
+    text = request.GET.get('q', '').strip()
+    if not text:
+        return _error('q is required.')
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return _error('limit must be an integer.')
+    return JsonResponse({'results': [
+        {
+            'id': project.pk,
+            'slug': project.slug,
+            'title': project.title,
+            'category': project.category,
+            'url': request.build_absolute_uri(reverse('portfolio-details', args=[project.slug])),
+            'rank': rank,
+            'snippet': snippet,
+        }
+        for project, rank, snippet in search_projects(text, limit)
+    ]})
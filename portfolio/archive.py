@@ -0,0 +1,181 @@
+"""
+Retention for ``ContactMessage``: old rows move to compressed segment files.
+
+``archive_messages`` (the management command) reads messages older than
+the retention age in ``(created_at, id)`` order, a batch at a time. Each
+batch becomes one block, a JSON Lines chunk compressed on its own (a zstd
+frame, or a gzip member without ``zstandard``), appended to the run's
+segment file under ``settings.CONTACT_ARCHIVE_DIR``. Then one line is
+appended to ``index.jsonl``: the block's segment, byte offset, length, row
+count and ``created_at`` range. Only then are the rows deleted, so a crash
+leaves at worst an unindexed tail that the next run archives again.
+
+Segments and the index are only ever appended to. A lookup by date reads
+the index, then decompresses just the blocks whose range overlaps it;
+``search`` also matches text inside those blocks (for the admin).
+"""
+import gzip
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+INDEX_NAME = 'index.jsonl'
+# A new segment is started past this many rows.
+SEGMENT_MAX_ROWS = 100_000
+ARCHIVED_FIELDS = ['id', 'created_at', 'name', 'email', 'subject', 'message', 'read', 'archived']
+SEARCH_FIELDS = ('name', 'email', 'subject', 'message')
+
+# format: file suffix
+FORMATS = {'zstd': '.jsonl.zst', 'gzip': '.jsonl.gz'}
+
+Block = namedtuple('Block', 'segment offset length rows first last')
+
+
+def default_format():
+    return 'zstd' if zstandard else 'gzip'
+
+
+def archive_dir():
+    return settings.CONTACT_ARCHIVE_DIR
+
+
+def compress(data, format):
+    if format == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd segments need the zstandard package; use gzip.')
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, 9, mtime=0)
+
+
+def decompress(data, format):
+    if format == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('Reading zstd segments needs the zstandard package.')
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def segment_format(segment):
+    return next(format for format, suffix in FORMATS.items() if segment.endswith(suffix))
+
+
+def _fsync_append(path, data):
+    """Append ``data`` to ``path``; returns the offset it starts at."""
+    with open(path, 'ab') as f:
+        offset = f.tell()
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+
+class SegmentWriter:
+    """Appends blocks to the segment files of one archiving run."""
+
+    def __init__(self, directory=None, format=None):
+        self.directory = str(directory or archive_dir())
+        self.format = format or default_format()
+        compress(b'', self.format)  # fail early without zstandard
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment = None
+        self.segment_rows = 0
+
+    def _new_segment(self):
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+        self.segment = f'contact-{stamp}{FORMATS[self.format]}'
+        self.segment_rows = 0
+
+    def write(self, rows):
+        """Archive ``rows`` (dicts of ``ARCHIVED_FIELDS``, oldest first) as one block."""
+        if self.segment is None or self.segment_rows >= SEGMENT_MAX_ROWS:
+            self._new_segment()
+        data = compress(
+            ''.join(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n' for row in rows).encode(),
+            self.format,
+        )
+        offset = _fsync_append(os.path.join(self.directory, self.segment), data)
+        block = Block(
+            self.segment, offset, len(data), len(rows),
+            rows[0]['created_at'].isoformat(), rows[-1]['created_at'].isoformat(),
+        )
+        # The rows count as archived once their block is in the index.
+        _fsync_append(os.path.join(self.directory, INDEX_NAME), (json.dumps(block._asdict()) + '\n').encode())
+        self.segment_rows += len(rows)
+        return block
+
+
+def read_index(directory=None):
+    """Every indexed ``Block``, oldest first."""
+    path = os.path.join(str(directory or archive_dir()), INDEX_NAME)
+    if not os.path.exists(path):
+        return []
+    blocks = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                blocks.append(Block(**json.loads(line)))
+    return blocks
+
+
+def read_block(block, directory=None):
+    """The archived messages of one block, as dicts with ``created_at`` parsed."""
+    with open(os.path.join(str(directory or archive_dir()), block.segment), 'rb') as f:
+        f.seek(block.offset)
+        data = decompress(f.read(block.length), segment_format(block.segment))
+    rows = []
+    for line in data.decode('utf-8').splitlines():
+        row = json.loads(line)
+        row['created_at'] = parse_datetime(row['created_at'])
+        rows.append(row)
+    return rows
+
+
+def _as_bound(value):
+    if isinstance(value, datetime):
+        return value
+    return parse_datetime(value) if value else None
+
+
+SearchResult = namedtuple('SearchResult', 'rows blocks_read truncated')
+
+
+def search(query='', since=None, until=None, limit=100, directory=None):
+    """Archived messages matching ``query``, created in ``[since, until]``, newest first.
+
+    Only blocks whose indexed date range overlaps the bounds are read. The
+    text match is a case-insensitive substring of any of ``SEARCH_FIELDS``.
+    """
+    since, until = _as_bound(since), _as_bound(until)
+    needle = query.strip().lower()
+    rows, blocks_read, seen = [], 0, set()
+    for block in sorted(read_index(directory), key=lambda block: parse_datetime(block.last), reverse=True):
+        first, last = parse_datetime(block.first), parse_datetime(block.last)
+        if (since and last < since) or (until and first > until):
+            continue
+        blocks_read += 1
+        for row in reversed(read_block(block, directory)):
+            if (since and row['created_at'] < since) or (until and row['created_at'] > until):
+                continue
+            if needle and not any(needle in str(row[field]).lower() for field in SEARCH_FIELDS):
+                continue
+            if row['id'] in seen:
+                # Archived twice: a run stopped between its index write and the delete.
+                continue
+            seen.add(row['id'])
+            rows.append(row)
+            if len(rows) > limit:
+                rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+                return SearchResult(rows[:limit], blocks_read, True)
+    rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+    return SearchResult(rows, blocks_read, False)
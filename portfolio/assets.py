@@ -0,0 +1,463 @@
+"""
+Per-page CSS/JS bundles, built by ``manage.py build_assets``.
+
+Each bundle concatenates a page's stylesheets and scripts into one file
+apiece. Bootstrap is pruned to the rules whose classes actually appear in
+the page's templates or scripts, and everything is minified. The rules the
+first screen needs (the template text up to each ``critical`` marker) are
+also written to ``<name>.critical.css``, which ``{% bundle_css %}`` inlines
+into the ``<head>`` while the full stylesheet loads without blocking.
+
+The output lands in ``static/dist/`` so ``collectstatic`` hashes and
+compresses it like any other file. Until it has been built, the template
+tags fall back to the individual source files.
+"""
+import re
+from pathlib import Path
+from posixpath import dirname, join, normpath, relpath
+
+from django.contrib.staticfiles import finders
+from django.template.loader import get_template
+
+APP_DIR = Path(__file__).resolve().parent
+DIST_DIR = 'dist'
+
+CSS_SOURCES = [
+    'vendor/bootstrap/css/bootstrap.min.css',
+    'vendor/bootstrap-icons/bootstrap-icons.css',
+    'vendor/aos/aos.css',
+    'vendor/glightbox/css/glightbox.min.css',
+    'css/main.css',
+]
+BASE_JS = [
+    'vendor/bootstrap/js/bootstrap.bundle.min.js',
+    'vendor/aos/aos.js',
+    'vendor/glightbox/js/glightbox.min.js',
+]
+HOME_JS = [
+    'vendor/typed.js/typed.umd.js',
+    'vendor/waypoints/noframework.waypoints.js',
+    'vendor/imagesloaded/imagesloaded.pkgd.min.js',
+    'vendor/isotope-layout/isotope.pkgd.min.js',
+]
+# Only Bootstrap is pruned. Glightbox and AOS style markup their scripts
+# create at runtime, and the icon classes also come from the database
+# (Interest.icon), so no template lists them all.
+PRUNED_CSS = {'vendor/bootstrap/css/bootstrap.min.css'}
+# State classes Bootstrap's own scripts toggle.
+SAFELIST = {'show', 'fade', 'collapsing', 'active', 'disabled'}
+# Python that writes class names into the markup.
+MARKUP_MODULES = ['forms.py', 'richtext.py', 'templatetags/portfolio_images.py']
+
+# ``templates`` decide what survives pruning; ``critical`` is
+# ``(template, marker)``: the template source up to the marker is the first screen.
+BUNDLES = {
+    'home': {
+        'css': CSS_SOURCES,
+        'js': BASE_JS + HOME_JS + ['js/main.js'],
+        'templates': [
+            'base.html', 'index.html', 'includes/contact_form.html', 'includes/project_card.html',
+            'includes/project_grid_items.html', 'includes/social_links.html',
+        ],
+        'critical': [('base.html', '<main>'), ('index.html', '<!-- ABOUT -->')],
+    },
+    'details': {
+        'css': CSS_SOURCES,
+        'js': BASE_JS + ['js/main.js'],
+        'templates': [
+            'base.html', 'portfolio-details.html', 'includes/project_card.html', 'includes/social_links.html',
+        ],
+        'critical': [('base.html', '<main>'), ('portfolio-details.html', '<!-- PROJECT CONTENT -->')],
+    },
+    'contact': {
+        'css': CSS_SOURCES,
+        'js': BASE_JS + ['js/main.js'],
+        'templates': ['base.html', 'contact.html', 'includes/contact_form.html', 'includes/social_links.html'],
+        'critical': [('base.html', '<main>'), ('contact.html', '<!-- CONTACT FORM -->')],
+    },
+}
+
+# Above this (gzipped) the inlined CSS alone overflows the first round trip (~14 KB).
+CRITICAL_BUDGET = 14 * 1024
+
+# Blocks that hold rules rather than declarations.
+_NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container', '@document')
+_URL_RE = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)')
+_TOKEN_RE = re.compile(r'[\w-]+')
+_CLASS_OR_ID_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+# :not(.x) matches when .x is absent and :is()/:where() take any of a list:
+# their contents never make a selector unused.
+_FUNCTIONAL_PSEUDO_RE = re.compile(r':(?:not|is|where|has)\([^()]*\)')
+_KEYFRAMES_RE = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+_PSEUDO_RE = re.compile(r'::?[\w-]+(?:\([^()]*\))?')
+_ELEMENT_RE = re.compile(r'(?<![\w-])([a-zA-Z][\w-]*)')
+_ATTRIBUTE_RE = re.compile(r'\[\s*([\w-]+)\s*(?:([~|^$*]?=)\s*([^\]]*))?\]')
+
+
+def _skip_string(text, i):
+    """Index just past the quoted string that starts at ``i``."""
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == '\\' else 1
+    return i + 1
+
+
+def strip_css_comments(css):
+    """Return ``(css without comments, [license comments])``; ``/*! */`` comments are licenses."""
+    out, licenses, i = [], [], 0
+    while i < len(css):
+        if css[i] in '"\'':
+            end = _skip_string(css, i)
+            out.append(css[i:end])
+            i = end
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            end = len(css) if end == -1 else end + 2
+            if css.startswith('/*!', i):
+                licenses.append(css[i:end])
+            i = end
+        else:
+            out.append(css[i])
+            i += 1
+    return ''.join(out), licenses
+
+
+def parse_css(css, i=0):
+    """Parse comment-free CSS into ``[(prelude, body), ...]``.
+
+    ``body`` is the declaration text, a nested list for ``@media`` and
+    friends (and ``@keyframes``), or None for statements such as ``@import``.
+    Returns the list; the recursive calls also return the end index.
+    """
+    nodes, start, top = [], i, i == 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+        elif char == '{':
+            prelude = ' '.join(css[start:i].split())
+            if prelude.startswith(_NESTED_AT_RULES) or _KEYFRAMES_RE.match(prelude):
+                body, i = parse_css(css, i + 1)
+            else:
+                end = i + 1
+                while end < len(css) and css[end] != '}':
+                    end = _skip_string(css, end) if css[end] in '"\'' else end + 1
+                body, i = css[i + 1:end], end + 1
+            nodes.append((prelude, body))
+            start = i
+        elif char == ';' and css[start:i].strip().startswith('@'):
+            nodes.append((' '.join(css[start:i].split()), None))
+            i += 1
+            start = i
+        elif char == '}':
+            return nodes, i + 1
+        else:
+            i += 1
+    return nodes if top else (nodes, i)
+
+
+def _squeeze(text, tight):
+    """Collapse whitespace outside strings and drop it next to any character in ``tight``."""
+    out, i = [], 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            end = _skip_string(text, i)
+            out.append(text[i:end])
+            i = end
+        elif char.isspace():
+            while i < len(text) and text[i].isspace():
+                i += 1
+            if out and out[-1][-1:] not in tight and i < len(text) and text[i] not in tight:
+                out.append(' ')
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).strip()
+
+
+def _declarations(body):
+    return _squeeze(body, ':;,').rstrip(';')
+
+
+def serialize_css(nodes):
+    """Minified CSS for ``parse_css`` nodes; empty rules are dropped."""
+    out = []
+    for prelude, body in nodes:
+        if body is None:
+            out.append(f'{prelude};')
+            continue
+        if prelude.startswith('@'):
+            prelude = _squeeze(prelude, ',:')
+        else:
+            prelude = _squeeze(prelude, ',>+~')
+        inner = serialize_css(body) if isinstance(body, list) else _declarations(body)
+        if inner:
+            out.append(f'{prelude}{{{inner}}}')
+    return ''.join(out)
+
+
+def minify_css(css):
+    css, licenses = strip_css_comments(css)
+    return ''.join(licenses) + serialize_css(parse_css(css))
+
+
+def _selector_names(selector, elements=False):
+    """Names a single selector needs in the markup to match anything.
+
+    That is its classes and ids, plus the attribute names of ``[attr...]``
+    and the values of exact ``[attr=value]`` matches. With ``elements``,
+    also its element names.
+    """
+    selector = _FUNCTIONAL_PSEUDO_RE.sub('', selector)
+    names = set()
+    for name, operator, value in _ATTRIBUTE_RE.findall(selector):
+        names.add(name)
+        if operator in ('=', '~='):
+            names.update(_TOKEN_RE.findall(value))
+    selector = _ATTRIBUTE_RE.sub(' ', selector)
+    names.update(_CLASS_OR_ID_RE.findall(selector))
+    if elements:
+        names.update(_ELEMENT_RE.findall(_PSEUDO_RE.sub(' ', _CLASS_OR_ID_RE.sub(' ', selector))))
+    return names
+
+
+def _split_selectors(prelude):
+    """Split a selector list on the commas outside parentheses and brackets."""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(prelude[start:i])
+            start = i + 1
+    parts.append(prelude[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def prune_css(nodes, used, drop_at_rules=(), elements=False):
+    """Keep only the selectors whose names (see ``_selector_names``) are all in ``used``.
+
+    Rules left without selectors, and at-rules in ``drop_at_rules``, are removed.
+    """
+    kept = []
+    for prelude, body in nodes:
+        if prelude.startswith(drop_at_rules or '\0'):
+            continue
+        if prelude.startswith('@'):
+            if isinstance(body, list) and not _KEYFRAMES_RE.match(prelude):
+                body = prune_css(body, used, drop_at_rules, elements)
+                if not body:
+                    continue
+            kept.append((prelude, body))
+            continue
+        selectors = [s for s in _split_selectors(prelude) if _selector_names(s, elements) <= used]
+        if selectors:
+            kept.append((','.join(selectors), body))
+    return kept
+
+
+def map_urls(css, func):
+    """Replace every relative ``url()`` path in ``css`` with ``func(path)``."""
+    def replace(match):
+        quote, url = match.groups()
+        if not url or url.startswith(('data:', '/', '#')) or '://' in url:
+            return match.group(0)
+        return f'url({quote}{func(url)}{quote})'
+    return _URL_RE.sub(replace, css)
+
+
+def rewrite_urls(css, source, target):
+    """Make the relative ``url()``s of static file ``source`` relative to ``target``."""
+    return map_urls(css, lambda url: relpath(normpath(join(dirname(source), url)), dirname(target)))
+
+
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'instanceof', 'yield', 'await',
+}
+
+
+def minify_js(source):
+    """Strip comments and collapse whitespace outside string, template and regex literals.
+
+    Deliberately conservative: line breaks are kept (as one ``\\n``) so
+    automatic semicolon insertion behaves exactly as before. ``/*!``
+    license comments survive.
+    """
+    return _JsMinifier(source).run()
+
+
+class _JsMinifier:
+    def __init__(self, source):
+        self.src = source
+        self.i = 0
+        self.out = []
+
+    def last_significant(self):
+        """The previous emitted token's tail, for the regex-or-division decision."""
+        text = ''.join(self.out[-8:]).rstrip()
+        match = re.search(r'[\w$]+$', text)
+        return match.group(0) if match else text[-1:]
+
+    def run(self, until_brace=False):
+        src, depth = self.src, 0
+        while self.i < len(src):
+            char = src[self.i]
+            if char in '"\'':
+                end = _skip_string(src, self.i)
+                self.out.append(src[self.i:end])
+                self.i = end
+            elif char == '`':
+                self.template()
+            elif src.startswith('//', self.i):
+                end = src.find('\n', self.i)
+                self.i = len(src) if end == -1 else end
+            elif src.startswith('/*', self.i):
+                end = src.find('*/', self.i + 2)
+                end = len(src) if end == -1 else end + 2
+                if src.startswith('/*!', self.i):
+                    self.out.append(src[self.i:end] + '\n')
+                self.i = end
+            elif char == '/' and self.regex_allowed():
+                self.regex()
+            elif char.isspace():
+                start = self.i
+                while self.i < len(src) and src[self.i].isspace():
+                    self.i += 1
+                newline = '\n' in src[start:self.i]
+                previous = self.out[-1] if self.out else ''
+                if previous == ' ':
+                    # Whitespace on both sides of a removed comment.
+                    if newline:
+                        self.out[-1] = '\n'
+                elif previous and not previous.endswith('\n'):
+                    self.out.append('\n' if newline else ' ')
+            else:
+                if until_brace:
+                    if char == '{':
+                        depth += 1
+                    elif char == '}':
+                        if depth == 0:
+                            return
+                        depth -= 1
+                self.out.append(char)
+                self.i += 1
+        return ''.join(self.out).strip() + '\n'
+
+    def regex_allowed(self):
+        previous = self.last_significant()
+        return not previous or previous in _REGEX_PRECEDERS or previous in _REGEX_KEYWORDS
+
+    def regex(self):
+        src, start = self.src, self.i
+        self.i += 1
+        in_class = False
+        while self.i < len(src):
+            char = src[self.i]
+            if char == '\\':
+                self.i += 2
+                continue
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                break
+            elif char == '\n':
+                break
+            self.i += 1
+        self.i += 1
+        while self.i < len(src) and (src[self.i].isalnum() or src[self.i] == '_'):
+            self.i += 1
+        self.out.append(src[start:self.i])
+
+    def template(self):
+        """Copy a template literal verbatim, minifying the code inside ``${...}``."""
+        src = self.src
+        self.out.append('`')
+        self.i += 1
+        while self.i < len(src):
+            char = src[self.i]
+            if char == '\\':
+                self.out.append(src[self.i:self.i + 2])
+                self.i += 2
+            elif char == '`':
+                self.out.append('`')
+                self.i += 1
+                return
+            elif src.startswith('${', self.i):
+                self.out.append('${')
+                self.i += 2
+                self.run(until_brace=True)
+                self.out.append('}')
+                self.i += 1
+            else:
+                self.out.append(char)
+                self.i += 1
+
+
+def _read(path):
+    found = finders.find(path)
+    if not found:
+        raise FileNotFoundError(f'Static file {path!r} not found.')
+    with open(found, encoding='utf-8') as f:
+        return f.read()
+
+
+def _template_source(name, marker=None):
+    source = get_template(name).template.source
+    if marker:
+        index = source.find(marker)
+        if index == -1:
+            raise ValueError(f'Marker {marker!r} not found in {name}.')
+        source = source[:index]
+    return source
+
+
+def used_names(texts):
+    """Every identifier-like token in ``texts``: a superset of the class names they use."""
+    names = set()
+    for text in texts:
+        names.update(_TOKEN_RE.findall(text))
+    return names
+
+
+def build_bundle(name):
+    """Return ``{relative output path: content}`` for bundle ``name``."""
+    spec = BUNDLES[name]
+    css_path, js_path = f'{DIST_DIR}/{name}.css', f'{DIST_DIR}/{name}.js'
+    scripts = [_read(path) for path in spec['js']]
+    used = SAFELIST | used_names(
+        [_template_source(t) for t in spec['templates']]
+        + [(APP_DIR / module).read_text(encoding='utf-8') for module in MARKUP_MODULES]
+        + [script for path, script in zip(spec['js'], scripts) if not path.startswith('vendor/')]
+    )
+    # The critical CSS also drops rules for elements the first screen lacks (tables, forms...).
+    first_screen = {'html', 'body'} | used_names(_template_source(t, marker) for t, marker in spec['critical'])
+
+    licenses, nodes = [], []
+    for path in spec['css']:
+        css, notices = strip_css_comments(rewrite_urls(_read(path), path, css_path))
+        licenses += notices
+        # Only valid first in a file, and the bundle is served as UTF-8 anyway.
+        parsed = [node for node in parse_css(css) if not node[0].startswith('@charset')]
+        nodes += prune_css(parsed, used) if path in PRUNED_CSS else parsed
+
+    # Fonts and off-screen animations load with the full stylesheet.
+    critical = prune_css(nodes, first_screen, drop_at_rules=('@font-face', '@import'), elements=True)
+    critical_css = serialize_css([node for node in critical if not _KEYFRAMES_RE.match(node[0])])
+    animations = [node for node in critical if _KEYFRAMES_RE.match(node[0])]
+    critical_css += serialize_css([
+        node for node in animations if _KEYFRAMES_RE.match(node[0]).group(1) in critical_css
+    ])
+
+    return {
+        css_path: ''.join(licenses) + serialize_css(nodes),
+        f'{DIST_DIR}/{name}.critical.css': critical_css,
+        js_path: ';\n'.join(minify_js(script) for script in scripts),
+    }
@@ -0,0 +1,238 @@
+"""
+Versioned render cache for the public pages.
+
+Every content change (see ``portfolio.signals``) replaces the global content
+version, so cached pages never need to be deleted one by one: new requests
+simply look under a new key and the old entries expire on their own.
+"""
+import hashlib
+import uuid
+from functools import partial, wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+CONTENT_VERSION_KEY = 'portfolio:content-version'
+PAGE_CACHE_PREFIX = 'portfolio:page'
+
+
+def _seed_content_state():
+    """Derive the content state from the database after a cache flush.
+
+    Deterministic, so every process computes the same version and clients'
+    validators survive a cache restart as long as the content did too.
+    """
+    from .signals import CONTENT_MODELS
+
+    digest = hashlib.sha256()
+    last_modified = None
+    for model in CONTENT_MODELS:
+        stats = model.objects.order_by().aggregate(modified=Max('updated_at'), rows=Count('pk'))
+        digest.update(f'{model._meta.label}:{stats["modified"]}:{stats["rows"]};'.encode())
+        if stats['modified'] and (last_modified is None or stats['modified'] > last_modified):
+            last_modified = stats['modified']
+    return digest.hexdigest()[:32], last_modified or timezone.now()
+
+
+def get_content_state():
+    """Return ``(version, last_modified)`` of the public content."""
+    state = cache.get(CONTENT_VERSION_KEY)
+    if state is None:
+        cache.add(CONTENT_VERSION_KEY, _seed_content_state(), timeout=None)
+        state = cache.get(CONTENT_VERSION_KEY)
+    return state
+
+
+def get_content_version():
+    """Return the current content version, seeding it on a cold cache."""
+    return get_content_state()[0]
+
+
+async def aget_content_version():
+    """Async ``get_content_version()``; the cold-cache seeding runs in a thread."""
+    state = await cache.aget(CONTENT_VERSION_KEY)
+    if state is None:
+        state = await sync_to_async(get_content_state)()
+    return state[0]
+
+
+def bump_content_version():
+    """Invalidate every cached page by moving to a fresh content version."""
+    # Deletions leave no updated_at behind, so the bump itself is the modification time.
+    cache.set(CONTENT_VERSION_KEY, (uuid.uuid4().hex, timezone.now()), timeout=None)
+
+
+def _page_key(version, request, query=()):
+    # Only the parameters the view reads: any other query string (tracking
+    # tags, cache busters) shares the entry instead of adding one.
+    params = urlencode(sorted((name, request.GET[name]) for name in query if name in request.GET))
+    return f'{PAGE_CACHE_PREFIX}:{version}:{request.path}?{params}'
+
+
+def page_cache_key(request, query=()):
+    return _page_key(get_content_version(), request, query)
+
+
+# WSGI environ flag set by ``export_site``. It has no HTTP_ prefix, so no
+# client can send it.
+STATIC_EXPORT_KEY = 'portfolio.static_export'
+
+
+def is_static_export(request):
+    return bool(request.META.get(STATIC_EXPORT_KEY))
+
+
+def is_cacheable_request(request):
+    """Only GET/HEAD requests are cached, and never the renders for a static export.
+
+    The cached pages carry no CSRF token or flash message (those live on the
+    ``contact`` view), so one render serves every visitor.
+    """
+    return request.method in ('GET', 'HEAD') and not is_static_export(request)
+
+
+def _cacheable_content(response):
+    """What to store for ``response``, or None if it must not be cached."""
+    if response.status_code != 200 or response.streaming:
+        return None
+    return response.content, response['Content-Type']
+
+
+def _cached_response(request, cached):
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def cache_rendered_page(view_func=None, *, query=()):
+    """Serve GET responses of ``view_func`` from the versioned page cache.
+
+    A warm hit runs no SQL and no template rendering; only successful HTML
+    responses are stored. Works for sync and async views; the async wrapper
+    uses the cache's async API.
+
+    Pages are keyed on the path and the ``query`` parameters the view reads,
+    e.g. ``@cache_rendered_page(query=('category', 'cursor'))``; any other
+    query string is ignored.
+    """
+    if view_func is None:
+        return partial(cache_rendered_page, query=query)
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_view(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return await view_func(request, *args, **kwargs)
+
+            key = _page_key(await aget_content_version(), request, query)
+            cached = await cache.aget(key)
+            if cached is None:
+                response = await view_func(request, *args, **kwargs)
+                cached = _cacheable_content(response)
+                if cached is not None:
+                    await cache.aset(key, cached, settings.PAGE_CACHE_TIMEOUT)
+                    response['X-Page-Cache'] = 'MISS'
+                return response
+            return _cached_response(request, cached)
+
+        _async_view.page_cache_query = query
+        return _async_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request, query)
+        cached = cache.get(key)
+        if cached is None:
+            response = view_func(request, *args, **kwargs)
+            cached = _cacheable_content(response)
+            if cached is not None:
+                cache.set(key, cached, settings.PAGE_CACHE_TIMEOUT)
+                response['X-Page-Cache'] = 'MISS'
+            return response
+        return _cached_response(request, cached)
+
+    _wrapped_view.page_cache_query = query
+    return _wrapped_view
+
+
+def _page_etag(request, *args, **kwargs):
+    if not is_cacheable_request(request):
+        return None
+    return get_content_version()
+
+
+def _page_last_modified(request, *args, **kwargs):
+    if not is_cacheable_request(request):
+        return None
+    return get_content_state()[1]
+
+
+_CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+def _is_conditional(request):
+    return is_cacheable_request(request) and any(header in request.META for header in _CONDITIONAL_HEADERS)
+
+
+def _drop_conditions(request):
+    for header in _CONDITIONAL_HEADERS:
+        request.META.pop(header, None)
+
+
+def _finish(request, response):
+    if response.status_code != 200:
+        # condition() stamps every response; a 404 must not be revalidated.
+        for header in ('ETag', 'Last-Modified'):
+            if response.has_header(header):
+                del response[header]
+    if is_cacheable_request(request):
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def conditional_page(view_func):
+    """Answer revalidations of ``view_func`` with ``304 Not Modified``.
+
+    The ETag is the content version and Last-Modified the time of the last
+    content change, so a repeat visit costs one cache read: no SQL, no
+    rendering and no body. ``Cache-Control: no-cache`` makes browsers always
+    revalidate instead of guessing a freshness lifetime from Last-Modified.
+
+    Those validators are the same for every URL, so a 304 is only given for
+    a page ``cache_rendered_page`` holds at the current version, i.e. one
+    that rendered successfully since the last change. Otherwise the view runs,
+    and a deleted or unknown slug gets its 404.
+    """
+    conditional_view = condition(etag_func=_page_etag, last_modified_func=_page_last_modified)(view_func)
+    query = getattr(view_func, 'page_cache_query', ())
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_view(request, *args, **kwargs):
+            # condition() calls the validators synchronously: make sure a cold
+            # cache is seeded off the event loop first.
+            version = await aget_content_version()
+            if _is_conditional(request) and not await cache.ahas_key(_page_key(version, request, query)):
+                _drop_conditions(request)
+            return _finish(request, await conditional_view(request, *args, **kwargs))
+
+        return _async_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if _is_conditional(request) and not cache.has_key(page_cache_key(request, query)):
+            _drop_conditions(request)
+        return _finish(request, conditional_view(request, *args, **kwargs))
+
+    return _wrapped_view
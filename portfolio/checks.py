@@ -0,0 +1,38 @@
+"""
+System checks for the deployment settings the app relies on.
+
+The content version (see ``portfolio.cache``) and the contact rate limits
+live in the cache, so every worker process must share it: with a
+per-process ``LocMemCache`` an admin edit only invalidates the pages of the
+worker that saved it, and each worker keeps its own rate-limit buckets.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.CACHES.get('default', {}).get('BACKEND') != LOCMEM_BACKEND:
+        return []
+    if settings.WEB_CONCURRENCY > 1:
+        return [Error(
+            f'The default cache is a per-process LocMemCache but WEB_CONCURRENCY is {settings.WEB_CONCURRENCY}.',
+            hint='Set CACHE_BACKEND to a shared backend (file, Redis, Memcached): otherwise content '
+                 'changes only reach one worker and the contact rate limits are multiplied.',
+            id='portfolio.E001',
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache_deploy(app_configs, **kwargs):
+    if settings.CACHES.get('default', {}).get('BACKEND') != LOCMEM_BACKEND:
+        return []
+    return [Warning(
+        'The default cache is a per-process LocMemCache.',
+        hint='That is only correct with a single worker process; set CACHE_BACKEND to a shared '
+             'backend (file, Redis, Memcached) before running several.',
+        id='portfolio.W001',
+    )]
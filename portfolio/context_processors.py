@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Timeout for the ``{% cache %}`` fragments; their keys carry the project's
+    ``updated_at``, so an edit is picked up straight away whatever it is."""
+    return {'FRAGMENT_CACHE_TIMEOUT': settings.FRAGMENT_CACHE_TIMEOUT}
@@ -25,4 +25,11 @@ class ContactForm(forms.ModelForm):
                 'rows': 6,
                 'placeholder': 'Your message…',
             }),
-        }
\ No newline at end of file
+        }
+
+
+class ArchiveSearchForm(forms.Form):
+    """Filters for the archived-messages search in the admin."""
+    q = forms.CharField(required=False, label='Text')
+    since = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    until = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
@@ -0,0 +1,145 @@
+"""
+Responsive variants of the uploaded images.
+
+Each ProcessedImageField keeps its single stored size; the smaller widths in
+WebP and JPEG are imagekit cache files, generated the first time they are
+requested and then served straight from ``MEDIA_ROOT/CACHE``.
+"""
+import base64
+from io import BytesIO
+
+from imagekit import ImageSpec, register
+from imagekit.cachefiles import ImageCacheFile
+from imagekit.processors import ResizeToFit
+from PIL import Image
+
+# Target widths (px) per field name, smallest first. The stored image is the
+# upper bound: nothing is ever upscaled.
+VARIANT_WIDTHS = {
+    'profile_image': (160, 320, 500),
+    'hero_image': (640, 1280, 1920),
+    'thumbnail': (400, 800),
+    'image': (400, 800, 1200),
+}
+DEFAULT_WIDTHS = (480, 960)
+
+# (imagekit format, MIME type), preferred first. The last entry is the <img> fallback.
+VARIANT_FORMATS = (
+    ('WEBP', 'image/webp'),
+    ('JPEG', 'image/jpeg'),
+)
+
+
+class ResponsiveVariant(ImageSpec):
+    options = {'quality': 80}
+
+    def __init__(self, source, width, image_format):
+        self.processors = [ResizeToFit(width=width, upscale=False)]
+        self.format = image_format
+        super().__init__(source=source)
+
+
+# Registration makes imagekit apply the just-in-time strategy to the variants.
+register.generator('portfolio:responsive_variant', ResponsiveVariant)
+
+
+def variant_widths(field_file, source_width=None):
+    """The widths worth generating for ``field_file``, capped at its own width.
+
+    Pass the stored ``source_width`` when the model keeps it: reading
+    ``field_file.width`` opens and decodes the image.
+    """
+    widths = VARIANT_WIDTHS.get(getattr(field_file.field, 'name', None), DEFAULT_WIDTHS)
+    if not source_width:
+        source_width = field_file.width
+    smaller = [w for w in widths if w < source_width]
+    return smaller + [min(source_width, widths[-1])]
+
+
+def image_variants(field_file, source_width=None):
+    """Return ``[(mime_type, [(cache_file, width), ...]), ...]`` for ``field_file``.
+
+    Nothing is generated here; a variant is written to storage the first time
+    its ``url`` is read. ``source_width`` is the stored width, see
+    ``variant_widths()``.
+    """
+    widths = variant_widths(field_file, source_width)
+    return [
+        (mime_type, [
+            (ImageCacheFile(ResponsiveVariant(field_file, width, image_format)), width)
+            for width in widths
+        ])
+        for image_format, mime_type in VARIANT_FORMATS
+    ]
+
+
+def generate_variants(field_file, force=False):
+    """Write every variant of ``field_file`` to storage now.
+
+    With ``force`` the existing files are replaced, e.g. after the source was
+    reprocessed in place (its name, and so the variant names, are unchanged).
+    """
+    for _mime_type, files in image_variants(field_file):
+        for cache_file, _width in files:
+            if force:
+                # storage.save() would pick a new name instead of overwriting.
+                cache_file.storage.delete(cache_file.name)
+            cache_file.generate(force=force)
+
+
+# Longest side of the inline blur placeholder; the browser's upscaling blurs it.
+PLACEHOLDER_SIZE = 16
+
+
+def image_metadata(field_file):
+    """Return the intrinsic size, a tiny base64 JPEG placeholder and the dominant colour.
+
+    ``{'width': 800, 'height': 600, 'placeholder': 'data:image/jpeg;base64,...', 'color': '#1a2b3c'}``
+    """
+    field_file.open('rb')
+    try:
+        with Image.open(field_file) as img:
+            width, height = img.size
+            rgb = img.convert('RGB')
+    finally:
+        field_file.close()
+
+    small = rgb.copy()
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = BytesIO()
+    small.save(buffer, format='JPEG', quality=50)
+    placeholder = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    # Most common colour of an 8-colour palette of a 64px copy.
+    swatch = rgb.copy()
+    swatch.thumbnail((64, 64))
+    quantized = swatch.quantize(colors=8)
+    _count, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': placeholder,
+        'color': f'#{r:02x}{g:02x}{b:02x}',
+    }
+
+
+def refresh_image_metadata(instance, field_name, field_map):
+    """Copy ``image_metadata()`` of ``instance.<field_name>`` onto the model fields in ``field_map``.
+
+    ``field_map`` maps metadata keys to attribute names, e.g.
+    ``{'width': 'thumbnail_width', ...}``. Returns the attributes that changed;
+    the instance is not saved.
+    """
+    field_file = getattr(instance, field_name)
+    if field_file:
+        values = image_metadata(field_file)
+    else:
+        values = {'width': None, 'height': None, 'placeholder': '', 'color': ''}
+    changed = []
+    for key, attname in field_map.items():
+        if getattr(instance, attname) != values[key]:
+            setattr(instance, attname, values[key])
+            changed.append(attname)
+    return changed
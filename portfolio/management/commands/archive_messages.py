@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from portfolio import archive
+from portfolio.models import ContactMessage
+
+
+class Command(BaseCommand):
+    help = 'Move old contact messages into compressed, indexed segment files and delete them from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None, metavar='DAYS',
+            help='Archive messages older than this (default: CONTACT_RETENTION_DAYS).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Messages per block (and per DELETE).')
+        parser.add_argument(
+            '--format', choices=sorted(archive.FORMATS), default=None,
+            help='Segment compression (default: zstd if the zstandard package is installed, else gzip).',
+        )
+        parser.add_argument(
+            '--vacuum-pages', type=int, default=500,
+            help='SQLite: free pages returned to the OS after each batch (0 to skip).',
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help='SQLite: switch the database to auto_vacuum=INCREMENTAL first (a one-off full VACUUM).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived.')
+
+    def handle(self, *args, **options):
+        days = settings.CONTACT_RETENTION_DAYS if options['older_than'] is None else options['older_than']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        cutoff = timezone.now() - timedelta(days=days)
+        old = ContactMessage.objects.filter(created_at__lt=cutoff).order_by('created_at', 'id')
+
+        if options['dry_run']:
+            self.stdout.write(f'{old.count()} message(s) older than {days} day(s) would be archived.')
+            return
+
+        incremental = self.prepare_vacuum(options)
+        try:
+            writer = archive.SegmentWriter(format=options['format'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        total = 0
+        while True:
+            rows = list(old.values(*archive.ARCHIVED_FIELDS)[:options['batch_size']])
+            if not rows:
+                break
+            block = writer.write(rows)
+            # Indexed, so safe to drop; outbox rows keep their history with a NULL link.
+            with transaction.atomic():
+                ContactMessage.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            total += len(rows)
+            if incremental:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'PRAGMA incremental_vacuum({options["vacuum_pages"]:d})')
+                    # Each page is freed by a step of the statement.
+                    cursor.fetchall()
+            self.stdout.write(f'  {block.segment}: +{block.rows} ({block.first} .. {block.last})')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} message(s) older than {days} day(s) into {writer.directory}.'
+        ))
+
+    def prepare_vacuum(self, options):
+        """Whether to run ``PRAGMA incremental_vacuum`` after each batch."""
+        if connection.vendor != 'sqlite' or not options['vacuum_pages']:
+            return False
+        with connection.cursor() as cursor:
+            if options['enable_incremental_vacuum']:
+                self.stdout.write('Switching to auto_vacuum=INCREMENTAL (full VACUUM)...')
+                cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                cursor.execute('VACUUM')
+            cursor.execute('PRAGMA auto_vacuum')
+            mode = cursor.fetchone()[0]
+        if mode != 2:
+            self.stderr.write(self.style.WARNING(
+                'auto_vacuum is not INCREMENTAL: freed pages are reused but the file will not shrink. '
+                'Run once with --enable-incremental-vacuum.'
+            ))
+            return False
+        return True
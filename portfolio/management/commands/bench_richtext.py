@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.richtext import iter_richtext, render_richtext
+
+SAMPLE = """The Problem:
+Many small business owners struggle to interpret raw financial statements & ratios.
+
+Core Features:
+• Input forms for income statement and balance sheet data
+• CSV/Excel upload for <batch> processing
+- Historical comparison with visual trend lines
+
+Steps:
+1. Collect the statements
+2) Compute 15+ ratios
+3. Export a PDF report
+
+Impact:
+Enables faster, more accurate financial analysis for entrepreneurs and students.
+
+"""
+
+SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+
+def _human(size):
+    return f'{size // (1024 * 1024)} MB' if size >= 1024 * 1024 else f'{size // 1024} KB'
+
+
+class Command(BaseCommand):
+    help = 'Measure richtext rendering throughput (MB/s) for inputs from 1 KB to 10 MB'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per size; the best is reported.')
+        parser.add_argument('--max-size', type=int, default=SIZES[-1], help='Largest input in bytes.')
+        parser.add_argument(
+            '--stream', action='store_true',
+            help='Consume iter_richtext() block by block instead of building the whole string.',
+        )
+
+    def handle(self, *args, **options):
+        mode = 'stream' if options['stream'] else 'render'
+        self.stdout.write(f'{"size":>8}  {"best (ms)":>10}  {"MB/s":>8}  ({mode}, best of {options["repeat"]})')
+        for size in SIZES:
+            if size > options['max_size']:
+                break
+            text = (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+            megabytes = len(text.encode()) / (1024 * 1024)
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                if options['stream']:
+                    for _block in iter_richtext(text):
+                        pass
+                else:
+                    render_richtext(text)
+                best = min(best, time.perf_counter() - start)
+            self.stdout.write(f'{_human(size):>8}  {best * 1000:>10.2f}  {megabytes / best:>8.1f}')
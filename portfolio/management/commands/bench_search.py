@@ -0,0 +1,118 @@
+import random
+import sqlite3
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.search import CREATE_FTS_SQL, FTS_COLUMNS, FTS_TABLE, SEARCH_SQL, fts_query
+
+# Real catalogues follow Zipf's law: a few very common words and a long tail.
+# The synthetic corpus draws from a vocabulary of that shape, seeded with
+# domain words so the sample queries hit terms of realistic frequency.
+DOMAIN_WORDS = (
+    'django python pandas numpy dashboard analytics forecasting regression classification '
+    'accounting audit ledger budget finance tax reconciliation invoice payroll cashflow '
+    'react javascript api rest graphql docker kubernetes postgres sqlite redis celery '
+    'machine learning neural network vision language model transformer pipeline etl '
+    'portfolio website ecommerce inventory booking mobile android flutter chart report '
+    'student university research thesis survey statistics visualization tableau excel'
+).split()
+QUERIES = ('django', 'pandas dashboard', 'machine learning', 'audit ledger', 'forecast', 'react api', 'tax')
+VOCABULARY_SIZE = 30_000
+
+
+def _vocabulary(rng):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'za', 'pe', 'do', 'gu', 'fi', 'ba', 'xe']
+    words = set()
+    while len(words) < VOCABULARY_SIZE - len(DOMAIN_WORDS):
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    vocabulary = sorted(words)
+    rng.shuffle(vocabulary)
+    # Domain words land in the mid-frequency band (ranks ~100-1000).
+    for i, word in enumerate(DOMAIN_WORDS):
+        vocabulary.insert(100 + i * 10, word)
+    weights, total = [], 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank
+        weights.append(total)
+    return vocabulary, weights
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text search latency on a synthetic in-memory FTS5 index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=100_000, help='Synthetic projects to index.')
+        parser.add_argument('--queries', type=int, default=200, help='Queries to time.')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--compare-like', action='store_true',
+            help="Also time the equivalent LIKE '%%term%%' scan over a plain table.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        db = sqlite3.connect(':memory:')
+        db.execute(CREATE_FTS_SQL)
+        db.execute(f"CREATE TABLE plain (id INTEGER PRIMARY KEY, {', '.join(FTS_COLUMNS)})")
+
+        started = time.perf_counter()
+        vocabulary, weights = _vocabulary(rng)
+
+        def text(words):
+            return ' '.join(rng.choices(vocabulary, cum_weights=weights, k=words))
+
+        rows = [
+            (pk, text(4), text(15), text(60), text(150), text(5), text(3))
+            for pk in range(1, options['projects'] + 1)
+        ]
+        placeholders = ', '.join(['?'] * (len(FTS_COLUMNS) + 1))
+        db.executemany(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES ({placeholders})", rows)
+        if options['compare_like']:
+            db.executemany(f'INSERT INTO plain VALUES ({placeholders})', rows)
+        db.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        self.stdout.write(f"Indexed {options['projects']} projects in {time.perf_counter() - started:.1f}s")
+
+        search_sql = SEARCH_SQL.replace('%s', '?')
+        count_sql = f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?'
+        # bm25 scores every matching row, so latency follows the match count.
+        self.stdout.write(f"{'query':<22} {'matches':>8} {'p50':>9} {'p99':>9}")
+        overall = []
+        for text in QUERIES:
+            matches = db.execute(count_sql, [fts_query(text)]).fetchone()[0]
+            timings = self.run(options['queries'] // len(QUERIES) or 1, lambda: db.execute(
+                search_sql, [fts_query(text), options['limit']]
+            ).fetchall())
+            overall += timings
+            self.stdout.write(f'{text:<22} {matches:>8} {self.p50(timings):>7.2f}ms {self.p99(timings):>7.2f}ms')
+        overall.sort()
+        self.stdout.write(f"{'fts5 (all queries)':<22} {'':>8} {self.p50(overall):>7.2f}ms {self.p99(overall):>7.2f}ms")
+
+        if options['compare_like']:
+            like_sql = (
+                f"SELECT id FROM plain WHERE "
+                f"{' OR '.join(f'{column} LIKE ?' for column in FTS_COLUMNS)} LIMIT ?"
+            )
+            overall = []
+            for text in QUERIES:
+                overall += self.run(3, lambda: db.execute(
+                    like_sql, [f'%{text}%'] * len(FTS_COLUMNS) + [options['limit']]
+                ).fetchall())
+            overall.sort()
+            self.stdout.write(f"{'LIKE %term%':<22} {'':>8} {self.p50(overall):>7.2f}ms {self.p99(overall):>7.2f}ms")
+
+    def run(self, count, query):
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sorted(timings)
+
+    def p50(self, timings):
+        return statistics.median(timings)
+
+    def p99(self, timings):
+        return timings[min(len(timings) - 1, int(len(timings) * 0.99))]
@@ -0,0 +1,190 @@
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from portfolio.cache import bump_content_version
+from portfolio.models import Project
+
+
+def _summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare WSGI and ASGI throughput and tail latency of the public pages, '
+        'driving both Django handlers in-process under concurrent load'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', action='append', dest='urls', metavar='PATH',
+            help='Path to request (repeatable; default: home and the first project).',
+        )
+        parser.add_argument('--requests', type=int, default=500, help='Requests per URL and mode.')
+        parser.add_argument(
+            '--concurrency', type=int, default=16,
+            help='Worker threads (WSGI) / in-flight requests (ASGI).',
+        )
+        parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests per URL and mode.')
+        parser.add_argument(
+            '--mode', choices=['wsgi', 'asgi', 'both'], default='both',
+        )
+        parser.add_argument(
+            '--uncached', action='store_true',
+            help='Bump the content version before every request so each one renders.',
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or self.default_urls()
+        hosts = [h for h in settings.ALLOWED_HOSTS if h and '*' not in h]
+        self.host = (hosts[0] if hosts else 'localhost').lstrip('.')
+        self.uncached = options['uncached']
+        modes = ['wsgi', 'asgi'] if options['mode'] == 'both' else [options['mode']]
+
+        self.stdout.write(
+            f"{options['requests']} request(s) per URL, concurrency {options['concurrency']}, "
+            f"{'uncached' if self.uncached else 'page cache enabled'}"
+        )
+        self.stdout.write(f"{'mode':<6} {'url':<40} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for url in urls:
+            for mode in modes:
+                run = self.run_wsgi if mode == 'wsgi' else self.run_asgi
+                run(url, options['warmup'], options['concurrency'])
+                result = run(url, options['requests'], options['concurrency'])
+                self.stdout.write(
+                    f"{mode:<6} {url:<40} {result['rps']:>9.1f} {result['p50']:>9.2f} {result['p99']:>9.2f}"
+                )
+
+    def default_urls(self):
+        urls = [reverse('home')]
+        slug = Project.objects.values_list('slug', flat=True).first()
+        if slug:
+            urls.append(reverse('portfolio-details', args=[slug]))
+        return urls
+
+    def check_status(self, url, status):
+        if status != 200:
+            raise CommandError(f'{url} returned HTTP {status}')
+
+    # WSGI: a pool of threads, like a threaded WSGI server.
+
+    def run_wsgi(self, url, count, concurrency):
+        if not count:
+            return None
+        handler = WSGIHandler()
+
+        def one(_):
+            if self.uncached:
+                bump_content_version()
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': url,
+                'QUERY_STRING': '',
+                'SERVER_NAME': self.host,
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': self.host,
+                'wsgi.version': (1, 0),
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            status = []
+            started = time.perf_counter()
+            response = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+            try:
+                for _chunk in response:
+                    pass
+            finally:
+                response.close()
+            elapsed = time.perf_counter() - started
+            self.check_status(url, int(status[0].split()[0]))
+            return elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one, range(count)))
+        return _summary(latencies, time.perf_counter() - started)
+
+    # ASGI: one event loop with ``concurrency`` requests in flight.
+
+    def run_asgi(self, url, count, concurrency):
+        if not count:
+            return None
+        return asyncio.run(self._run_asgi(url, count, concurrency))
+
+    async def _run_asgi(self, url, count, concurrency):
+        handler = ASGIHandler()
+        queue = asyncio.Queue()
+        for _ in range(count):
+            queue.put_nowait(None)
+        latencies = []
+
+        async def one():
+            if self.uncached:
+                bump_content_version()
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': url,
+                'raw_path': url.encode(),
+                'query_string': b'',
+                'root_path': '',
+                'headers': [(b'host', self.host.encode())],
+                'client': ('127.0.0.1', 0),
+                'server': (self.host, 80),
+            }
+            done = asyncio.Event()
+            received = False
+            status = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Django listens for a disconnect while the view runs.
+                await done.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                    done.set()
+
+            started = time.perf_counter()
+            await handler(scope, receive, send)
+            latencies.append(time.perf_counter() - started)
+            self.check_status(url, status[0])
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                await one()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return _summary(latencies, time.perf_counter() - started)
@@ -0,0 +1,151 @@
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from portfolio import views
+from portfolio.cache import bump_content_version
+from portfolio.models import ContactMessage, Project, Skill
+
+ADMIN_CHANGELISTS = (Project, Skill, ContactMessage)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the public views and the admin changelists through RequestFactory, '
+        'report median/p95 and fail on a regression against a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=30, help='Timed calls per target.')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed calls per target.')
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Let the page and fragment caches serve repeat calls (default: every call renders).',
+        )
+        parser.add_argument(
+            '--baseline', default=str(settings.BASE_DIR / 'bench' / 'bench_baseline.json'),
+            help='Baseline JSON file to compare against / write (default: under the git-ignored bench/).',
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed median slowdown over the baseline before failing (0.25 = +25%%).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory()
+        self.rng = random.Random(options['seed'])
+        self.cached = options['cached']
+        self.user = get_user_model()(username='bench', is_active=True, is_staff=True, is_superuser=True)
+
+        if self.cached:
+            results = self.run(options)
+        else:
+            # {% cache %} uses the "template_fragments" alias when there is
+            # one: a dummy there makes every fragment render too.
+            with override_settings(CACHES={
+                **settings.CACHES, 'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            }):
+                results = self.run(options)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}.'))
+            return
+        if baseline_path.exists():
+            self.compare(results, json.loads(baseline_path.read_text()), options['tolerance'])
+
+    def run(self, options):
+        results = {}
+        self.stdout.write(f"{'target':<34} {'median ms':>10} {'p95 ms':>10} {'queries':>8}")
+        for name, call in self.targets():
+            for _ in range(options['warmup']):
+                self.invalidate()
+                call()
+            timings, queries = [], 0
+            for _ in range(options['repeat']):
+                self.invalidate()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    call()
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries = max(queries, len(captured))
+            timings.sort()
+            results[name] = {
+                'median_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+                'queries': queries,
+            }
+            self.stdout.write(
+                f"{name:<34} {results[name]['median_ms']:>10.2f} {results[name]['p95_ms']:>10.2f} {queries:>8}"
+            )
+        return results
+
+    def invalidate(self):
+        """Make the next call miss the page cache (outside the timed section)."""
+        if not self.cached:
+            bump_content_version()
+
+    def targets(self):
+        slugs = list(Project.objects.order_by('?').values_list('slug', flat=True)[:20])
+        yield 'home', lambda: self.call(views.home, reverse('home'))
+        if slugs:
+            def details():
+                slug = self.rng.choice(slugs)
+                return self.call(views.portfolio_details, reverse('portfolio-details', args=[slug]), slug=slug)
+            yield 'portfolio_details', details
+        for model in ADMIN_CHANGELISTS:
+            model_admin = admin.site._registry[model]
+            url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            yield f'admin:{model._meta.model_name}_changelist', (
+                lambda model_admin=model_admin, url=url: self.call(model_admin.changelist_view, url)
+            )
+
+    def call(self, view, url, **kwargs):
+        request = self.factory.get(url)
+        request.user = self.user
+        request.session = SessionStore()
+        request._messages = CookieStorage(request)
+        if iscoroutinefunction(view):
+            response = async_to_sync(view)(request, **kwargs)
+        else:
+            response = view(request, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned HTTP {response.status_code}')
+        return response
+
+    def compare(self, results, baseline, tolerance):
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            limit = baseline[name]['median_ms'] * (1 + tolerance)
+            if result['median_ms'] > limit:
+                regressions.append(
+                    f"{name}: median {result['median_ms']:.2f}ms > {limit:.2f}ms "
+                    f"(baseline {baseline[name]['median_ms']:.2f}ms +{tolerance:.0%})"
+                )
+            if result['queries'] > baseline[name]['queries']:
+                regressions.append(f"{name}: {result['queries']} queries > baseline {baseline[name]['queries']}")
+        if regressions:
+            raise CommandError('Regressed against the baseline:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Within the baseline.'))
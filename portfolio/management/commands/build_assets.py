@@ -0,0 +1,64 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio import assets
+
+
+def _sizes(paths):
+    raw = sum(len(content) for content in paths)
+    return raw, sum(len(gzip.compress(content, 9)) for content in paths)
+
+
+class Command(BaseCommand):
+    help = 'Bundle, prune and minify the per-page CSS/JS and extract the critical CSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None,
+            help='Static directory to write dist/ into (default: the first STATICFILES_DIRS entry).',
+        )
+        parser.add_argument(
+            '--bundle', action='append', dest='bundles', metavar='NAME', choices=sorted(assets.BUNDLES),
+            help='Only this bundle (repeatable).',
+        )
+
+    def handle(self, *args, **options):
+        if options['output']:
+            output = Path(options['output'])
+        elif settings.STATICFILES_DIRS:
+            output = Path(settings.STATICFILES_DIRS[0])
+        else:
+            raise CommandError('No STATICFILES_DIRS entry to write into; pass --output.')
+
+        for name in options['bundles'] or assets.BUNDLES:
+            spec = assets.BUNDLES[name]
+            try:
+                built = assets.build_bundle(name)
+            except (FileNotFoundError, ValueError) as e:
+                raise CommandError(f'{name}: {e}')
+
+            for path, content in built.items():
+                target = output / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(content, encoding='utf-8')
+
+            for kind in ('css', 'js'):
+                before = _sizes([assets._read(path).encode() for path in spec[kind]])
+                after = _sizes([built[f'{assets.DIST_DIR}/{name}.{kind}'].encode()])
+                self.stdout.write(
+                    f'{name}.{kind}: {len(spec[kind])} file(s) -> 1, '
+                    f'{before[0] / 1024:.0f} KB -> {after[0] / 1024:.0f} KB '
+                    f'({before[1] / 1024:.0f} KB -> {after[1] / 1024:.0f} KB gzipped)'
+                )
+            critical = _sizes([built[f'{assets.DIST_DIR}/{name}.critical.css'].encode()])
+            self.stdout.write(
+                f'{name}.critical.css: {critical[0] / 1024:.1f} KB inlined ({critical[1] / 1024:.1f} KB gzipped)'
+            )
+            if critical[1] > assets.CRITICAL_BUDGET:
+                self.stderr.write(self.style.WARNING(
+                    f'  over the {assets.CRITICAL_BUDGET // 1024} KB first-round-trip budget'
+                ))
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output / assets.DIST_DIR}; run collectstatic next.'))
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from whitenoise.compress import Compressor
+
+from portfolio.cache import STATIC_EXPORT_KEY
+from portfolio.models import (
+    Profile, Skill, Education, Certification, Interest,
+    Project, ProjectImage, ProjectTag, CareerGoal, RelatedProject
+)
+
+MANIFEST_NAME = '.export-manifest.json'
+HOME_MODELS = (
+    Profile, Skill, Education, Certification, Interest,
+    Project, ProjectImage, ProjectTag, CareerGoal,
+)
+
+
+def _rows(queryset):
+    """Every column of every row, in a stable order, as JSON-able lists."""
+    return [list(row) for row in queryset.order_by('pk').values_list()]
+
+
+def _fingerprint(*parts):
+    payload = json.dumps(parts, default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Prerender the public pages, static and media files into a directory for a plain file server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=str(settings.BASE_DIR / 'site_export'),
+            help='Directory to write the exported site to.',
+        )
+        parser.add_argument(
+            '--host', default=None,
+            help='Host header used when rendering (defaults to the first ALLOWED_HOSTS entry).',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-render every page even if its rows are unchanged.',
+        )
+        parser.add_argument('--skip-static', action='store_true', help='Do not copy STATIC_ROOT.')
+        parser.add_argument('--skip-media', action='store_true', help='Do not copy MEDIA_ROOT.')
+
+    def handle(self, *args, **options):
+        self.output = Path(options['output']).resolve()
+        self.output.mkdir(parents=True, exist_ok=True)
+        self.compressor = Compressor(quiet=True)
+        manifest = self.load_manifest()
+
+        hosts = [h for h in settings.ALLOWED_HOSTS if h and '*' not in h]
+        host = (options['host'] or (hosts[0] if hosts else 'localhost')).lstrip('.')
+        # Pages render their full content: a file server has no
+        # project_cards endpoint for the home gallery to page from.
+        self.client = Client(HTTP_HOST=host, **{STATIC_EXPORT_KEY: True})
+
+        # Hashed asset names are baked into the HTML, so a new static build
+        # invalidates every page.
+        assets_version = self.static_manifest_hash()
+
+        pages = {reverse('home'): _fingerprint(
+            assets_version, *(_rows(model.objects.all()) for model in HOME_MODELS)
+        )}
+        profile_rows = _rows(Profile.objects.all())
+        neighbours = {}
+        for project_id, related_id in RelatedProject.objects.values_list('project_id', 'related_id'):
+            neighbours.setdefault(project_id, []).append(related_id)
+        for project in Project.objects.all():
+            related_ids = neighbours.get(project.pk, [])
+            pages[reverse('portfolio-details', args=[project.slug])] = _fingerprint(
+                assets_version,
+                profile_rows,
+                related_ids,
+                _rows(Project.objects.filter(pk__in=[project.pk, *related_ids])),
+                _rows(ProjectTag.objects.filter(project_id__in=[project.pk, *related_ids])),
+                _rows(ProjectImage.objects.filter(project=project)),
+            )
+
+        rendered = skipped = 0
+        for url, fingerprint in pages.items():
+            if not options['force'] and manifest['pages'].get(url) == fingerprint:
+                skipped += 1
+                continue
+            self.render_page(url)
+            rendered += 1
+
+        removed = 0
+        for url in set(manifest['pages']) - set(pages):
+            self.remove_page(url)
+            removed += 1
+        manifest['pages'] = pages
+
+        copied = 0
+        if not options['skip_static']:
+            if not settings.STATIC_ROOT or not Path(settings.STATIC_ROOT).is_dir():
+                raise CommandError('STATIC_ROOT does not exist; run collectstatic first.')
+            copied += self.copy_tree(Path(settings.STATIC_ROOT), settings.STATIC_URL, manifest['files'])
+        if not options['skip_media'] and Path(settings.MEDIA_ROOT).is_dir():
+            copied += self.copy_tree(Path(settings.MEDIA_ROOT), settings.MEDIA_URL, manifest['files'])
+
+        self.save_manifest(manifest)
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported to {self.output}: {rendered} page(s) rendered, {skipped} unchanged, '
+            f'{removed} removed, {copied} file(s) copied.'
+        ))
+
+    def load_manifest(self):
+        path = self.output / MANIFEST_NAME
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return {'pages': {}, 'files': {}}
+
+    def save_manifest(self, manifest):
+        tmp = self.output / f'{MANIFEST_NAME}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.output / MANIFEST_NAME)
+
+    def static_manifest_hash(self):
+        path = Path(settings.STATIC_ROOT or '') / 'staticfiles.json'
+        if not path.is_file():
+            return None
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def page_path(self, url):
+        return self.output / url.strip('/') / 'index.html'
+
+    def render_page(self, url):
+        response = self.client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned HTTP {response.status_code}')
+        path = self.page_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.write_file(path, response.content)
+        self.stdout.write(f'  rendered {url}')
+
+    def remove_page(self, url):
+        path = self.page_path(url)
+        for candidate in (path, *self.siblings(path)):
+            candidate.unlink(missing_ok=True)
+        if path.parent != self.output and path.parent.is_dir() and not any(path.parent.iterdir()):
+            path.parent.rmdir()
+        self.stdout.write(f'  removed {url}')
+
+    def copy_tree(self, source, url_prefix, seen):
+        """Copy new or modified files from ``source`` under ``url_prefix``."""
+        target_root = self.output / url_prefix.strip('/')
+        copied = 0
+        for src in source.rglob('*'):
+            # Compressed siblings are regenerated for the exported copy.
+            if not src.is_file() or src.suffix in ('.gz', '.br'):
+                continue
+            rel = src.relative_to(source)
+            key = f'{url_prefix.strip("/")}/{rel.as_posix()}'
+            stat = src.stat()
+            signature = [stat.st_size, stat.st_mtime_ns]
+            target = target_root / rel
+            if seen.get(key) == signature and target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self.write_file(target, src.read_bytes())
+            seen[key] = signature
+            copied += 1
+        return copied
+
+    def siblings(self, path):
+        return (path.with_name(path.name + '.gz'), path.with_name(path.name + '.br'))
+
+    def write_file(self, path, data):
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        # Drop stale variants first: the compressor skips ineffective ones.
+        for sibling in self.siblings(path):
+            sibling.unlink(missing_ok=True)
+        if self.compressor.should_compress(path.name):
+            self.compressor.compress(str(path))
@@ -0,0 +1,239 @@
+import hashlib
+import random
+import time
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from PIL import Image
+
+from portfolio import related, search
+from portfolio.cache import bump_content_version
+from portfolio.images import image_metadata
+from portfolio.models import (
+    Profile, Skill, Education, Certification, Interest,
+    Project, ProjectImage, ProjectTag, CareerGoal, ContactMessage, RelatedProject, RelatedToken
+)
+from portfolio.richtext import render_richtext
+
+# Every synthetic row is recognisable, so --clear never touches real content.
+SLUG_PREFIX = 'synthetic-'
+EMAIL_DOMAIN = 'example.invalid'
+MARKER = '[synthetic]'
+IMAGE_NAME = 'synthetic/placeholder.jpg'
+
+WORDS = (
+    'django python pandas dashboard analytics forecasting ledger audit budget tax invoice payroll '
+    'react api docker postgres redis pipeline model network vision report chart mobile booking '
+    'inventory student research survey statistics excel finance portfolio website data cloud'
+).split()
+TAGS = (
+    'Django', 'Python', 'Pandas', 'NumPy', 'React', 'JavaScript', 'PostgreSQL', 'SQLite', 'Docker',
+    'Redis', 'Celery', 'Tableau', 'Excel', 'Power BI', 'Flutter', 'Kotlin', 'Machine Learning',
+    'NLP', 'Computer Vision', 'REST', 'GraphQL', 'AWS', 'Accounting', 'Forecasting', 'Audit',
+)
+CATEGORIES = [code for code, _label in Project.CATEGORY_CHOICES]
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic catalogue across all models with batched bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=1000)
+        parser.add_argument('--tags-per-project', type=int, default=10)
+        parser.add_argument('--images-per-project', type=int, default=5)
+        parser.add_argument('--messages', type=int, default=10_000)
+        parser.add_argument(
+            '--small-models', type=int, default=20,
+            help='Rows for each of Skill, Education, Certification, Interest and CareerGoal.',
+        )
+        parser.add_argument('--featured-ratio', type=float, default=0.1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true', help='Delete earlier synthetic rows first.')
+        parser.add_argument('--skip-search-index', action='store_true', help='Do not rebuild the FTS index.')
+        parser.add_argument('--skip-related', action='store_true', help='Do not rebuild the related-projects table.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            self.clear()
+        if not Profile.objects.exists():
+            Profile.objects.create(name="Synthetic Profile", bio=MARKER, phone='0', email=f'me@{EMAIL_DOMAIN}')
+
+        image = self.placeholder_image()
+        self.small_models(options['small_models'])
+        self.projects(options, image)
+        self.messages(options['messages'])
+
+        if not options['skip_search_index']:
+            self.stdout.write('Rebuilding the search index...')
+            search.rebuild_index()
+        if not options['skip_related']:
+            self.stdout.write('Rebuilding the related-projects table...')
+            related.rebuild_related()
+        # bulk_create bypasses the post_save receivers.
+        bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - started:.1f}s.'))
+
+    def words(self, count):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(count))
+
+    def bulk(self, model, objects):
+        """bulk_create ``objects`` (any iterable) in batches; returns how many were created.
+
+        Only one batch is held at a time, so ``objects`` may be a generator
+        of millions of rows.
+        """
+        count, batch = 0, []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            count += len(batch)
+        return count
+
+    def clear(self):
+        self.stdout.write('Deleting earlier synthetic rows...')
+        with transaction.atomic():
+            # Children first, with raw deletes: the ORM's cascade collector
+            # would load every row into memory.
+            project_ids = Project.objects.filter(slug__startswith=SLUG_PREFIX).values('pk')
+            RelatedProject.objects.filter(
+                Q(project__in=project_ids) | Q(related__in=project_ids)
+            )._raw_delete(RelatedProject.objects.db)
+            RelatedToken.objects.filter(project__in=project_ids)._raw_delete(RelatedToken.objects.db)
+            ProjectTag.objects.filter(project__in=project_ids)._raw_delete(ProjectTag.objects.db)
+            ProjectImage.objects.filter(project__in=project_ids)._raw_delete(ProjectImage.objects.db)
+            Project.objects.filter(slug__startswith=SLUG_PREFIX)._raw_delete(Project.objects.db)
+            ContactMessage.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')._raw_delete(ContactMessage.objects.db)
+            Skill.objects.filter(name__startswith=MARKER).delete()
+            Interest.objects.filter(title__startswith=MARKER).delete()
+            Education.objects.filter(degree__startswith=MARKER).delete()
+            Certification.objects.filter(title__startswith=MARKER).delete()
+            CareerGoal.objects.filter(title__startswith=MARKER).delete()
+
+    def placeholder_image(self):
+        """One real JPEG shared by every synthetic image field, so templates can render it.
+
+        Returns its ``image_metadata()`` plus its ``name``, read back from the
+        stored file so the recorded sizes always match it.
+        """
+        if not default_storage.exists(IMAGE_NAME):
+            buffer = BytesIO()
+            Image.new('RGB', (1200, 800), (70, 110, 160)).save(buffer, format='JPEG', quality=80)
+            default_storage.save(IMAGE_NAME, ContentFile(buffer.getvalue()))
+        with default_storage.open(IMAGE_NAME) as f:
+            return {'name': IMAGE_NAME, **image_metadata(f)}
+
+    def small_models(self, count):
+        self.stdout.write(f'Creating {count} rows for each small model...')
+        rng = self.rng
+        self.bulk(Skill, (
+            Skill(name=f'{MARKER} {self.words(2)}', percentage=rng.randint(40, 100), order=i) for i in range(count)
+        ))
+        self.bulk(Education, (
+            Education(
+                degree=f'{MARKER} {self.words(3)}', institution=self.words(2), description=self.words(30),
+                start_year=rng.randint(2000, 2025), degree_level='Undergraduate', order=i,
+            )
+            for i in range(count)
+        ))
+        self.bulk(Certification, (
+            Certification(title=f'{MARKER} {self.words(3)}', issuer=self.words(2), description=self.words(30), order=i)
+            for i in range(count)
+        ))
+        self.bulk(Interest, (
+            Interest(title=f'{MARKER} {self.words(3)}', description=self.words(20), icon='bi-star', order=i)
+            for i in range(count)
+        ))
+        self.bulk(CareerGoal, (
+            CareerGoal(
+                timeframe=rng.choice(['short', 'medium', 'long']), title=f'{MARKER} {self.words(3)}',
+                goals='\n'.join(self.words(8) for _ in range(4)), order=i,
+            )
+            for i in range(count)
+        ))
+
+    def new_project(self, n, image, featured_ratio):
+        rng = self.rng
+        detailed = '\n\n'.join([
+            'Overview:', self.words(60),
+            '\n'.join(f'- {self.words(6)}' for _ in range(4)),
+            'Results:', self.words(40),
+        ])
+        return Project(
+            title=f'{self.words(3).title()} {n}',
+            slug=f'{SLUG_PREFIX}{n}',
+            category=rng.choice(CATEGORIES),
+            short_description=self.words(18)[:200],
+            description=self.words(80),
+            detailed_content=detailed,
+            # bulk_create skips Project.save(): store the rendered HTML here.
+            detailed_content_html=render_richtext(detailed),
+            detailed_content_hash=hashlib.sha256(detailed.encode()).hexdigest(),
+            tech_stack=', '.join(rng.sample(TAGS, 4)),
+            project_date=str(rng.randint(2018, 2026)),
+            thumbnail=image['name'],
+            thumbnail_width=image['width'],
+            thumbnail_height=image['height'],
+            thumbnail_placeholder=image['placeholder'],
+            thumbnail_color=image['color'],
+            featured=rng.random() < featured_ratio,
+            order=rng.randint(0, 1000),
+        )
+
+    def tag_names(self, count):
+        """``count`` distinct tag names (numbered once the fixed list runs out)."""
+        if count <= len(TAGS):
+            return self.rng.sample(TAGS, count)
+        return [f'{self.rng.choice(TAGS)} {i}' for i in range(count)]
+
+    def projects(self, options, image):
+        total = options['projects']
+        start = Project.objects.filter(slug__startswith=SLUG_PREFIX).count()
+        self.stdout.write(
+            f"Creating {total} projects with {options['tags_per_project']} tags "
+            f"and {options['images_per_project']} images each..."
+        )
+        for offset in range(0, total, self.batch_size):
+            count = min(self.batch_size, total - offset)
+            with transaction.atomic():
+                projects = Project.objects.bulk_create([
+                    self.new_project(start + offset + i, image, options['featured_ratio'])
+                    for i in range(count)
+                ])
+                self.bulk(ProjectTag, (
+                    ProjectTag(project=project, name=name)
+                    for project in projects
+                    for name in self.tag_names(options['tags_per_project'])
+                ))
+                self.bulk(ProjectImage, (
+                    ProjectImage(
+                        project=project, image=image['name'], width=image['width'], height=image['height'],
+                        placeholder=image['placeholder'], dominant_color=image['color'], order=i,
+                    )
+                    for project in projects
+                    for i in range(options['images_per_project'])
+                ))
+            self.stdout.write(f'  {offset + count}/{total}')
+
+    def messages(self, total):
+        self.stdout.write(f'Creating {total} contact messages...')
+        self.bulk(ContactMessage, (
+            ContactMessage(
+                name=self.words(2).title(), email=f'visitor{i}@{EMAIL_DOMAIN}',
+                subject=self.words(5)[:200], message=self.words(60), read=self.rng.random() < 0.7,
+            )
+            for i in range(total)
+        ))
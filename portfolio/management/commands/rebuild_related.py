@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio import related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-projects neighbour table from tags and tech stacks'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = related.rebuild_related()
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored up to {related.NEIGHBOURS} neighbours for {count} project(s) '
+            f'in {time.perf_counter() - started:.1f}s.'
+        ))
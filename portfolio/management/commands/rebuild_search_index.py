@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio import search
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text project search index from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('The search index needs SQLite (FTS5); other backends search with icontains.')
+        count = search.rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} project(s).'))
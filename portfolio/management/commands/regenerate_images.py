@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from imagekit import hashers
+
+from portfolio.cache import bump_content_version
+from portfolio.images import generate_variants
+
+# (model label, field name) of every ProcessedImageField.
+IMAGE_FIELDS = [
+    ('portfolio.Profile', 'profile_image'),
+    ('portfolio.Profile', 'hero_image'),
+    ('portfolio.Project', 'thumbnail'),
+    ('portfolio.ProjectImage', 'image'),
+]
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def spec_hash(field):
+    """Fingerprint of the processors/format/options a field applies on upload."""
+    spec = field.get_spec(source=None)
+    return hashers.pickle([spec.processors, spec.format, spec.options, spec.autoconvert])
+
+
+def _init_worker():
+    # A no-op under fork; needed when workers are spawned.
+    django.setup()
+
+
+def _process(model_label, field_name, name, previous):
+    """Reprocess one stored image in a worker process.
+
+    Returns ``(name, status, state, bytes_in, bytes_out)`` where status is
+    ``'skipped'``, ``'processed'`` or ``'missing'``. With a content-hashed
+    storage the result is saved under a new name, returned in place of
+    ``name``.
+    """
+    field = apps.get_model(model_label)._meta.get_field(field_name)
+    path = default_storage.path(name)
+    if not os.path.exists(path):
+        return name, 'missing', None, 0, 0
+
+    current_spec = spec_hash(field)
+    source_hash = _file_hash(path)
+    if previous and previous == {'spec': current_spec, 'hash': source_hash}:
+        return name, 'skipped', previous, 0, 0
+
+    bytes_in = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        content = field.get_spec(source=File(f, name=name)).generate()
+
+    if getattr(default_storage, 'hashes', lambda name: False)(name):
+        # Hashed files are served as immutable: never rewrite one in place.
+        name = default_storage.save(name, content)
+        path = default_storage.path(name)
+        generate_variants(field.attr_class(None, field, name))
+    else:
+        tmp = f'{path}.regen'
+        with open(tmp, 'wb') as out:
+            out.write(content.read())
+        os.replace(tmp, path)
+        # The variants are named after the source, so they must be rebuilt in place.
+        generate_variants(field.attr_class(None, field, name), force=True)
+    return name, 'processed', {'spec': current_spec, 'hash': _file_hash(path)}, bytes_in, os.path.getsize(path)
+
+
+class Command(BaseCommand):
+    help = 'Reprocess every stored image with the current field specs, in parallel (resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes.')
+        parser.add_argument(
+            '--state-file', default=None,
+            help='Progress/state file (default: MEDIA_ROOT/.regenerate-images.json).',
+        )
+        parser.add_argument('--force', action='store_true', help='Ignore the state file and reprocess everything.')
+        parser.add_argument(
+            '--model', action='append', dest='models', metavar='LABEL',
+            help='Only this model, e.g. portfolio.ProjectImage (repeatable).',
+        )
+        parser.add_argument('--checkpoint', type=int, default=50, help='Save the state file every N results.')
+
+    def handle(self, *args, **options):
+        try:
+            default_storage.path('')
+        except NotImplementedError:
+            raise CommandError('regenerate_images needs a local filesystem media storage.')
+
+        state_path = options['state_file'] or os.path.join(settings.MEDIA_ROOT, '.regenerate-images.json')
+        state = {} if options['force'] else self.load_state(state_path)
+
+        tasks = []
+        for model_label, field_name in IMAGE_FIELDS:
+            if options['models'] and model_label not in options['models']:
+                continue
+            model = apps.get_model(model_label)
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True).distinct()
+            )
+            tasks.extend((model_label, field_name, name) for name in names)
+
+        total = len(tasks)
+        self.stdout.write(f'{total} image(s) to check with {options["workers"]} worker(s)...')
+        counts = {'processed': 0, 'skipped': 0, 'missing': 0, 'failed': 0}
+        bytes_in = 0
+        processed = set()
+        started = time.perf_counter()
+
+        try:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+                futures = {pool.submit(_process, *task, state.get(task[2])): task for task in tasks}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    model_label, field_name, name = futures[future]
+                    try:
+                        stored, status, file_state, size_in, _size_out = future.result()
+                    except Exception as e:
+                        counts['failed'] += 1
+                        self.stderr.write(f'  {name}: {e}')
+                    else:
+                        if stored != name:
+                            self.rename(model_label, field_name, name, stored)
+                            name = stored
+                        counts[status] += 1
+                        bytes_in += size_in
+                        if status == 'processed':
+                            processed.add(name)
+                        if file_state:
+                            state[name] = file_state
+                    if done % options['checkpoint'] == 0 or done == total:
+                        self.save_state(state_path, state)
+                        elapsed = time.perf_counter() - started
+                        self.stdout.write(
+                            f'  {done}/{total} ({done / elapsed:.1f} files/s, '
+                            f'{bytes_in / elapsed / (1024 * 1024):.1f} MB/s read)'
+                        )
+        finally:
+            # Whatever finished is kept, so an interrupted run resumes from here.
+            self.save_state(state_path, state)
+
+        refreshed = self.refresh_metadata(options['models'], processed)
+        if counts['processed'] or refreshed:
+            bump_content_version()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {elapsed:.1f}s: {counts["processed"]} processed, {counts["skipped"]} unchanged, '
+            f'{counts["missing"]} missing, {counts["failed"]} failed, {refreshed} metadata row(s) updated.'
+        ))
+
+    def rename(self, model_label, field_name, old, new):
+        """Point the rows at a reprocessed file's new hashed name.
+
+        The old file is left in place for pages that still reference it.
+        """
+        model = apps.get_model(model_label)
+        now = timezone.now()
+        rows = model.objects.filter(**{field_name: old})
+        if model_label == 'portfolio.ProjectImage':
+            # The gallery fragment is keyed on the parent project's updated_at.
+            apps.get_model('portfolio.Project').objects.filter(
+                pk__in=rows.values('project_id')
+            ).update(updated_at=now)
+        rows.update(updated_at=now, **{field_name: new})
+
+    def refresh_metadata(self, models, processed):
+        """Recompute image metadata for reprocessed files and rows that never had any."""
+        refreshed = 0
+        for model_label, field_name in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            field_maps = getattr(model, 'image_metadata_fields', {})
+            if (models and model_label not in models) or field_name not in field_maps:
+                continue
+            width_field = field_maps[field_name]['width']
+            rows = model.objects.exclude(**{field_name: ''}).filter(
+                Q(**{f'{field_name}__in': processed}) | Q(**{f'{width_field}__isnull': True})
+            )
+            for instance in rows.iterator():
+                try:
+                    changed = instance.refresh_image_metadata(field_name)
+                except OSError as e:
+                    self.stderr.write(f'  {getattr(instance, field_name).name}: {e}')
+                    continue
+                if changed:
+                    now = timezone.now()
+                    model.objects.filter(pk=instance.pk).update(
+                        updated_at=now, **{name: getattr(instance, name) for name in changed}
+                    )
+                    if model_label == 'portfolio.ProjectImage':
+                        # The gallery fragment is keyed on the parent project's updated_at.
+                        apps.get_model('portfolio.Project').objects.filter(
+                            pk=instance.project_id
+                        ).update(updated_at=now)
+                    refreshed += 1
+        return refreshed
+
+    def load_state(self, path):
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_state(self, path, state):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portfolio.cache import bump_content_version
+from portfolio.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Backfill the stored richtext HTML of projects whose detailed_content changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-render every project, e.g. after changing the richtext renderer.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        fields = ['detailed_content_html', 'detailed_content_hash', 'updated_at']
+        batch, updated = [], 0
+        projects = Project.objects.only('pk', 'detailed_content', *fields).order_by('pk')
+        for project in projects.iterator(chunk_size=options['batch_size']):
+            if project.refresh_detailed_content_html(force=options['force']):
+                # bulk_update does not apply auto_now.
+                project.updated_at = timezone.now()
+                batch.append(project)
+            if len(batch) >= options['batch_size']:
+                Project.objects.bulk_update(batch, fields)
+                updated += len(batch)
+                batch = []
+        if batch:
+            Project.objects.bulk_update(batch, fields)
+            updated += len(batch)
+
+        # bulk_update bypasses the post_save receivers.
+        if updated:
+            bump_content_version()
+        self.stdout.write(self.style.SUCCESS(f'Rendered richtext for {updated} project(s).'))
@@ -0,0 +1,235 @@
+"""
+Uploaded media: content-hashed names and long-lived caching.
+
+``HashedMediaStorage`` stores uploads under ``HASHED_PREFIXES`` as
+``name.<hash>.ext``, where the hash is taken from the stored bytes, so a
+file never changes behind its URL: a new upload (or a reprocessed image)
+gets a new name. Identical uploads share one file. Compressible types (the
+CV PDF, SVGs) also get ``.br``/``.gz`` siblings written next to them.
+
+``serve`` answers ``MEDIA_URL`` in every environment. Hashed files, and the
+imagekit variants derived from them, are sent with a one-year ``immutable``
+``Cache-Control``; anything else (files uploaded before hashing, fixtures)
+must be revalidated through its ETag. Single byte ranges are supported so
+PDF viewers can fetch the CV page by page.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+import brotli
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+# upload_to directories whose files get content-hashed names.
+HASHED_PREFIXES = ('profile/', 'hero/', 'projects/', 'docs/')
+HASH_LENGTH = 12
+# imagekit writes the variants here, under a directory named after the source.
+VARIANT_PREFIX = 'CACHE/images/'
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+
+COMPRESSIBLE_TYPES = frozenset({'application/pdf', 'image/svg+xml', 'application/json'})
+# (Content-Encoding, file suffix), preferred first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# A sibling is only kept if it saves at least this much.
+MIN_COMPRESSION_RATIO = 0.95
+
+_HASHED_RE = re.compile(rf'\.[0-9a-f]{{{HASH_LENGTH}}}$')
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_Q_ZERO_RE = re.compile(r'^q=0(?:\.0{0,3})?$')
+
+
+def _split(name):
+    """``(dirname, stem, ext)`` with any previous hash removed from the stem."""
+    dirname, basename = posixpath.split(name)
+    stem, ext = posixpath.splitext(basename)
+    return dirname, _HASHED_RE.sub('', stem), ext
+
+
+def is_hashed(name):
+    """Whether ``name`` carries a content hash (or is a variant of such a file)."""
+    if name.startswith(VARIANT_PREFIX):
+        # CACHE/images/projects/shot.<hash>/<spec hash>.webp
+        source = posixpath.dirname(name[len(VARIANT_PREFIX):])
+        return source.startswith(HASHED_PREFIXES) and bool(_HASHED_RE.search(source))
+    return name.startswith(HASHED_PREFIXES) and bool(_HASHED_RE.search(posixpath.splitext(name)[0]))
+
+
+def content_type(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """FileSystemStorage that names uploads after their content."""
+
+    def hashes(self, name):
+        return name.startswith(HASHED_PREFIXES)
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        dirname, stem, ext = _split(name)
+        return posixpath.join(dirname, f'{stem}.{digest.hexdigest()[:HASH_LENGTH]}{ext}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if self.hashes(name):
+            name = self.hashed_name(name, content)
+            if self.exists(name):
+                # Same bytes, same name: nothing to write.
+                return name
+        name = super().save(name, content, max_length)
+        if self.hashes(name):
+            self.compress(name)
+        return name
+
+    def compress(self, name):
+        """Write ``.br``/``.gz`` siblings of ``name`` when its type compresses well."""
+        if content_type(name) not in COMPRESSIBLE_TYPES:
+            return
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for encoding, suffix in ENCODINGS:
+            compressed = brotli.compress(data) if encoding == 'br' else gzip.compress(data, 9, mtime=0)
+            if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+                tmp = f'{path}{suffix}.tmp'
+                with open(tmp, 'wb') as out:
+                    out.write(compressed)
+                os.replace(tmp, f'{path}{suffix}')
+
+    def delete(self, name):
+        super().delete(name)
+        for _encoding, suffix in ENCODINGS:
+            super().delete(f'{name}{suffix}')
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if not _Q_ZERO_RE.match(params.replace(' ', '')):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _byte_range(header, size):
+    """The inclusive ``(start, end)`` asked for by a Range header, or None.
+
+    Multiple ranges and malformed headers are ignored (the whole file is
+    sent). Raises ValueError when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-N: the final N bytes.
+        if not int(last) or not size:
+            raise ValueError('unsatisfiable range')
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError('unsatisfiable range')
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class _FileSlice:
+    """Read-only view of ``length`` bytes of ``file`` from ``start``."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+@require_safe
+def serve(request, path):
+    """Serve an uploaded file from MEDIA_ROOT with caching, ranges and precompression."""
+    name = posixpath.normpath(path).lstrip('/')
+    if any(part.startswith('.') for part in name.split('/')):
+        # State files and the like, e.g. .regenerate-images.json.
+        raise Http404
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    mime_type = content_type(name)
+    encoding = None
+    # Ranges always address the identity encoding.
+    if mime_type in COMPRESSIBLE_TYPES and 'Range' not in request.headers:
+        accepted = _accepted_encodings(request)
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(fullpath + suffix):
+                encoding, fullpath = coding, fullpath + suffix
+                break
+
+    stat = os.stat(fullpath)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = _file_response(request, fullpath, stat, etag, mime_type, encoding)
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE if is_hashed(name) else REVALIDATE
+    if mime_type in COMPRESSIBLE_TYPES:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _file_response(request, fullpath, stat, etag, mime_type, encoding):
+    byte_range = None
+    # A stale If-Range (the file changed since the first part) means "send it all".
+    if 'Range' in request.headers and request.headers.get('If-Range', etag) in (etag, http_date(stat.st_mtime)):
+        try:
+            byte_range = _byte_range(request.headers['Range'], stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(
+            _FileSlice(open(fullpath, 'rb'), start, end - start + 1), status=206, content_type=mime_type,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    else:
+        response = FileResponse(open(fullpath, 'rb'), content_type=mime_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    else:
+        response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
@@ -0,0 +1,122 @@
+"""
+Per-request SQL instrumentation.
+
+``QueryInstrumentationMiddleware`` wraps every database connection for the
+duration of a request and records how many queries ran, how long they took
+and which statements were repeated (the usual sign of an N+1 loop).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Literals are replaced so the same statement with different parameters
+# (e.g. one tag lookup per project) shares a fingerprint.
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN \((?:\s*(?:%s|\?|\d+)\s*,?)+\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def query_fingerprint(sql):
+    """Normalise ``sql`` so repeated statements compare equal regardless of parameters."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    """Execute wrapper collecting count, time and fingerprints of the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[query_fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        """``{fingerprint: times}`` for every statement run more than once."""
+        return {sql: n for sql, n in self.fingerprints.items() if n > 1}
+
+
+class QueryInstrumentationMiddleware:
+    """Log (and optionally expose as headers) the SQL cost of every request.
+
+    The summary is logged at DEBUG, or at WARNING when more than
+    ``QUERY_DUPLICATES_WARNING`` statements repeat an earlier one.
+
+    Headers are only added when ``QUERY_STATS_HEADERS`` is true (it defaults
+    to ``DEBUG``), so production responses do not advertise them:
+
+    - ``X-Query-Count``: number of queries
+    - ``X-Query-Duplicates``: queries that repeated an earlier statement
+    - ``Server-Timing: db;dur=<ms>`` for the browser's network panel
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = QueryStats()
+        with self.instrument(stats):
+            response = self.get_response(request)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        # Connections are per thread and the async ORM queries from the
+        # thread-sensitive sync_to_async thread, not this one: the wrappers
+        # must be installed (and removed) on that thread's connections.
+        stack = await sync_to_async(self.instrument)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, stats)
+
+    def instrument(self, stats):
+        """Wrap this thread's connections with ``stats``; closing the returned stack unwraps them."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        return stack
+
+    def report(self, request, response, stats):
+        duplicates = stats.duplicates
+        repeated = sum(n - 1 for n in duplicates.values())
+        duration_ms = stats.duration * 1000
+        log = logger.warning if repeated > settings.QUERY_DUPLICATES_WARNING else logger.debug
+        log(f"{request.method} {request.path} {response.status_code}: {stats.count} queries "
+            f"in {duration_ms:.1f}ms, {repeated} duplicate(s)")
+        for sql, n in duplicates.items():
+            logger.debug(f"  {n}x {sql}")
+
+        if settings.QUERY_STATS_HEADERS:
+            response['X-Query-Count'] = str(stats.count)
+            response['X-Query-Duplicates'] = str(repeated)
+            response['Server-Timing'] = f'db;dur={duration_ms:.1f};desc="{stats.count} queries"'
+        return response
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    # FTS5 is SQLite-only; portfolio.search falls back to icontains elsewhere.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS portfolio_project_fts USING fts5("
+        "title, short_description, description, detailed_content, tech_stack, tags, "
+        "tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO portfolio_project_fts "
+        "(rowid, title, short_description, description, detailed_content, tech_stack, tags) "
+        "SELECT p.id, p.title, p.short_description, p.description, p.detailed_content, p.tech_stack, "
+        "COALESCE((SELECT group_concat(t.name, ' ') FROM portfolio_projecttag t WHERE t.project_id = p.id), '') "
+        "FROM portfolio_project p"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS portfolio_project_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
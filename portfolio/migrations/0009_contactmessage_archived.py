@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_relatedproject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
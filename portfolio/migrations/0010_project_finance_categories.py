@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_contactmessage_archived'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='category',
+            field=models.CharField(choices=[('AI', 'AI & Data Science'), ('Web', 'Web Development'), ('Mobile', 'Mobile Development'), ('Finance', 'Finance'), ('Investment', 'Investment'), ('Accounting', 'Accounting'), ('Other', 'Other')], max_length=20),
+        ),
+    ]
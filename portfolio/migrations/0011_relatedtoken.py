@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_tokens(apps, schema_editor):
+    # The same normalisation as portfolio.related._tokens(), frozen here.
+    Project = apps.get_model('portfolio', 'Project')
+    ProjectTag = apps.get_model('portfolio', 'ProjectTag')
+    RelatedToken = apps.get_model('portfolio', 'RelatedToken')
+    tokens = {
+        (project_id, 'tag', name.strip().lower())
+        for project_id, name in ProjectTag.objects.values_list('project_id', 'name') if name.strip()
+    }
+    for pk, tech_stack in Project.objects.values_list('pk', 'tech_stack'):
+        tokens.update((pk, 'tech', entry.strip().lower()) for entry in tech_stack.split(',') if entry.strip())
+    RelatedToken.objects.bulk_create(
+        [RelatedToken(project_id=pk, kind=kind, token=token) for pk, kind, token in tokens], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_project_finance_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tag', 'Tag'), ('tech', 'Tech stack')], max_length=4)),
+                ('token', models.CharField(max_length=200)),
+                ('project', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='related_tokens', to='portfolio.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'token'], name='relatedtoken_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project', 'kind', 'token'), name='relatedtoken_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_tokens, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,55 @@
+import hashlib
+import logging
+
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from imagekit.models import ProcessedImageField
 from imagekit.processors import ResizeToFill, ResizeToFit
 
-class Profile(models.Model):
+from .images import refresh_image_metadata
+from .richtext import render_richtext
+
+logger = logging.getLogger(__name__)
+
+
+class ImageMetadataMixin:
+    """Keep intrinsic size, blur placeholder and dominant colour of image fields.
+
+    Subclasses set ``image_metadata_fields``: image field name → {metadata key →
+    model field}; a map may keep only some keys (e.g. ``width`` and ``height``).
+    The values are computed from the stored, processed file right after an
+    upload is saved.
+    """
+    image_metadata_fields = {}
+
+    def save(self, *args, **kwargs):
+        pending = []
+        for field_name, field_map in self.image_metadata_fields.items():
+            field_file = getattr(self, field_name)
+            uploaded = bool(field_file) and not field_file._committed
+            cleared = not field_file and getattr(self, field_map['width']) is not None
+            if uploaded or cleared:
+                pending.append(field_name)
+        super().save(*args, **kwargs)
+        for field_name in pending:
+            self.save_image_metadata(field_name)
+
+    def refresh_image_metadata(self, field_name):
+        """Recompute the metadata of ``field_name`` from the stored file; returns the changed field names."""
+        return refresh_image_metadata(self, field_name, self.image_metadata_fields[field_name])
+
+    def save_image_metadata(self, field_name):
+        try:
+            changed = self.refresh_image_metadata(field_name)
+        except OSError as e:
+            logger.warning(f"Could not read {getattr(self, field_name).name}: {e}")
+            return
+        if changed:
+            # A plain UPDATE: the post_save of this save() already went out.
+            type(self).objects.filter(pk=self.pk).update(**{name: getattr(self, name) for name in changed})
+
+class Profile(ImageMetadataMixin, models.Model):
     name = models.CharField(max_length=100, default="Fred Kaloki")
     title = models.CharField(max_length=200, default="BCom Student, CPA Candidate, Data Science Enthusiast")
     bio = models.TextField()
@@ -27,6 +73,12 @@ class Profile(models.Model):
         options={'quality': 80},
         blank=True
     )
+    # Filled from the stored images (see ImageMetadataMixin), so rendering
+    # the variants never has to open the files for their size.
+    profile_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    profile_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    hero_image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    hero_image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     cv_file = models.FileField(upload_to='docs/', blank=True)
     
     # Social Links
@@ -36,6 +88,11 @@ class Profile(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    image_metadata_fields = {
+        'profile_image': {'width': 'profile_image_width', 'height': 'profile_image_height'},
+        'hero_image': {'width': 'hero_image_width', 'height': 'hero_image_height'},
+    }
     
     class Meta:
         verbose_name = "Profile"
@@ -57,6 +114,7 @@ class Skill(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order']
@@ -78,6 +136,7 @@ class Education(models.Model):
         ('Postgraduate', 'Postgraduate'),
     ])
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-start_year']
@@ -91,6 +150,7 @@ class Certification(models.Model):
     description = models.TextField()
     is_current = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order']
@@ -103,6 +163,7 @@ class Interest(models.Model):
     description = models.TextField()
     icon = models.CharField(max_length=50, help_text="Bootstrap icon class (e.g., bi-graph-up-arrow)")
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order']
@@ -110,11 +171,17 @@ class Interest(models.Model):
     def __str__(self):
         return self.title
 
-class Project(models.Model):
+class Project(ImageMetadataMixin, models.Model):
+    # Finance, Investment and Accounting are the categories my_details has
+    # always created its projects with; the content sync validates choices,
+    # so they are listed to keep syncing those projects unchanged.
     CATEGORY_CHOICES = [
         ('AI', 'AI & Data Science'),
         ('Web', 'Web Development'),
         ('Mobile', 'Mobile Development'),
+        ('Finance', 'Finance'),
+        ('Investment', 'Investment'),
+        ('Accounting', 'Accounting'),
         ('Other', 'Other'),
     ]
     
@@ -124,6 +191,9 @@ class Project(models.Model):
     short_description = models.CharField(max_length=200)
     description = models.TextField()
     detailed_content = models.TextField()
+    # Rendered once from detailed_content on save (see refresh_detailed_content_html)
+    detailed_content_html = models.TextField(blank=True, editable=False)
+    detailed_content_hash = models.CharField(max_length=64, blank=True, editable=False)
     
     # Project Info
     tech_stack = models.CharField(max_length=200)
@@ -141,19 +211,63 @@ class Project(models.Model):
         blank=True, 
         null=True
     )
+    # Filled from the stored thumbnail (see ImageMetadataMixin)
+    thumbnail_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumbnail_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumbnail_placeholder = models.TextField(blank=True, editable=False)
+    thumbnail_color = models.CharField(max_length=7, blank=True, editable=False)
 
     # Display
     featured = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+
+    image_metadata_fields = {
+        'thumbnail': {
+            'width': 'thumbnail_width',
+            'height': 'thumbnail_height',
+            'placeholder': 'thumbnail_placeholder',
+            'color': 'thumbnail_color',
+        },
+    }
+
     class Meta:
         ordering = ['order', '-created_at']
+        # One per access path, all in the gallery/API sort order (with the
+        # -id tie-breaker) so rows come off the index already sorted.
+        indexes = [
+            models.Index(fields=['order', '-created_at', '-id'], name='project_ordering_idx'),
+            # The home gallery only ever lists featured projects.
+            models.Index(
+                fields=['order', '-created_at', '-id'], name='project_featured_idx',
+                condition=models.Q(featured=True),
+            ),
+            # Related projects and ?category= in the API.
+            models.Index(fields=['category', 'order', '-created_at', '-id'], name='project_category_idx'),
+        ]
     
     def __str__(self):
         return self.title
 
-class ProjectImage(models.Model):
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.refresh_detailed_content_html() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'detailed_content_html', 'detailed_content_hash'}
+        super().save(*args, **kwargs)
+
+    def refresh_detailed_content_html(self, force=False):
+        """Re-render detailed_content_html when the source text has changed.
+        Returns True if the stored HTML was updated (the instance is not saved).
+        """
+        digest = hashlib.sha256(self.detailed_content.encode()).hexdigest()
+        if digest == self.detailed_content_hash and not force:
+            return False
+        self.detailed_content_html = render_richtext(self.detailed_content)
+        self.detailed_content_hash = digest
+        return True
+
+class ProjectImage(ImageMetadataMixin, models.Model):
     project = models.ForeignKey(Project, related_name='images', on_delete=models.CASCADE)
     # Gallery images
     image = ProcessedImageField(
@@ -162,10 +276,28 @@ class ProjectImage(models.Model):
         format='JPEG',
         options={'quality': 85}
     )
+    # Filled from the stored image (see ImageMetadataMixin)
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)
+    dominant_color = models.CharField(max_length=7, blank=True, editable=False)
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    image_metadata_fields = {
+        'image': {
+            'width': 'width',
+            'height': 'height',
+            'placeholder': 'placeholder',
+            'color': 'dominant_color',
+        },
+    }
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['project', 'order'], name='projectimage_project_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.project.title} — Image {self.order}"
@@ -173,10 +305,51 @@ class ProjectImage(models.Model):
 class ProjectTag(models.Model):
     project = models.ForeignKey(Project, related_name='tags', on_delete=models.CASCADE)
     name = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.name
 
+class RelatedProject(models.Model):
+    """One of a project's precomputed nearest neighbours (see portfolio.related)."""
+    # The (project, rank) constraint below doubles as the lookup index.
+    project = models.ForeignKey(Project, related_name='neighbours', on_delete=models.CASCADE, db_index=False)
+    related = models.ForeignKey(Project, related_name='neighbour_of', on_delete=models.CASCADE)
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['project', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'rank'], name='relatedproject_project_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} → {self.related_id} ({self.score:.2f})"
+
+class RelatedToken(models.Model):
+    """A normalised tag or tech-stack entry of a project: the inverted index of portfolio.related."""
+    KIND_CHOICES = [
+        ('tag', 'Tag'),
+        ('tech', 'Tech stack'),
+    ]
+
+    # The unique constraint below (project first) doubles as the per-project index.
+    project = models.ForeignKey(Project, related_name='related_tokens', on_delete=models.CASCADE, db_index=False)
+    kind = models.CharField(max_length=4, choices=KIND_CHOICES)
+    token = models.CharField(max_length=200)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'token'], name='relatedtoken_lookup_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'kind', 'token'], name='relatedtoken_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id}: {self.kind} {self.token}"
+
 class CareerGoal(models.Model):
     TIMEFRAME_CHOICES = [
         ('short', '1-2 Years'),
@@ -188,6 +361,7 @@ class CareerGoal(models.Model):
     title = models.CharField(max_length=100)
     goals = models.TextField(help_text="Enter each goal on a new line")
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order']
@@ -205,9 +379,50 @@ class ContactMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
+    archived = models.BooleanField(default=False)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='contact_created_idx'),
+            # The inbox view: unread messages, newest first.
+            models.Index(fields=['-created_at'], name='contact_unread_idx', condition=models.Q(read=False)),
+        ]
     
     def __str__(self):
-        return f"{self.name} - {self.subject}"
\ No newline at end of file
+        return f"{self.name} - {self.subject}"
+
+class OutboxEmail(models.Model):
+    """An email waiting to be delivered by the ``send_outbox`` worker."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead letter'),
+    ]
+
+    contact_message = models.ForeignKey(
+        ContactMessage, related_name='outbox_emails',
+        on_delete=models.SET_NULL, null=True, blank=True
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Set by the worker whose claim leased the row (see portfolio.outbox.claim_batch).
+    lease_token = models.UUIDField(null=True, blank=True, editable=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = "Outbox email"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.to} - {self.subject}"
@@ -0,0 +1,129 @@
+"""
+Transactional outbox for contact-form emails.
+
+The view only inserts ``OutboxEmail`` rows (in the same transaction as the
+``ContactMessage``); the ``send_outbox`` management command delivers them
+later over one SMTP connection per batch.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 6 * 60 * 60
+# A claimed batch is hidden from other workers for this long.
+LEASE_SECONDS = 5 * 60
+
+
+def queue_notification_emails(instance):
+    """Queue the admin notification and the visitor's acknowledgement."""
+    return OutboxEmail.objects.bulk_create([
+        # Email to Admin
+        OutboxEmail(
+            contact_message=instance,
+            subject=f'Portfolio Contact: {instance.subject}',
+            body=f"From: {instance.name}\nEmail: {instance.email}\n\n{instance.message}",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=settings.CONTACT_EMAIL,
+        ),
+        # Email to User
+        OutboxEmail(
+            contact_message=instance,
+            subject=f'Thank you for contacting me - {instance.subject}',
+            body=f"Hi {instance.name},\n\nI received your message. I'll get back to you shortly.",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=instance.email,
+        ),
+    ])
+
+
+def backoff_delay(attempts):
+    """Exponential backoff: 30s, 60s, 120s, ... capped at six hours."""
+    return timedelta(seconds=min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def _due_ids(batch_size, now):
+    return list(
+        OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk').values_list('pk', flat=True)[:batch_size]
+    )
+
+
+def claim_batch(batch_size):
+    """Lease up to ``batch_size`` due emails so concurrent workers skip them.
+
+    The lease is one conditional UPDATE that only matches rows still due,
+    so of two workers that read the same ids only the first gets them: the
+    rows carrying this claim's token are the batch. No row lock is needed,
+    which SQLite does not have (it ignores ``select_for_update``).
+    """
+    now = timezone.now()
+    ids = _due_ids(batch_size, now)
+    if not ids:
+        return []
+    token = uuid.uuid4()
+    OutboxEmail.objects.filter(pk__in=ids, status='pending', next_attempt_at__lte=now).update(
+        next_attempt_at=now + timedelta(seconds=LEASE_SECONDS), lease_token=token,
+    )
+    return list(OutboxEmail.objects.filter(pk__in=ids, lease_token=token).order_by('next_attempt_at', 'pk'))
+
+
+def record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+        logger.error(f"Outbox email {email.pk} dead-lettered after {email.attempts} attempts: {error}")
+    else:
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+        logger.warning(f"Outbox email {email.pk} failed (attempt {email.attempts}): {error}")
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def deliver_batch(batch_size=50, max_attempts=MAX_ATTEMPTS):
+    """Send one batch of due emails over a single connection.
+
+    Returns ``(sent, failed)``; ``(0, 0)`` means the queue had nothing due.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        for email in batch:
+            record_failure(email, e, max_attempts)
+        return 0, len(batch)
+
+    try:
+        for email in batch:
+            try:
+                EmailMessage(
+                    email.subject, email.body, email.from_email or None, [email.to],
+                    connection=connection,
+                ).send()
+            except Exception as e:
+                record_failure(email, e, max_attempts)
+                failed += 1
+            else:
+                email.status = 'sent'
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,151 @@
+"""
+Keyset (seek) pagination, and an admin paginator without ``COUNT(*)``.
+
+Instead of ``OFFSET n`` (which makes the database walk and discard every
+earlier row) each page starts right after the sort key of the last row of
+the previous page. The position travels as an opaque cursor: the sort key
+values, JSON-encoded and base64'd.
+
+``EstimatedCountPaginator`` is for admin changelists over large tables,
+where an exact count scans every row on each page load.
+"""
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, count):
+    """Return the ``count`` sort key values stored in ``token``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor.') from e
+    if not isinstance(values, list) or len(values) != count:
+        raise InvalidCursor('Malformed cursor.')
+    return values
+
+
+def parse_ordering(ordering):
+    """``['order', '-created_at']`` → ``[('order', False), ('created_at', True)]``."""
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def keyset_filter(model, ordering, values):
+    """``Q`` selecting the rows strictly after ``values`` in ``ordering``.
+
+    For ``(a, -b, -id)`` that is ``a > x OR (a = x AND b < y) OR (a = x AND b = y AND id < z)``;
+    every field must be non-null and the last one unique.
+    """
+    keys = parse_ordering(ordering)
+    values = [model._meta.get_field(name).to_python(value) for (name, _desc), value in zip(keys, values)]
+    branches = []
+    for i, (name, descending) in enumerate(keys):
+        equal = {keys[j][0]: values[j] for j in range(i)}
+        branches.append(Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': values[i]}))
+    return reduce(or_, branches)
+
+
+def keyset_page(queryset, ordering, cursor=None, limit=20):
+    """Return ``(rows, next_cursor)`` for the page starting after ``cursor``.
+
+    ``ordering`` must end with a unique field (usually ``-id``/``id``) so that
+    rows sharing the other sort values are neither skipped nor repeated.
+    ``next_cursor`` is None on the last page. Works on model instances and on
+    ``.values()`` dicts.
+    """
+    keys = parse_ordering(ordering)
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        try:
+            queryset = queryset.filter(keyset_filter(queryset.model, ordering, values))
+        except (ValidationError, ValueError, TypeError) as e:
+            raise InvalidCursor('Malformed cursor.') from e
+
+    # One extra row tells whether there is a next page.
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    get = last.get if isinstance(last, dict) else lambda name: getattr(last, name)
+    return rows, encode_cursor([get(name) for name, _desc in keys])
+
+
+def estimate_row_count(model, using='default'):
+    """The table's row count from the database's statistics, or None.
+
+    PostgreSQL and MySQL keep an estimate in their catalogues. SQLite has one
+    only after ``ANALYZE``; otherwise the largest rowid is used, which is
+    exact until rows get deleted.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        'postgresql': ('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table]),
+        'mysql': (
+            'SELECT table_rows FROM information_schema.tables '
+            'WHERE table_schema = DATABASE() AND table_name = %s', [table],
+        ),
+        'sqlite': ('SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL', [table]),
+    }
+    if connection.vendor not in queries:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(*queries[connection.vendor])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # No sqlite_stat1 table before the first ANALYZE.
+        row = None
+    if row and row[0] is not None:
+        estimate = int(str(row[0]).split()[0])
+        # PostgreSQL reports -1 for a table that was never analysed.
+        if estimate >= 0:
+            return estimate
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more than ``exact_limit + 1`` rows.
+
+    Small results get their exact count from a ``LIMIT``-ed subquery. Past
+    ``exact_limit``, an unfiltered queryset reports the table estimate of
+    ``estimate_row_count()``; a filtered one reports ``exact_limit + 1``,
+    so its later pages are reached through the filters rather than paging.
+    Meant for ``ModelAdmin.paginator`` with ``show_full_result_count = False``.
+    """
+
+    exact_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        bounded = queryset.order_by()[:self.exact_limit + 1].count()
+        if bounded <= self.exact_limit or queryset.query.has_filters():
+            return bounded
+        estimate = estimate_row_count(queryset.model, queryset.db)
+        return max(bounded, estimate or 0)
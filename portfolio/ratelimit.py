@@ -0,0 +1,241 @@
+"""
+Token-bucket rate limiting for contact-form submissions.
+
+A bucket holds ``capacity`` tokens and refills continuously over ``period``
+seconds (``settings.CONTACT_RATE_LIMITS``, e.g. ``'5/3600'``). A submission
+takes one token from the client IP's bucket and then one from the email
+address's; an empty bucket gets a 429 before the form is validated or the
+database is touched.
+
+The state is one cache entry per key holding the bucket's "theoretical
+arrival time" (GCRA, the timestamp form of a token bucket) and its
+allowed/rejected counters, so every worker process sharing the cache shares
+the limits. Each process also remembers the keys it has just rejected and
+until when, and answers their retries without a cache round trip; those
+rejections are added to the counters on the key's next write.
+
+Reads and writes are not atomic: concurrent submissions for one key in two
+processes may both take the last token. That is fine for load shedding.
+"""
+import hashlib
+import ipaddress
+import math
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+RATELIMIT_CACHE_PREFIX = 'portfolio:ratelimit'
+INDEX_KEY = f'{RATELIMIT_CACHE_PREFIX}:keys'
+# How long a key's counters outlive its last hit.
+STATS_TIMEOUT = 60 * 60 * 24
+# Keys listed in the admin, most recent first.
+MAX_TRACKED_KEYS = 1000
+# Bound on the per-process fast path.
+MAX_BLOCKED_KEYS = 10000
+
+REJECTED_MESSAGE = 'Too many messages. Please try again later.'
+
+Decision = namedtuple('Decision', 'allowed remaining retry_after')
+
+# {cache key: (blocked until, rejections not yet in the cache)}, per process.
+_blocked = {}
+
+
+def parse_rate(rate):
+    """``'5/3600'`` -> ``(5, 3600.0)``: five tokens, refilled over an hour."""
+    capacity, _, period = str(rate).partition('/')
+    try:
+        capacity, period = int(capacity), float(period)
+    except ValueError:
+        raise ValueError(f'Invalid rate {rate!r}; expected "<tokens>/<seconds>".')
+    if capacity < 1 or period <= 0:
+        raise ValueError(f'Invalid rate {rate!r}; expected "<tokens>/<seconds>".')
+    return capacity, period
+
+
+def _remember(cache_key, until):
+    if len(_blocked) >= MAX_BLOCKED_KEYS:
+        now = time.time()
+        for key in [key for key, (blocked_until, _pending) in _blocked.items() if blocked_until <= now]:
+            del _blocked[key]
+        if len(_blocked) >= MAX_BLOCKED_KEYS:
+            _blocked.clear()
+    pending = _blocked.get(cache_key, (0, 0))[1]
+    _blocked[cache_key] = (until, pending)
+
+
+def _track(cache_key, now):
+    """Add a new key to the index the admin lists."""
+    index = cache.get(INDEX_KEY) or {}
+    index[cache_key] = now
+    fresh = sorted(
+        ((seen, key) for key, seen in index.items() if seen > now - STATS_TIMEOUT), reverse=True,
+    )[:MAX_TRACKED_KEYS]
+    cache.set(INDEX_KEY, {key: seen for seen, key in fresh}, None)
+
+
+class TokenBucket:
+    """One named limit, e.g. ``TokenBucket('ip', '5/3600')``."""
+
+    def __init__(self, name, rate):
+        self.name = name
+        self.capacity, self.period = parse_rate(rate)
+        # Seconds for one token to come back.
+        self.interval = self.period / self.capacity
+
+    def cache_key(self, key):
+        # Email addresses are not safe cache keys for every backend.
+        return f'{RATELIMIT_CACHE_PREFIX}:{self.name}:{hashlib.sha256(key.encode()).hexdigest()[:32]}'
+
+    def tokens(self, state, now):
+        """Tokens left in a stored ``state`` at ``now``."""
+        debt = max(state['tat'] - now, 0)
+        return min(self.capacity, int((self.period - debt) / self.interval + 1e-9))
+
+    def blocked(self, key, now=None):
+        """Seconds until ``key`` may retry, if this process just rejected it; else None."""
+        cache_key = self.cache_key(key)
+        entry = _blocked.get(cache_key)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        until, pending = entry
+        if until <= now:
+            return None
+        _blocked[cache_key] = (until, pending + 1)
+        return until - now
+
+    def hit(self, key, now=None):
+        """Take a token for ``key``; returns a ``Decision``."""
+        now = time.time() if now is None else now
+        cache_key = self.cache_key(key)
+        state = cache.get(cache_key)
+        new = state is None
+        if new:
+            state = {'key': key, 'tat': now, 'allowed': 0, 'rejected': 0}
+        state['rejected'] += _blocked.pop(cache_key, (0, 0))[1]
+
+        tat = max(state['tat'], now) + self.interval
+        allow_at = tat - self.period
+        if allow_at > now:
+            state['rejected'] += 1
+            decision = Decision(False, 0, allow_at - now)
+            _remember(cache_key, allow_at)
+        else:
+            state['tat'] = tat
+            state['allowed'] += 1
+            decision = Decision(True, self.tokens(state, now), 0)
+        state['last_seen'] = now
+        cache.set(cache_key, state, STATS_TIMEOUT)
+        if new:
+            _track(cache_key, now)
+        return decision
+
+
+def contact_buckets():
+    """``{'ip': TokenBucket, 'email': TokenBucket}`` from the settings, in checking order."""
+    return {name: TokenBucket(name, rate) for name, rate in settings.CONTACT_RATE_LIMITS.items()}
+
+
+def client_ip(request):
+    """The address to limit: REMOTE_ADDR, or the last hop of ``CLIENT_IP_HEADER``.
+
+    IPv6 clients are limited per /64, the block one host usually holds.
+    """
+    address = request.META.get('REMOTE_ADDR', '')
+    if settings.CLIENT_IP_HEADER:
+        forwarded = request.headers.get(settings.CLIENT_IP_HEADER, '')
+        if forwarded:
+            # The entry our own proxy appended; earlier ones are client-supplied.
+            address = forwarded.split(',')[-1].strip()
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return address or 'unknown'
+    if ip.version == 6:
+        if ip.ipv4_mapped:
+            return str(ip.ipv4_mapped)
+        return str(ipaddress.ip_network(f'{ip}/64', strict=False))
+    return str(ip)
+
+
+def too_many_requests(request, retry_after):
+    """The cheap 429: JSON for the page script, plain text otherwise."""
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        response = JsonResponse({'success': False, 'error': REJECTED_MESSAGE}, status=429)
+    else:
+        response = HttpResponse(REJECTED_MESSAGE, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def _contact_keys(request):
+    # Lazy, so a rejected IP never gets its request body parsed.
+    yield 'ip', client_ip(request)
+    yield 'email', request.POST.get('email', '').strip().lower()
+
+
+def _fast_reject(request, buckets):
+    if 'ip' in buckets:
+        retry_after = buckets['ip'].blocked(client_ip(request))
+        if retry_after is not None:
+            return too_many_requests(request, retry_after)
+    return None
+
+
+def check_contact(request):
+    """The 429 for a contact submission over its limits, or None to go ahead."""
+    buckets = contact_buckets()
+    for name, key in _contact_keys(request):
+        bucket = buckets.get(name)
+        if bucket is None or not key:
+            continue
+        retry_after = bucket.blocked(key)
+        if retry_after is None:
+            decision = bucket.hit(key)
+            if decision.allowed:
+                continue
+            retry_after = decision.retry_after
+        return too_many_requests(request, retry_after)
+    return None
+
+
+async def acheck_contact(request):
+    """Async ``check_contact()``; a retry the fast path knows about never leaves the event loop."""
+    return _fast_reject(request, contact_buckets()) or await sync_to_async(check_contact)(request)
+
+
+def tracked_keys():
+    """Every tracked key with its counters, most recently seen first (for the admin)."""
+    buckets = contact_buckets()
+    index = cache.get(INDEX_KEY) or {}
+    states = cache.get_many(list(index))
+    now = time.time()
+    rows = []
+    for cache_key, state in states.items():
+        bucket = buckets.get(cache_key.split(':')[2])
+        rows.append({
+            'cache_key': cache_key,
+            'bucket': cache_key.split(':')[2],
+            'key': state['key'],
+            'tokens': bucket.tokens(state, now) if bucket else None,
+            'capacity': bucket.capacity if bucket else None,
+            'allowed': state['allowed'],
+            'rejected': state['rejected'],
+            'last_seen': datetime.fromtimestamp(state['last_seen'], tz=timezone.utc),
+        })
+    rows.sort(key=lambda row: row['last_seen'], reverse=True)
+    return rows
+
+
+def reset(cache_key):
+    """Refill a bucket and drop its counters (in this process's fast path too)."""
+    if not cache_key.startswith(f'{RATELIMIT_CACHE_PREFIX}:') or cache_key == INDEX_KEY:
+        return
+    _blocked.pop(cache_key, None)
+    cache.delete(cache_key)
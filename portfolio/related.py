@@ -0,0 +1,342 @@
+"""
+Related projects, precomputed from tag and tech-stack similarity.
+
+Two projects score
+
+    TAG_WEIGHT * J(tags) + TECH_WEIGHT * J(tech stack) + CATEGORY_WEIGHT * (same category)
+
+where J is the Jaccard index |A ∩ B| / |A ∪ B| over lower-cased tag names
+and comma-separated ``tech_stack`` entries. Each project's ``NEIGHBOURS``
+best matches are stored in ``RelatedProject``, so the detail page reads a
+few rows by key instead of comparing anything per request.
+
+Only projects sharing a tag or tech-stack entry can score above the
+category bonus, so candidates come from an inverted index (token ->
+projects) plus the first few projects of the same category in gallery
+order, which win every tie at the bonus alone. Nothing else is scored.
+The index is kept in memory for a rebuild and stored, normalised, in
+``RelatedToken`` so an update finds the projects sharing a token by
+indexed lookups.
+
+The receivers in ``portfolio.signals`` queue the projects a save or delete
+touches; ``update_related`` runs once on commit, stores their tokens, loads
+only those projects and the ones that can be affected, and rewrites only
+the neighbour lists that changed. ``rebuild_related`` recomputes the whole
+table and the tokens (e.g. after bulk imports, which bypass signals).
+"""
+import heapq
+import threading
+import weakref
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .cache import bump_content_version
+from .models import Project, ProjectTag, RelatedProject, RelatedToken
+
+TAG_WEIGHT = 0.6
+TECH_WEIGHT = 0.3
+# Keeps same-category projects as the fallback when nothing shares a tag.
+CATEGORY_WEIGHT = 0.1
+NEIGHBOURS = 3
+# Ids per ``__in`` lookup, below SQLite's bound on query parameters.
+QUERY_BATCH_SIZE = 5000
+
+# Saving a Project only moves its neighbours when one of these changes.
+FEATURE_FIELDS = frozenset({'category', 'tech_stack', 'order'})
+GALLERY_ORDER = ('order', '-created_at', '-id')
+
+Features = namedtuple('Features', 'tags tech category sort_key')
+
+
+def _tokens(names):
+    return frozenset(name.strip().lower() for name in names if name.strip())
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def similarity(a, b):
+    """Score two ``Features``; 0.0 when they have nothing in common."""
+    score = TAG_WEIGHT * _jaccard(a.tags, b.tags) + TECH_WEIGHT * _jaccard(a.tech, b.tech)
+    if a.category == b.category:
+        score += CATEGORY_WEIGHT
+    return round(score, 6)
+
+
+def _batches(ids):
+    """``ids`` (or any sortable values) sorted, in chunks of ``QUERY_BATCH_SIZE``."""
+    ids = sorted(ids)
+    for start in range(0, len(ids), QUERY_BATCH_SIZE):
+        yield ids[start:start + QUERY_BATCH_SIZE]
+
+
+def load_features(project_ids=None):
+    """``{project_id: Features}`` for ``project_ids`` (default: every project), in two queries per batch."""
+    if project_ids is None:
+        batches = [None]
+    else:
+        batches = list(_batches(set(project_ids)))
+    features = {}
+    for batch in batches:
+        tags_qs, projects = ProjectTag.objects.all(), Project.objects.all()
+        if batch is not None:
+            tags_qs, projects = tags_qs.filter(project_id__in=batch), projects.filter(pk__in=batch)
+        tags = defaultdict(list)
+        for project_id, name in tags_qs.values_list('project_id', 'name'):
+            tags[project_id].append(name)
+        for pk, category, tech_stack, order, created_at in projects.values_list(
+            'pk', 'category', 'tech_stack', 'order', 'created_at'
+        ):
+            features[pk] = Features(
+                _tokens(tags[pk]), _tokens(tech_stack.split(',')), category,
+                # Equal scores fall back to the gallery order (GALLERY_ORDER).
+                (order, -created_at.timestamp(), -pk),
+            )
+    return features
+
+
+def _keys(features):
+    return [('tag', token) for token in features.tags] + [('tech', token) for token in features.tech]
+
+
+class CandidateIndex:
+    """Which projects can score above zero against a given one, among ``features``."""
+
+    def __init__(self, features):
+        self.features = features
+        self.postings = defaultdict(list)
+        self.sizes = {pk: (len(own.tags), len(own.tech), own.category) for pk, own in features.items()}
+        by_category = defaultdict(list)
+        for pk, own in features.items():
+            for key in _keys(own):
+                self.postings[key].append(pk)
+            by_category[own.category].append(pk)
+        # One spare for the project itself.
+        self.leaders = {
+            category: heapq.nsmallest(NEIGHBOURS + 1, pks, key=lambda pk: features[pk].sort_key)
+            for category, pks in by_category.items()
+        }
+
+    def scores(self, project_id):
+        """``[(pk, score), ...]`` against every candidate: ``similarity()`` from shared-token counts."""
+        own = self.features[project_id]
+        shared_tags, shared_tech = Counter(), Counter()
+        for token in own.tags:
+            shared_tags.update(self.postings['tag', token])
+        for token in own.tech:
+            shared_tech.update(self.postings['tech', token])
+        found = shared_tags.keys() | shared_tech.keys() | set(self.leaders.get(own.category, ()))
+        found.discard(project_id)
+        own_tags, own_tech, sizes = len(own.tags), len(own.tech), self.sizes
+        scored = []
+        for pk in found:
+            other_tags, other_tech, category = sizes[pk]
+            tags, tech = shared_tags[pk], shared_tech[pk]
+            # The same arithmetic as similarity(), so both give identical floats.
+            score = (
+                TAG_WEIGHT * (tags / (own_tags + other_tags - tags) if tags else 0.0)
+                + TECH_WEIGHT * (tech / (own_tech + other_tech - tech) if tech else 0.0)
+            )
+            if category == own.category:
+                score += CATEGORY_WEIGHT
+            scored.append((pk, round(score, 6)))
+        return scored
+
+
+def _best(candidates, features):
+    """The top ``NEIGHBOURS`` of ``[(project_id, score), ...]``."""
+    return heapq.nsmallest(
+        NEIGHBOURS, (item for item in candidates if item[1] > 0),
+        key=lambda item: (-item[1], features[item[0]].sort_key),
+    )
+
+
+def neighbours(project_id, features, index=None):
+    """Compute ``[(related_id, score), ...]`` for one project, best first."""
+    return _best((index or CandidateIndex(features)).scores(project_id), features)
+
+
+def _write(lists):
+    """Replace the stored neighbours of every project in ``lists``."""
+    with transaction.atomic():
+        for batch in _batches(lists):
+            RelatedProject.objects.filter(project_id__in=batch).delete()
+        RelatedProject.objects.bulk_create([
+            RelatedProject(project_id=project_id, related_id=related_id, score=score, rank=rank)
+            for project_id, rows in lists.items()
+            for rank, (related_id, score) in enumerate(rows)
+        ], batch_size=1000)
+
+
+def _write_tokens(project_ids, features):
+    """Replace the stored tokens of ``project_ids`` with their ``features`` (none for a deleted project)."""
+    for batch in _batches(project_ids):
+        RelatedToken.objects.filter(project_id__in=batch).delete()
+    RelatedToken.objects.bulk_create([
+        RelatedToken(project_id=pk, kind=kind, token=token)
+        for pk in project_ids if pk in features
+        for kind, token in _keys(features[pk])
+    ], batch_size=1000)
+
+
+def rebuild_related():
+    """Recompute every neighbour list and the stored tokens; returns the number of projects."""
+    features = load_features()
+    index = CandidateIndex(features)
+    lists = {pk: neighbours(pk, features, index) for pk in features}
+    with transaction.atomic():
+        RelatedProject.objects.all().delete()
+        RelatedToken.objects.all().delete()
+        _write(lists)
+        _write_tokens(features, features)
+    bump_content_version()
+    return len(lists)
+
+
+def _leaders(categories):
+    """The first ``NEIGHBOURS + 1`` projects of each category in gallery order, off ``project_category_idx``."""
+    ids = set()
+    for category in categories:
+        ids.update(
+            Project.objects.filter(category=category).order_by(*GALLERY_ORDER)
+            .values_list('pk', flat=True)[:NEIGHBOURS + 1]
+        )
+    return ids
+
+
+def _sharing(features):
+    """Ids of every project sharing a stored token with one of ``features``, plus their categories' leaders."""
+    ids = set()
+    for kind, tokens in (
+        ('tag', frozenset().union(*(own.tags for own in features))),
+        ('tech', frozenset().union(*(own.tech for own in features))),
+    ):
+        for batch in _batches(tokens):
+            ids.update(
+                RelatedToken.objects.filter(kind=kind, token__in=batch).values_list('project_id', flat=True)
+            )
+    return ids | _leaders({own.category for own in features})
+
+
+def _stored(project_ids):
+    stored = defaultdict(list)
+    for batch in _batches(project_ids):
+        for project_id, related_id, score in RelatedProject.objects.filter(
+            project_id__in=batch
+        ).order_by('project_id', 'rank').values_list('project_id', 'related_id', 'score'):
+            stored[project_id].append((related_id, score))
+    return stored
+
+
+def update_related(changed=(), refresh=()):
+    """Bring the table up to date after the projects in ``changed`` were edited.
+
+    ``changed`` projects (saved, re-tagged or deleted) get their tokens
+    stored and a new list, and so does every project whose stored list
+    holds one of them. Projects sharing a token with a changed project may
+    gain it, and so may lists of its category when it is one of the
+    category's leaders: those stored lists are patched in place.
+    ``refresh`` projects only lost a neighbour (it was deleted) and are
+    recomputed. Only these projects and their candidates are loaded.
+    Returns the number of lists rewritten.
+    """
+    changed, refresh = set(changed), set(refresh)
+    own = load_features(changed | refresh)
+    changed_features = [own[pk] for pk in changed if pk in own]
+    with transaction.atomic():
+        _write_tokens(changed, own)
+        lists = _update_lists(changed, own, changed_features)
+    if lists:
+        # The page cache was bumped when the change was saved, before these rows existed.
+        bump_content_version()
+    return len(lists)
+
+
+def _update_lists(changed, own, changed_features):
+    """Rewrite the neighbour lists ``changed`` can affect; returns the new ones."""
+    # Lists that hold a changed project may lose it: recompute them.
+    recompute = set(own)
+    for batch in _batches(changed):
+        recompute.update(RelatedProject.objects.filter(related_id__in=batch).values_list('project_id', flat=True))
+    # Lists that may gain one: anything sharing a token and, if a changed
+    # project now leads its category, that category's lists with room for
+    # an entry scored on the category alone. Anything else out-ranks a
+    # non-leader at the bonus, so no other list can take it.
+    gainers = set()
+    if changed_features:
+        gainers = _sharing(changed_features)
+        leaders = _leaders({f.category for f in changed_features})
+        leading = {own[pk].category for pk in changed & leaders if pk in own}
+        if leading:
+            gainers.update(
+                Project.objects.filter(category__in=leading)
+                .annotate(listed=Count('neighbours'), lowest=Min('neighbours__score'))
+                .filter(Q(listed__lt=NEIGHBOURS) | Q(lowest__lte=CATEGORY_WEIGHT))
+                .values_list('pk', flat=True)
+            )
+        gainers -= recompute
+
+    stored = _stored(recompute | gainers)
+    features = load_features(
+        (recompute - set(own)) | gainers
+        | {related_id for rows in stored.values() for related_id, _score in rows}
+    )
+    features.update(own)
+    recompute &= set(features)
+    features.update(load_features(_sharing([features[pk] for pk in recompute]) - set(features)))
+    index = CandidateIndex(features)
+
+    lists = {}
+    for pk in recompute:
+        new = neighbours(pk, features, index)
+        if new != stored[pk]:
+            lists[pk] = new
+    for pk in gainers & set(features):
+        new = _best(stored[pk] + [
+            (other, similarity(features[pk], features[other])) for other in changed if other in own and other != pk
+        ], features)
+        if new != stored[pk]:
+            lists[pk] = new
+    if lists:
+        _write(lists)
+    return lists
+
+
+class _PendingUpdate:
+    """One on_commit callback per transaction, collecting the touched projects."""
+
+    def __init__(self):
+        self.changed = set()
+        self.refresh = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        update_related(self.changed, self.refresh - self.changed)
+
+
+# Per thread (so per connection): {database alias: the queued _PendingUpdate}.
+# Weak, so an update dropped with a rolled-back transaction is gone too.
+_local = threading.local()
+
+
+def schedule_update(project_ids, refresh=False, using=None):
+    """Queue ``update_related`` for ``project_ids`` once the transaction commits."""
+    pending = getattr(_local, 'pending', None)
+    if pending is None:
+        pending = _local.pending = weakref.WeakValueDictionary()
+    alias = transaction.get_connection(using).alias
+    update = pending.get(alias)
+    new = update is None or update.done
+    if new:
+        update = pending[alias] = _PendingUpdate()
+    (update.refresh if refresh else update.changed).update(project_ids)
+    if new:
+        # Runs straight away outside a transaction.
+        transaction.on_commit(update, using=alias)
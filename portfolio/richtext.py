@@ -0,0 +1,82 @@
+import io
+import re
+from html import escape
+
+from django.utils.safestring import mark_safe
+
+# Compiled once; lines are already stripped so no anchors are needed with match().
+ORDERED_ITEM_RE = re.compile(r'\d+[\.\)]\s')
+ORDERED_PREFIX_RE = re.compile(r'\d+[\.\)]\s*')
+BULLET_PREFIX_RE = re.compile(r'[•\-]\s*')
+
+UL_OPEN, OL_OPEN = '<ul class="fk-rich-list">', '<ol class="fk-rich-list">'
+UL_CLOSE, OL_CLOSE = '</ul>', '</ol>'
+
+
+def _is_bullet(line):
+    return line.startswith('•') or line.startswith('- ')
+
+
+def _render_list(close_tag, items):
+    open_tag = UL_OPEN if close_tag == UL_CLOSE else OL_OPEN
+    return open_tag + ''.join(f'<li>{item}</li>' for item in items) + close_tag
+
+
+def iter_richtext(value):
+    """Yield the HTML of each block element of ``value``, in document order.
+
+    Single pass over the lines: every line is escaped, stripped and classified
+    exactly once, so the cost is linear in the size of the input and the
+    output can be streamed for very large documents.
+
+    Handles:
+      - Paragraphs separated by blank lines  →  <p>
+      - Lines ending with ':'                 →  <h4> headings
+      - Lines starting with '•' or '- '      →  <ul> lists
+      - Lines starting with '1.' '2.' etc     →  <ol> lists
+      - Everything else                       →  <p>
+    """
+    if not value:
+        return
+
+    # Open list: (closing tag, items). A blank line or a line of another kind ends it.
+    close_tag, items = None, []
+
+    for raw in io.StringIO(str(value), newline='\n'):
+        line = escape(raw).strip()
+
+        if close_tag is not None:
+            if close_tag == UL_CLOSE and _is_bullet(line):
+                items.append(line[BULLET_PREFIX_RE.match(line).end():])
+                continue
+            if close_tag == OL_CLOSE and ORDERED_ITEM_RE.match(line):
+                items.append(line[ORDERED_PREFIX_RE.match(line).end():])
+                continue
+            yield _render_list(close_tag, items)
+            close_tag, items = None, []
+
+        if not line:
+            continue
+
+        # Heading: short line ending with ':'
+        if line.endswith(':') and len(line) < 80:
+            yield f'<h4 class="fk-rich-heading">{line[:-1]}</h4>'
+        # Unordered list: lines starting with • or -
+        elif _is_bullet(line):
+            close_tag, items = UL_CLOSE, [line[BULLET_PREFIX_RE.match(line).end():]]
+        # Ordered list: lines starting with 1. 2. etc
+        elif ORDERED_ITEM_RE.match(line):
+            close_tag, items = OL_CLOSE, [line[ORDERED_PREFIX_RE.match(line).end():]]
+        # Regular paragraph
+        else:
+            yield f'<p>{line}</p>'
+
+    if close_tag is not None:
+        yield _render_list(close_tag, items)
+
+
+def render_richtext(value):
+    """Convert structured plain text into semantic HTML (see ``iter_richtext``)."""
+    if not value:
+        return ''
+    return mark_safe('\n'.join(iter_richtext(value)))
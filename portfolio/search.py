@@ -0,0 +1,138 @@
+"""
+Full-text project search on an SQLite FTS5 index.
+
+``portfolio_project_fts`` holds one row per project (``rowid`` = project id)
+with the searchable text, tags included. The receivers in
+``portfolio.signals`` keep it in step with every save and delete, inside the
+same transaction; ``rebuild_search_index`` recreates it from scratch (e.g.
+after bulk imports, which bypass signals).
+
+On other database backends the index does not exist and ``search_projects``
+falls back to ``icontains`` filters.
+"""
+import re
+from html import escape
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Project, ProjectTag
+
+FTS_TABLE = 'portfolio_project_fts'
+FTS_COLUMNS = ('title', 'short_description', 'description', 'detailed_content', 'tech_stack', 'tags')
+# prefix= keeps extra indexes for 2- and 3-character prefixes, so the
+# type-ahead "term*" queries do not have to merge every matching token.
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{', '.join(FTS_COLUMNS)}, tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')"
+)
+# bm25() column weights, in FTS_COLUMNS order: a title hit outranks a body hit.
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0, 3.0, 4.0)
+
+SEARCH_SQL = (
+    f"SELECT rowid, bm25({FTS_TABLE}, {', '.join(map(str, BM25_WEIGHTS))}) AS rank, "
+    f"snippet({FTS_TABLE}, -1, char(2), char(3), '…', 12) "
+    f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s"
+)
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def fts_query(text):
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix.
+
+    ``'django rest fram'`` → ``'"django" "rest" "fram"*'``. Returns '' when
+    there is nothing searchable.
+    """
+    terms = _TERM_RE.findall(text)
+    if not terms:
+        return ''
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def highlight(snippet):
+    """Escape an FTS snippet and turn its match markers into ``<mark>``."""
+    return escape(snippet).replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+
+def _document(project, tags):
+    return [
+        project.title, project.short_description, project.description,
+        project.detailed_content, project.tech_stack, ' '.join(tags),
+    ]
+
+
+def index_projects(project_ids):
+    """(Re)write the index rows of ``project_ids``; missing projects are removed."""
+    if not is_available() or not project_ids:
+        return
+    project_ids = list(project_ids)
+    tags = {}
+    for project_id, name in ProjectTag.objects.filter(project_id__in=project_ids).values_list('project_id', 'name'):
+        tags.setdefault(project_id, []).append(name)
+    projects = Project.objects.filter(pk__in=project_ids).only('pk', *FTS_COLUMNS[:-1])
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in project_ids])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (%s, {', '.join(['%s'] * len(FTS_COLUMNS))})",
+            [(p.pk, *_document(p, tags.get(p.pk, []))) for p in projects],
+        )
+
+
+def remove_projects(project_ids):
+    if not is_available() or not project_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in project_ids])
+
+
+def rebuild_index(batch_size=1000):
+    """Empty and refill the whole index; returns the number of projects indexed."""
+    if not is_available():
+        return 0
+    # One transaction: searches keep seeing the old index until the new one is complete.
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_FTS_SQL)
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        ids = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(ids), batch_size):
+            index_projects(ids[start:start + batch_size])
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return len(ids)
+
+
+def search_projects(text, limit=20):
+    """Return ``[(project, rank, snippet_html), ...]``, best match first.
+
+    ``rank`` is the weighted bm25 score (lower is better); the snippet is
+    HTML with the matches wrapped in ``<mark>``.
+    """
+    query = fts_query(text)
+    if not query:
+        return []
+
+    if not is_available():
+        matches = Q()
+        for term in _TERM_RE.findall(text):
+            term_q = Q(tags__name__icontains=term)
+            for column in FTS_COLUMNS[:-1]:
+                term_q |= Q(**{f'{column}__icontains': term})
+            matches &= term_q
+        projects = Project.objects.filter(matches).distinct()[:limit]
+        return [(project, None, escape(project.short_description)) for project in projects]
+
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [query, limit])
+        hits = cursor.fetchall()
+    projects = Project.objects.in_bulk([rowid for rowid, _rank, _snippet in hits])
+    return [
+        (projects[rowid], rank, highlight(snippet))
+        for rowid, rank, snippet in hits if rowid in projects
+    ]
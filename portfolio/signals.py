@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import related, search
+from .cache import bump_content_version
+from .models import (
+    Profile, Skill, Education, Certification, Interest,
+    Project, ProjectImage, ProjectTag, CareerGoal, RelatedProject
+)
+
+# Every model rendered on a public page. ContactMessage is deliberately
+# absent: a new enquiry does not change what visitors see.
+CONTENT_MODELS = (
+    Profile, Skill, Education, Certification, Interest,
+    Project, ProjectImage, ProjectTag, CareerGoal,
+)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_page_cache(sender, **kwargs):
+    if sender in CONTENT_MODELS:
+        bump_content_version()
+
+
+@receiver(post_save, sender=ProjectImage)
+@receiver(post_save, sender=ProjectTag)
+@receiver(post_delete, sender=ProjectImage)
+@receiver(post_delete, sender=ProjectTag)
+def touch_parent_project(sender, instance, **kwargs):
+    """A project's gallery and tags are part of it: keep its updated_at current."""
+    # update() skips Project's own post_save; the version is bumped above anyway.
+    Project.objects.filter(pk=instance.project_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(search.FTS_COLUMNS):
+        return
+    search.index_projects([instance.pk])
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, **kwargs):
+    search.remove_projects([instance.pk])
+
+
+@receiver(post_save, sender=ProjectTag)
+@receiver(post_delete, sender=ProjectTag)
+def reindex_tagged_project(sender, instance, **kwargs):
+    search.index_projects([instance.project_id])
+
+
+@receiver(post_save, sender=Project)
+def update_related_projects(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & related.FEATURE_FIELDS:
+        return
+    related.schedule_update([instance.pk])
+
+
+@receiver(pre_delete, sender=Project)
+def refresh_related_lists(sender, instance, **kwargs):
+    # The cascade removes this project from its neighbours' lists; they need refilling.
+    related.schedule_update(
+        RelatedProject.objects.filter(related=instance).values_list('project_id', flat=True), refresh=True
+    )
+
+
+@receiver(post_save, sender=ProjectTag)
+@receiver(post_delete, sender=ProjectTag)
+def update_tagged_project_related(sender, instance, **kwargs):
+    related.schedule_update([instance.project_id])
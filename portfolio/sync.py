@@ -0,0 +1,271 @@
+"""
+Declarative content sync: make the site's content match a content file.
+
+The file (JSON, or YAML when PyYAML is installed) has one section per
+content model, see ``SECTIONS``. Each entry is matched to its row by the
+section's natural key and only the fields the entry lists are managed, so
+uploaded images and anything else edited in the admin survive a sync. A
+section left out of the file is not touched; an empty one is emptied.
+Projects may list their ``tags`` by name.
+
+``plan()`` works out the inserts, updates and deletes; ``apply()`` runs
+them in one transaction, with ``bulk_create`` and ``bulk_update``. Those
+skip ``save()`` and the post_save receivers, so ``apply()`` renders
+``detailed_content_html``, stamps ``updated_at``, reindexes the touched
+projects for search and related projects and bumps the content version
+itself. Deletes are raw, children first, for the same reason. An unchanged
+file gives an empty plan and no writes at all.
+"""
+import json
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import related, search
+from .cache import bump_content_version
+from .models import (
+    Profile, Skill, Education, Certification, Interest,
+    Project, ProjectImage, ProjectTag, CareerGoal, RelatedProject, RelatedToken
+)
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# An empty key marks a section holding one object (not a list): it updates
+# the first row and deletes any others.
+Section = namedtuple('Section', 'name model key')
+SECTIONS = (
+    Section('profile', Profile, ()),
+    Section('skills', Skill, ('name',)),
+    Section('education', Education, ('degree', 'institution')),
+    Section('certifications', Certification, ('title', 'issuer')),
+    Section('interests', Interest, ('title',)),
+    Section('career_goals', CareerGoal, ('title',)),
+    Section('projects', Project, ('slug',)),
+)
+TAGS = Section('tags', ProjectTag, ('project', 'name'))
+
+
+class SyncError(ValueError):
+    """The content file cannot be synced; nothing was written."""
+
+
+class SectionPlan:
+    """The changes one section needs."""
+
+    def __init__(self, section):
+        self.section = section
+        self.create = []
+        # [(object, names of the fields that changed)]
+        self.update = []
+        self.delete = []
+
+    def __bool__(self):
+        return bool(self.create or self.update or self.delete)
+
+    def describe(self):
+        """One line per change, for the command's report."""
+        for obj in self.create:
+            yield f'+ {self.section.name}: {obj}'
+        for obj, fields in self.update:
+            yield f'~ {self.section.name}: {obj} ({", ".join(fields)})'
+        for obj in self.delete:
+            yield f'- {self.section.name}: {obj}'
+
+
+def load(path):
+    """The content file at ``path`` as a dict of sections."""
+    path = str(path)
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise SyncError('Reading YAML content needs the PyYAML package; use JSON.')
+            data = yaml.safe_load(f)
+        else:
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise SyncError(f'{path}: {e}')
+    if not isinstance(data, dict):
+        raise SyncError(f'{path}: expected an object of sections.')
+    unknown = set(data) - {section.name for section in SECTIONS}
+    if unknown:
+        raise SyncError(f'{path}: unknown section(s) {", ".join(sorted(unknown))}.')
+    return data
+
+
+def _values(section, entry):
+    """``entry`` as ``{attname: python value}``, refusing fields the file may not set."""
+    values = {}
+    for name, value in entry.items():
+        try:
+            field = section.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise SyncError(f'{section.name}: unknown field {name!r}.')
+        if not field.concrete or field.is_relation or field.primary_key or not field.editable:
+            raise SyncError(f'{section.name}: {name!r} cannot be set from the content file.')
+        try:
+            values[field.attname] = field.to_python(value)
+        except ValidationError as e:
+            raise SyncError(f'{section.name}: {name}: {" ".join(e.messages)}')
+    return values
+
+
+def _validate(section, obj, fields):
+    exclude = [field.name for field in obj._meta.fields if field.attname not in fields]
+    try:
+        obj.clean_fields(exclude=exclude)
+    except ValidationError as e:
+        errors = '; '.join(f'{name}: {" ".join(messages)}' for name, messages in e.message_dict.items())
+        raise SyncError(f'{section.name}: {obj}: {errors}')
+
+
+def _key(section, obj):
+    return tuple(getattr(obj, name) for name in section.key)
+
+
+def _plan_section(section, entries):
+    plan = SectionPlan(section)
+    existing = {}
+    for obj in section.model.objects.order_by('pk'):
+        if _key(section, obj) in existing:
+            plan.delete.append(obj)
+        else:
+            existing[_key(section, obj)] = obj
+
+    new_fields = [field.attname for field in section.model._meta.fields]
+    # {key: (object, tag names or None)}
+    seen = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise SyncError(f'{section.name}: expected an object, got {entry!r}.')
+        entry = dict(entry)
+        tags = entry.pop('tags', None) if section.model is Project else None
+        values = _values(section, entry)
+        missing = [name for name in section.key if name not in values]
+        if missing:
+            raise SyncError(f'{section.name}: {entry!r} has no {", ".join(missing)}.')
+        key = tuple(values[name] for name in section.key)
+        if key in seen:
+            raise SyncError(f'{section.name}: {", ".join(map(str, key))} is listed twice.')
+
+        obj = existing.pop(key, None)
+        if obj is None:
+            obj = section.model(**values)
+            _validate(section, obj, new_fields)
+            plan.create.append(obj)
+        else:
+            changed = [name for name, value in values.items() if getattr(obj, name) != value]
+            if changed:
+                for name in changed:
+                    setattr(obj, name, values[name])
+                _validate(section, obj, changed)
+                plan.update.append((obj, changed))
+        seen[key] = (obj, tags)
+    plan.delete += existing.values()
+    return plan, list(seen.values())
+
+
+def _plan_tags(projects):
+    """Tag changes for ``[(project, tag names or None)]``; None leaves a project's tags alone."""
+    plan = SectionPlan(TAGS)
+    managed = [(project, names) for project, names in projects if names is not None]
+    existing = {}
+    for tag in ProjectTag.objects.filter(
+        project__in=[project.pk for project, _names in managed if project.pk]
+    ).order_by('pk'):
+        if (tag.project_id, tag.name) in existing:
+            plan.delete.append(tag)
+        else:
+            existing[tag.project_id, tag.name] = tag
+    for project, names in managed:
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise SyncError(f'projects: {project.slug}: tags must be a list of names.')
+        for name in dict.fromkeys(names):
+            if project.pk and existing.pop((project.pk, name), None):
+                continue
+            tag = ProjectTag(project=project, name=name)
+            _validate(TAGS, tag, ['name'])
+            plan.create.append(tag)
+    plan.delete += existing.values()
+    return plan
+
+
+def plan(data):
+    """The ``SectionPlan`` of every section in ``data``, in the order to apply them."""
+    plans = []
+    for section in SECTIONS:
+        if section.name not in data:
+            continue
+        entries = data[section.name]
+        if not section.key:
+            entries = [] if entries is None else [entries]
+        elif not isinstance(entries, list):
+            raise SyncError(f'{section.name}: expected a list.')
+        section_plan, projects = _plan_section(section, entries)
+        plans.append(section_plan)
+        if section.model is Project:
+            plans.append(_plan_tags(projects))
+    return plans
+
+
+def _delete(model, pks):
+    """Raw deletes, children first: the ORM's cascade would run every receiver once per row."""
+    if model is Project:
+        # Their neighbours lose an entry and need refilling.
+        related.schedule_update(
+            RelatedProject.objects.filter(related__in=pks).exclude(project__in=pks)
+            .values_list('project_id', flat=True).distinct(),
+            refresh=True,
+        )
+        RelatedProject.objects.filter(Q(project__in=pks) | Q(related__in=pks))._raw_delete(RelatedProject.objects.db)
+        RelatedToken.objects.filter(project__in=pks)._raw_delete(RelatedToken.objects.db)
+        ProjectTag.objects.filter(project__in=pks)._raw_delete(ProjectTag.objects.db)
+        ProjectImage.objects.filter(project__in=pks)._raw_delete(ProjectImage.objects.db)
+        search.remove_projects(pks)
+    model.objects.filter(pk__in=pks)._raw_delete(model.objects.db)
+
+
+def apply(plans):
+    """Run ``plans`` in one transaction; returns the number of rows written."""
+    if not any(plans):
+        return 0
+    now = timezone.now()
+    touched = set()
+    with transaction.atomic():
+        for section_plan in plans:
+            model = section_plan.section.model
+            if section_plan.delete:
+                _delete(model, [obj.pk for obj in section_plan.delete])
+            if section_plan.update:
+                fields = {name for _obj, changed in section_plan.update for name in changed}
+                for obj, _changed in section_plan.update:
+                    if model is Project and obj.refresh_detailed_content_html():
+                        fields |= {'detailed_content_html', 'detailed_content_hash'}
+                    obj.updated_at = now
+                model.objects.bulk_update([obj for obj, _changed in section_plan.update], [*fields, 'updated_at'])
+            if section_plan.create:
+                if model is Project:
+                    for obj in section_plan.create:
+                        obj.refresh_detailed_content_html()
+                model.objects.bulk_create(section_plan.create)
+
+            if model is Project:
+                touched.update(obj.pk for obj, _changed in section_plan.update)
+                touched.update(obj.pk for obj in section_plan.create)
+            elif model is ProjectTag:
+                tagged = {tag.project_id for tag in section_plan.create + section_plan.delete}
+                # A project's tags are part of it (see signals.touch_parent_project).
+                Project.objects.filter(pk__in=tagged - touched).update(updated_at=now)
+                touched |= tagged
+
+        touched = sorted(pk for pk in touched if pk)
+        search.index_projects(touched)
+        related.schedule_update(touched)
+    bump_content_version()
+    return sum(len(p.create) + len(p.update) + len(p.delete) for p in plans)
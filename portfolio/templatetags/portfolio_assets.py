@@ -0,0 +1,68 @@
+from functools import lru_cache
+from posixpath import join, normpath
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from portfolio.assets import BUNDLES, DIST_DIR, map_urls
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def built_file(path):
+    """Contents of a ``build_assets`` output, or None if it has not been built.
+
+    Read once per process: deploys rebuild, collect and restart together.
+    """
+    found = finders.find(path)
+    if found:
+        with open(found, encoding='utf-8') as f:
+            return f.read()
+    if staticfiles_storage.exists(path):
+        with staticfiles_storage.open(path) as f:
+            return f.read().decode('utf-8')
+    return None
+
+
+def _bundled(name, kind):
+    return settings.ASSET_BUNDLES and built_file(f'{DIST_DIR}/{name}.{kind}') is not None
+
+
+@lru_cache(maxsize=None)
+def _inline_css(name):
+    """The critical CSS with its relative ``url()``s turned into static URLs."""
+    def absolute(url):
+        path, sep, suffix = url.partition('?') if '?' in url else url.partition('#')
+        return f'{static(normpath(join(DIST_DIR, path)))}{sep}{suffix}'
+    css = map_urls(built_file(f'{DIST_DIR}/{name}.critical.css'), absolute)
+    return mark_safe(css.replace('</', '<\\/'))
+
+
+@register.simple_tag
+def bundle_css(name):
+    """The page's stylesheets: inlined critical CSS plus the non-blocking bundle, once built."""
+    if _bundled(name, 'css') and _bundled(name, 'critical.css'):
+        href = static(f'{DIST_DIR}/{name}.css')
+        return format_html(
+            '<style>{}</style>\n'
+            '  <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+            '  <noscript><link href="{}" rel="stylesheet"></noscript>',
+            _inline_css(name), href, href,
+        )
+    return format_html_join(
+        '\n  ', '<link href="{}" rel="stylesheet">', ((static(path),) for path in BUNDLES[name]['css'])
+    )
+
+
+@register.simple_tag
+def bundle_js(name):
+    """The page's scripts, as one bundle once built."""
+    if _bundled(name, 'js'):
+        return format_html('<script src="{}"></script>', static(f'{DIST_DIR}/{name}.js'))
+    return format_html_join('\n  ', '<script src="{}"></script>', ((static(path),) for path in BUNDLES[name]['js']))
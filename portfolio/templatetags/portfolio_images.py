@@ -0,0 +1,60 @@
+import logging
+
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from portfolio.images import image_variants
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes='100vw', alt='', css_class='', loading='',
+                     width=None, height=None, placeholder='', color='', source_width=None):
+    """Render ``<picture>`` markup with WebP/JPEG ``srcset`` variants of an image field.
+
+    Usage::
+
+        {% responsive_image project.thumbnail sizes="(min-width: 992px) 33vw, 100vw" alt=project.title loading="lazy" %}
+
+    ``width``/``height`` let the browser reserve the final box before the image
+    arrives; ``placeholder`` (a data URI) and ``color`` are painted behind it
+    meanwhile. The variants are capped at ``source_width`` (default: ``width``),
+    the stored width of the image; without either the file itself is read.
+    Falls back to a plain ``<img>`` of the stored file if the variants cannot
+    be produced (e.g. the file is missing from storage).
+    """
+    if not field_file:
+        return ''
+
+    style = ''
+    if placeholder or color:
+        style = ' '.join(filter(None, [
+            f'background-color:{color};' if color else '',
+            f'background-image:url({placeholder});background-size:cover;' if placeholder else '',
+        ]))
+    extra = format_html_join('', ' {}="{}"', [
+        (name, value) for name, value in (
+            ('class', css_class), ('loading', loading), ('width', width), ('height', height), ('style', style),
+        ) if value
+    ])
+    try:
+        variants = image_variants(field_file, source_width or width)
+        sources = [
+            (mime_type, ', '.join(f'{cache_file.url} {width}w' for cache_file, width in files))
+            for mime_type, files in variants
+        ]
+        fallback = variants[-1][1][-1][0].url
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not build variants for {field_file.name}: {e}")
+        return format_html('<img src="{}" alt="{}"{}>', field_file.url, alt, extra)
+
+    *preferred, (_mime_type, fallback_srcset) = sources
+    return format_html(
+        '<picture class="fk-picture">{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', [
+            (mime_type, srcset, sizes) for mime_type, srcset in preferred
+        ]),
+        fallback, fallback_srcset, sizes, alt, extra,
+    )
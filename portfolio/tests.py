@@ -1,10 +1,75 @@
-from django.test import TestCase, Client
+import csv
+import gzip
+import json
+import multiprocessing
+import random
+import re
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from imagekit.processors import ResizeToFill
+from PIL import Image
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from portfolio.models import Project, Profile, ContactMessage
+from portfolio.cache import bump_content_version, get_content_state
+from portfolio.api import PROJECT_ORDERING
+from portfolio.pagination import EstimatedCountPaginator
+from portfolio.admin import ContactMessageAdmin
+from portfolio.middleware import QueryInstrumentationMiddleware, query_fingerprint
+from portfolio.models import (
+    Project, ProjectImage, ProjectTag, Profile, Skill, ContactMessage, OutboxEmail, RelatedProject, RelatedToken
+)
+from portfolio import archive, assets, checks, media, outbox, ratelimit, related, views
+from portfolio.templatetags import portfolio_assets
+from portfolio.richtext import iter_richtext, render_richtext
+
+def make_image_upload(name='shot.jpg', size=(1600, 1000), color=(200, 60, 30)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class MediaRootMixin:
+    """Point MEDIA_ROOT at a throwaway directory for tests that store files."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.media_root = Path(media_root)
+
 
 class PortfolioTests(TestCase):
     def setUp(self):
         # Setup runs before every test. We need some dummy data.
+        cache.clear()
         self.client = Client()
         self.profile = Profile.objects.create(
             name="Test User",
@@ -44,7 +109,7 @@ class PortfolioTests(TestCase):
             'subject': 'Job Offer',
             'message': 'We want to hire you.'
         }
-        response = self.client.post(reverse('home'), data=form_data)
+        response = self.client.post(reverse('contact'), data=form_data)
         
         # Should redirect after success
         self.assertEqual(response.status_code, 302) 
@@ -52,14 +117,1636 @@ class PortfolioTests(TestCase):
         # Check if it was saved to the database
         self.assertTrue(ContactMessage.objects.filter(email='job@company.com').exists())
 
+        # Emails are queued, not sent inside the request
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status='pending').count(), 2)
+
     def test_contact_form_invalid_submission(self):
         """Test that an invalid form (missing email) does NOT save"""
         form_data = {
             'name': 'Spammer',
             'message': 'I have no email'
         }
-        response = self.client.post(reverse('home'), data=form_data)
+        response = self.client.post(reverse('contact'), data=form_data)
         
         # Should return 200 (stay on page to show errors), not redirect
         self.assertEqual(response.status_code, 200)
-        self.assertFalse(ContactMessage.objects.filter(name='Spammer').exists())
\ No newline at end of file
+        self.assertFalse(ContactMessage.objects.filter(name='Spammer').exists())
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        self.project = Project.objects.create(
+            title="Cached Project",
+            slug="cached-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Detailed content here",
+            tech_stack="Django",
+            project_date="2025",
+            featured=True
+        )
+
+    def test_warm_hit_runs_no_queries(self):
+        """A second GET is served from the cache without touching the DB"""
+        for url in (reverse('home'), reverse('portfolio-details', args=[self.project.slug])):
+            first = self.client.get(url)
+            self.assertEqual(first['X-Page-Cache'], 'MISS')
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second['X-Page-Cache'], 'HIT')
+            self.assertContains(second, "Cached Project")
+
+    def test_related_model_change_invalidates(self):
+        """Saving or deleting a tag re-renders the cached pages"""
+        url = reverse('portfolio-details', args=[self.project.slug])
+        self.client.get(url)
+        tag = ProjectTag.objects.create(project=self.project, name="Brand New Tag")
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, "Brand New Tag")
+
+        tag.delete()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotContains(response, "Brand New Tag")
+
+    def test_home_is_cookie_free_and_shareable(self):
+        """No CSRF token, session or message cookie: shared caches may keep the page"""
+        for response in (self.client.get(reverse('home')), self.client.get(reverse('home'))):
+            self.assertNotContains(response, 'csrfmiddlewaretoken')
+            self.assertEqual(dict(response.cookies), {})
+            self.assertNotIn('Cookie', response.get('Vary', ''))
+            self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(self.client.post(reverse('home')).status_code, 405)
+
+    def test_unused_query_strings_share_the_entry(self):
+        """Only the parameters a view reads make a new cache entry"""
+        self.client.get(reverse('home'))
+        for query in ('?utm_source=mail', '?x=1&y=2'):
+            self.assertEqual(self.client.get(reverse('home') + query)['X-Page-Cache'], 'HIT')
+
+        cards = reverse('project-cards')
+        self.assertEqual(self.client.get(cards + '?category=web')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(cards + '?category=web&_=123')['X-Page-Cache'], 'HIT')
+        response = self.client.get(cards + '?category=ai')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotContains(response, "Cached Project")
+
+    def test_several_workers_need_a_shared_cache(self):
+        """A multi-worker deployment on the per-process cache fails the system checks"""
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+        with override_settings(CACHES=locmem, WEB_CONCURRENCY=1):
+            self.assertEqual(checks.check_shared_cache(None), [])
+        with override_settings(CACHES=locmem, WEB_CONCURRENCY=4):
+            self.assertEqual([e.id for e in checks.check_shared_cache(None)], ['portfolio.E001'])
+        with override_settings(CACHES=shared, WEB_CONCURRENCY=4):
+            self.assertEqual(checks.check_shared_cache(None), [])
+
+
+class ContactViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        self.client = Client(enforce_csrf_checks=True)
+        self.data = {
+            'name': 'Recruiter',
+            'email': 'job@company.com',
+            'subject': 'Job Offer',
+            'message': 'We want to hire you.',
+        }
+
+    def test_scripted_submission_fetches_a_token_then_posts_json(self):
+        """The home page script gets a CSRF token by GET and posts with it"""
+        self.assertEqual(self.client.post(reverse('contact'), data=self.data).status_code, 403)
+        response = self.client.get(reverse('contact'), headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertIn('private', response['Cache-Control'])
+        token = response.json()['csrfToken']
+        headers = {'X-Requested-With': 'XMLHttpRequest', 'X-CSRFToken': token}
+
+        response = self.client.post(reverse('contact'), data=self.data, headers=headers)
+        self.assertEqual(response.json(), {'success': True, 'message': 'Message sent!'})
+        self.assertEqual(OutboxEmail.objects.filter(status='pending').count(), 2)
+
+        response = self.client.post(reverse('contact'), data={'name': 'Spammer'}, headers=headers)
+        self.assertFalse(response.json()['success'])
+        self.assertIn('email', response.json()['errors'])
+
+    def test_plain_form_shows_the_flash_message(self):
+        """Without scripts the contact page posts, redirects and shows the message"""
+        page = self.client.get(reverse('contact'))
+        token = page.content.decode().split('name="csrfmiddlewaretoken" value="')[1].split('"')[0]
+        response = self.client.post(reverse('contact'), data={**self.data, 'csrfmiddlewaretoken': token}, follow=True)
+        self.assertRedirects(response, reverse('contact'))
+        self.assertContains(response, 'Your message has been sent successfully!')
+
+
+def _hit_bucket(rate, key):
+    """Run in a forked worker: one token from the shared cache."""
+    return ratelimit.TokenBucket('ip', rate).hit(key).allowed
+
+
+@override_settings(CONTACT_RATE_LIMITS={'ip': '3/60', 'email': '2/60'})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit._blocked.clear()
+        self.addCleanup(ratelimit._blocked.clear)
+        self.ajax = {'X-Requested-With': 'XMLHttpRequest'}
+
+    def post(self, email, ip='10.0.0.1'):
+        return self.client.post(reverse('contact'), data={
+            'name': 'Bot', 'email': email, 'subject': 'Hi', 'message': 'Hello',
+        }, headers=self.ajax, REMOTE_ADDR=ip)
+
+    def test_ip_bucket_sheds_before_validation_and_db(self):
+        """Past the IP's burst a submission gets a 429 without any query"""
+        for i in range(3):
+            self.assertEqual(self.post(f'bot{i}@example.com').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.post('bot9@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {'success': False, 'error': ratelimit.REJECTED_MESSAGE})
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(ContactMessage.objects.count(), 3)
+        # Other clients are unaffected.
+        self.assertEqual(self.post('human@example.com', ip='10.0.0.2').status_code, 200)
+
+    def test_email_bucket_spans_addresses(self):
+        for ip in ('10.0.0.1', '10.0.0.2'):
+            self.assertEqual(self.post('Target@Example.com', ip=ip).status_code, 200)
+        self.assertEqual(self.post('target@example.com ', ip='10.0.0.3').status_code, 429)
+
+    def test_fast_path_skips_the_cache_and_counts_later(self):
+        """Retries this process just rejected are answered locally and counted on the next write"""
+        bucket = ratelimit.TokenBucket('ip', '1/60')
+        self.assertTrue(bucket.hit('10.0.0.1', now=1000).allowed)
+        self.assertFalse(bucket.hit('10.0.0.1', now=1001).allowed)
+        with mock.patch.object(ratelimit, 'cache', wraps=cache) as spy:
+            self.assertAlmostEqual(bucket.blocked('10.0.0.1', now=1002), 58)
+            self.assertAlmostEqual(bucket.blocked('10.0.0.1', now=1003), 57)
+        spy.get.assert_not_called()
+
+        self.assertIsNone(bucket.blocked('10.0.0.1', now=1060))
+        decision = bucket.hit('10.0.0.1', now=1060)
+        self.assertEqual(decision, ratelimit.Decision(True, 0, 0))
+        state = cache.get(bucket.cache_key('10.0.0.1'))
+        self.assertEqual((state['allowed'], state['rejected']), (2, 3))
+
+    def test_buckets_are_shared_between_processes(self):
+        """With a cache every worker shares, a key's tokens are spent across processes"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        file_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir,
+        }}
+        with override_settings(CACHES=file_cache):
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=2, mp_context=context) as pool:
+                results = [pool.submit(_hit_bucket, '3/60', '10.9.9.9').result() for _ in range(4)]
+            self.assertEqual(results, [True, True, True, False])
+            self.assertFalse(ratelimit.TokenBucket('ip', '3/60').hit('10.9.9.9').allowed)
+
+    def test_client_ip(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='2001:db8::1')
+        self.assertEqual(ratelimit.client_ip(request), '2001:db8::/64')
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.7')
+        self.assertEqual(ratelimit.client_ip(request), '10.0.0.1')
+        with override_settings(CLIENT_IP_HEADER='X-Forwarded-For'):
+            self.assertEqual(ratelimit.client_ip(request), '203.0.113.7')
+
+    def test_admin_lists_and_resets_counters(self):
+        self.post('bot@example.com')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        url = reverse('admin:portfolio_contactmessage_rate_limits')
+        response = self.client.get(url)
+        self.assertContains(response, '10.0.0.1')
+        self.assertContains(response, 'bot@example.com')
+        self.assertContains(response, '2 / 3')
+
+        cache_key = ratelimit.TokenBucket('ip', '3/60').cache_key('10.0.0.1')
+        self.assertRedirects(self.client.post(url, {'cache_key': cache_key}), url)
+        self.assertIsNone(cache.get(cache_key))
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        self.project = Project.objects.create(
+            title="Fragment Project", slug="fragment-project", category="Web",
+            short_description="Short desc", description="Long desc", detailed_content="Detail",
+            tech_stack="Django", project_date="2025", featured=True,
+        )
+
+    def get(self, url):
+        # A new content version misses the page cache but not the fragments.
+        bump_content_version()
+        return self.client.get(url)
+
+    def test_page_miss_reuses_unchanged_fragments(self):
+        details = reverse('portfolio-details', args=[self.project.slug])
+        self.get(reverse('home'))
+        self.get(details)
+        # Bypasses auto_now, so the fragment versions stay the same.
+        Project.objects.filter(pk=self.project.pk).update(tech_stack="Rust", short_description="Changed")
+        self.assertContains(self.get(reverse('home')), "Short desc")
+        self.assertContains(self.get(details), "Django")
+
+    def test_project_and_child_changes_rerender_fragments(self):
+        details = reverse('portfolio-details', args=[self.project.slug])
+        self.get(reverse('home'))
+        self.get(details)
+        self.project.short_description = "Changed"
+        self.project.save()
+        self.assertContains(self.get(reverse('home')), "Changed")
+
+        ProjectTag.objects.create(project=self.project, name="Fresh Tag")
+        self.assertContains(self.get(reverse('home')), "Fresh Tag")
+        self.assertContains(self.get(details), "Fresh Tag")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        self.project = Project.objects.create(
+            title="Validated Project",
+            slug="validated-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Detailed content here",
+            tech_stack="Django",
+            project_date="2025",
+            featured=True
+        )
+        self.urls = [reverse('home'), reverse('portfolio-details', args=[self.project.slug])]
+
+    def test_revalidation_returns_304_without_queries(self):
+        """A matching If-None-Match or If-Modified-Since gets an empty 304"""
+        for url in self.urls:
+            first = self.client.get(url)
+            self.assertIn('no-cache', first['Cache-Control'])
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(response.status_code, 304)
+
+    def test_content_change_invalidates_validators(self):
+        """Editing (or deleting) anything shown on the pages yields a full 200 again"""
+        etag = self.client.get(self.urls[1])['ETag']
+        ProjectTag.objects.create(project=self.project, name="New Tag")
+        response = self.client.get(self.urls[1], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "New Tag")
+
+        etag = response['ETag']
+        ProjectTag.objects.all().delete()
+        self.assertEqual(self.client.get(self.urls[1], HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_or_deleted_slug_is_never_revalidated(self):
+        """The validators are site-wide: a current ETag must not turn a 404 into a 304"""
+        home = self.client.get(self.urls[0])
+        missing = reverse('portfolio-details', args=['missing'])
+        response = self.client.get(missing, HTTP_IF_NONE_MATCH=home['ETag'])
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        response = self.client.get(missing, HTTP_IF_MODIFIED_SINCE=home['Last-Modified'])
+        self.assertEqual(response.status_code, 404)
+
+        detail = self.client.get(self.urls[1])
+        self.project.delete()
+        home = self.client.get(self.urls[0])
+        for headers in ({'HTTP_IF_NONE_MATCH': detail['ETag']}, {'HTTP_IF_NONE_MATCH': home['ETag']}):
+            self.assertEqual(self.client.get(self.urls[1], **headers).status_code, 404)
+
+    def test_tag_and_image_changes_touch_the_project(self):
+        before = Project.objects.get(pk=self.project.pk).updated_at
+        ProjectTag.objects.create(project=self.project, name="Touch")
+        self.assertGreater(Project.objects.get(pk=self.project.pk).updated_at, before)
+
+    def test_cold_cache_seed_is_stable(self):
+        """Every process derives the same validators from the database after a flush"""
+        cache.clear()
+        seeded = get_content_state()
+        cache.clear()
+        self.assertEqual(get_content_state(), seeded)
+        self.assertEqual(seeded[1], Project.objects.get(pk=self.project.pk).updated_at)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        self.project = Project.objects.create(
+            title="Async Project",
+            slug="async-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Detailed content here",
+            tech_stack="Django",
+            project_date="2025",
+            featured=True
+        )
+        ProjectTag.objects.create(project=self.project, name="Asyncio")
+
+    async def test_pages_render_under_asgi(self):
+        """The async views load their data concurrently and render under AsyncClient"""
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Async Project")
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertEqual((await self.async_client.get(reverse('home')))['X-Page-Cache'], 'HIT')
+
+        response = await self.async_client.get(reverse('portfolio-details', args=[self.project.slug]))
+        self.assertContains(response, "Asyncio")
+        self.assertEqual((await self.async_client.get(reverse('portfolio-details', args=['missing']))).status_code, 404)
+
+    async def test_contact_post_queues_emails(self):
+        response = await self.async_client.post(reverse('contact'), data={
+            'name': 'Recruiter',
+            'email': 'job@company.com',
+            'subject': 'Job Offer',
+            'message': 'We want to hire you.',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(await OutboxEmail.objects.filter(status='pending').acount(), 2)
+
+
+class BenchServersTests(TransactionTestCase):
+    """The handlers run in other threads, so the rows must be committed."""
+
+    def test_bench_servers_reports_both_modes(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        out = StringIO()
+        call_command('bench_servers', url=[reverse('home')], requests=4, warmup=1, concurrency=1, stdout=out)
+        self.assertRegex(out.getvalue(), r'wsgi +/ +[\d.]+')
+        self.assertRegex(out.getvalue(), r'asgi +/ +[\d.]+')
+
+
+class SyntheticDataTests(MediaRootMixin, TestCase):
+    def generate(self, **options):
+        call_command(
+            'generate_synthetic_data', projects=5, tags_per_project=3, images_per_project=2,
+            messages=7, small_models=2, batch_size=4, stdout=StringIO(), **options,
+        )
+
+    def test_generates_and_clears_only_synthetic_rows(self):
+        real = Project.objects.create(
+            title="Real", slug="real", category="Web", short_description="s", description="d",
+            detailed_content="x", tech_stack="Django", project_date="2025",
+        )
+        self.generate()
+        self.assertEqual(Project.objects.filter(slug__startswith='synthetic-').count(), 5)
+        self.assertEqual(ProjectTag.objects.filter(project__slug__startswith='synthetic-').count(), 15)
+        self.assertEqual(ProjectImage.objects.count(), 10)
+        self.assertEqual(ContactMessage.objects.count(), 7)
+        self.assertTrue((self.media_root / 'synthetic/placeholder.jpg').exists())
+
+        self.generate(clear=True)
+        self.assertEqual(Project.objects.filter(slug__startswith='synthetic-').count(), 5)
+        self.assertEqual(ContactMessage.objects.count(), 7)
+        self.assertTrue(Project.objects.filter(pk=real.pk).exists())
+
+    def test_image_sizes_match_the_placeholder_file(self):
+        self.generate()
+        with Image.open(self.media_root / 'synthetic/placeholder.jpg') as img:
+            size = img.size
+        project = Project.objects.get(slug='synthetic-0')
+        self.assertEqual((project.thumbnail_width, project.thumbnail_height), size)
+        self.assertTrue(project.thumbnail_placeholder.startswith('data:image/jpeg;base64,'))
+        self.assertEqual(
+            set(ProjectImage.objects.values_list('width', 'height', 'dominant_color')),
+            {(*size, project.thumbnail_color)},
+        )
+
+    def test_generated_pages_render(self):
+        self.generate()
+        self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('portfolio-details', args=['synthetic-0'])).status_code, 200)
+
+
+class BenchViewsTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        call_command(
+            'generate_synthetic_data', projects=3, tags_per_project=2, images_per_project=1,
+            messages=3, small_models=1, stdout=StringIO(),
+        )
+        self.baseline = self.media_root / 'baseline.json'
+
+    def bench(self, **options):
+        out = StringIO()
+        call_command('bench_views', repeat=2, warmup=0, baseline=str(self.baseline), stdout=out, **options)
+        return out.getvalue()
+
+    def test_saves_and_checks_baseline(self):
+        self.bench(save_baseline=True)
+        self.assertEqual(
+            set(json.loads(self.baseline.read_text())),
+            {'home', 'portfolio_details', 'admin:project_changelist',
+             'admin:skill_changelist', 'admin:contactmessage_changelist'},
+        )
+        self.assertIn('Within the baseline.', self.bench(tolerance=100))
+
+    def test_uncached_runs_render_the_fragments_too(self):
+        def fragments():
+            return [key for key in cache._cache if 'template.cache.' in key]
+
+        cache.clear()
+        self.bench()
+        self.assertEqual(fragments(), [])
+        self.bench(cached=True)
+        self.assertNotEqual(fragments(), [])
+
+    def test_fails_on_regression(self):
+        self.baseline.write_text(json.dumps({'home': {'median_ms': 0.001, 'p95_ms': 0.001, 'queries': 0}}))
+        with self.assertRaisesMessage(CommandError, 'home: median'):
+            self.bench()
+
+
+class ProjectApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.projects = Project.objects.bulk_create([
+            Project(
+                title=f"API Project {i}", slug=f"api-project-{i}", category="AI" if i % 2 else "Web",
+                short_description="Short desc", description="Long desc", detailed_content="Detail",
+                tech_stack="Django, Python", project_date="2025", order=i // 3,
+            )
+            for i in range(7)
+        ])
+        ProjectTag.objects.bulk_create([
+            ProjectTag(project=p, name="Django") for p in self.projects
+        ] + [ProjectTag(project=p, name="Pandas") for p in self.projects[::3]])
+
+    def walk(self, url):
+        """Follow ``next`` links and return every slug in order."""
+        slugs = []
+        while url:
+            data = self.client.get(url).json()
+            slugs += [item['slug'] for item in data['results']]
+            url = data['next']
+        return slugs
+
+    def test_keyset_pages_follow_meta_ordering_without_gaps(self):
+        expected = list(Project.objects.order_by('order', '-created_at', '-id').values_list('slug', flat=True))
+        self.assertEqual(self.walk(reverse('api-project-list') + '?limit=2'), expected)
+
+    def test_filters_and_projection(self):
+        data = self.client.get(reverse('api-project-list'), {'category': 'AI', 'tag': 'pandas', 'fields': 'slug,tags'}).json()
+        self.assertEqual(data['results'], [{'slug': 'api-project-3', 'tags': ['Django', 'Pandas']}])
+        self.assertEqual(self.client.get(reverse('api-project-list'), {'fields': 'password'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api-project-list'), {'cursor': 'garbage'}).status_code, 400)
+
+        detail = self.client.get(reverse('api-project-detail', args=['api-project-1'])).json()
+        self.assertEqual(detail['category_display'], 'AI & Data Science')
+        self.assertEqual(detail['tech_stack'], ['Django', 'Python'])
+        self.assertEqual(detail['url'], 'http://testserver/project/api-project-1/')
+        self.assertEqual(self.client.get(reverse('api-project-detail', args=['nope'])).status_code, 404)
+
+    def test_warm_list_is_one_query_and_edits_refresh_the_payload(self):
+        url = reverse('api-project-list')
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        project = Project.objects.get(slug='api-project-0')
+        project.title = "Renamed"
+        project.save()
+        # Only the edited project is reloaded: the row, its tags and images
+        with self.assertNumQueries(4):
+            data = self.client.get(url, {'fields': 'slug,title'}).json()
+        self.assertIn({'slug': 'api-project-0', 'title': 'Renamed'}, data['results'])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.ledger = Project.objects.create(
+            title="Ledger Reconciliation Tool",
+            slug="ledger-tool",
+            category="Web",
+            short_description="Automates month-end <close> work",
+            description="Matches bank lines to the general ledger",
+            detailed_content="Built for small accounting teams",
+            tech_stack="Django, Pandas",
+            project_date="2025",
+        )
+        self.forecast = Project.objects.create(
+            title="Sales Forecasting",
+            slug="sales-forecasting",
+            category="AI",
+            short_description="Time-series models",
+            description="Mentions the ledger once in passing",
+            detailed_content="Prophet and ARIMA",
+            tech_stack="Python",
+            project_date="2025",
+        )
+
+    def search(self, q):
+        return self.client.get(reverse('api-search'), {'q': q}).json()['results']
+
+    def test_ranked_results_with_highlighted_snippets(self):
+        """A title hit outranks a body hit; snippets are escaped with <mark>ed matches"""
+        results = self.search('ledger')
+        self.assertEqual([r['slug'] for r in results], ['ledger-tool', 'sales-forecasting'])
+        self.assertIn('<mark>Ledger</mark>', results[0]['snippet'])
+        self.assertIn('<mark>', self.search('month end')[0]['snippet'])
+        self.assertIn('&lt;<mark>close</mark>&gt;', self.search('close')[0]['snippet'])
+        # Prefix match on the last word, stemming, and quotes/operators are inert
+        self.assertEqual([r['slug'] for r in self.search('forecas')], ['sales-forecasting'])
+        self.assertEqual([r['slug'] for r in self.search('reconciling')], ['ledger-tool'])
+        self.assertEqual(self.search('"ledger" OR NEAR('), [])
+
+    def test_index_follows_saves_tags_and_deletes(self):
+        self.assertEqual(self.search('kubernetes'), [])
+        tag = ProjectTag.objects.create(project=self.forecast, name="Kubernetes")
+        self.assertEqual([r['slug'] for r in self.search('kubernetes')], ['sales-forecasting'])
+        tag.delete()
+        self.assertEqual(self.search('kubernetes'), [])
+
+        self.forecast.title = "Demand Planner"
+        self.forecast.save()
+        self.assertEqual([r['slug'] for r in self.search('planner')], ['sales-forecasting'])
+        self.forecast.delete()
+        self.assertEqual([r['slug'] for r in self.search('ledger')], ['ledger-tool'])
+
+    def test_rebuild_command_restores_bulk_imported_rows(self):
+        Project.objects.bulk_create([Project(
+            title="Imported Inventory", slug="imported", category="Web", short_description="x",
+            description="x", detailed_content="x", tech_stack="x", project_date="2025",
+        )])
+        self.assertEqual(self.search('inventory'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual([r['slug'] for r in self.search('inventory')], ['imported'])
+
+    def test_bench_search_runs(self):
+        out = StringIO()
+        call_command('bench_search', projects=300, queries=7, compare_like=True, stdout=out)
+        self.assertIn('fts5 (all queries)', out.getvalue())
+
+
+class RelatedProjectsTests(TestCase):
+    def make(self, slug, category="Web", tech_stack="Django", tags=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(
+                title=slug.title(), slug=slug, category=category, short_description="s",
+                description="d", detailed_content="x", tech_stack=tech_stack, project_date="2025",
+            )
+            for name in tags:
+                ProjectTag.objects.create(project=project, name=name)
+        return project
+
+    def neighbours(self, project):
+        return list(Project.objects.filter(neighbour_of__project=project).order_by('neighbour_of__rank'))
+
+    def test_ranks_by_tag_and_tech_overlap(self):
+        base = self.make("base", tech_stack="Django, Pandas", tags=["ML", "Finance", "Audit"])
+        close = self.make("close", category="AI", tech_stack="Django, Pandas", tags=["ml", "Finance"])
+        same_category = self.make("same-category", tech_stack="Go")
+        partial = self.make("partial", category="AI", tech_stack="React", tags=["Audit"])
+        self.make("unrelated", category="Mobile", tech_stack="Kotlin", tags=["Games"])
+        self.assertEqual(self.neighbours(base), [close, partial, same_category])
+
+    def test_updates_incrementally_on_commit(self):
+        base = self.make("base", tags=["ML"])
+        other = self.make("other", category="AI", tech_stack="Go")
+        self.assertEqual(self.neighbours(other), [])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            ProjectTag.objects.create(project=other, name="ml")
+            other.tech_stack = "Django"
+            other.save()
+        # Several changes in one transaction: a single recompute.
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.neighbours(other), [base])
+        self.assertEqual(self.neighbours(base), [other])
+
+        third = self.make("third", tags=["ML"])
+        self.assertEqual(self.neighbours(base), [third, other])
+        with self.captureOnCommitCallbacks(execute=True):
+            third.delete()
+        self.assertEqual(self.neighbours(base), [other])
+
+    def test_incremental_matches_full_rebuild(self):
+        rng = random.Random(3)
+        projects = [
+            self.make(
+                f"p{i}", category=rng.choice(["Web", "AI"]),
+                tech_stack=", ".join(rng.sample(["Django", "React", "Go", "Pandas"], 2)),
+                tags=rng.sample(["ML", "Finance", "Audit", "Tax", "API", "Charts"], 2),
+            )
+            for i in range(12)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            projects[0].tags.all().delete()
+            projects[5].delete()
+        incremental = list(RelatedProject.objects.values_list('project', 'related', 'rank'))
+        tokens = set(RelatedToken.objects.values_list('project', 'kind', 'token'))
+        related.rebuild_related()
+        self.assertEqual(list(RelatedProject.objects.values_list('project', 'related', 'rank')), incremental)
+        self.assertEqual(set(RelatedToken.objects.values_list('project', 'kind', 'token')), tokens)
+
+    def test_only_token_sharing_projects_are_scored(self):
+        base = self.make("base", tags=["ML"])
+        match = self.make("match", category="AI", tags=["ML"])
+        loners = [
+            self.make(f"loner-{i}", category="Mobile", tech_stack=f"Lang{i}", tags=[f"Topic{i}"]) for i in range(6)
+        ]
+        with mock.patch.object(related, 'similarity', wraps=related.similarity) as scored:
+            related.rebuild_related()
+        # Each loner only meets its category's leaders; base and match only each other.
+        self.assertLess(scored.call_count, 8 * 7)
+
+        with mock.patch.object(related, 'load_features', wraps=related.load_features) as loaded:
+            with self.captureOnCommitCallbacks(execute=True):
+                ProjectTag.objects.create(project=match, name="Finance")
+        requested = set().union(*(set(call.args[0]) for call in loaded.call_args_list))
+        self.assertLessEqual(requested, {base.pk, match.pk})
+        self.assertEqual(self.neighbours(base), [match])
+        self.assertTrue(all(self.neighbours(loner) for loner in loners))
+
+    def test_update_looks_tokens_up_by_exact_match(self):
+        base = self.make("base", tech_stack="Django, Pandas", tags=["ML"])
+        match = self.make("match", category="AI", tech_stack=" pandas", tags=["Audit"])
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                ProjectTag.objects.create(project=match, name=" ml ")
+        sql = ' '.join(q['sql'] for q in queries).upper()
+        self.assertNotIn(' LIKE ', sql)
+        self.assertNotIn('LOWER(', sql)
+        self.assertEqual(
+            set(RelatedToken.objects.filter(project=match).values_list('kind', 'token')),
+            {('tag', 'audit'), ('tag', 'ml'), ('tech', 'pandas')},
+        )
+        self.assertEqual(self.neighbours(base), [match])
+
+    def test_rolled_back_update_is_not_left_queued(self):
+        base = self.make("base", tags=["ML"])
+        try:
+            with transaction.atomic():
+                ProjectTag.objects.create(project=base, name="Dropped")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        match = self.make("match", category="AI", tags=["ML"])
+        self.assertEqual(self.neighbours(base), [match])
+
+    def test_detail_page_reads_the_table(self):
+        base = self.make("base", tags=["ML"])
+        self.make("match", category="AI", tags=["ML"])
+        self.make("no-match", category="AI", tech_stack="Go")
+        response = self.client.get(reverse('portfolio-details', args=[base.slug]))
+        self.assertEqual([p.slug for p in response.context['related_projects']], ['match'])
+
+
+class ProjectCardsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Project.objects.bulk_create([
+            Project(
+                title=f"Card {i}", slug=f"card-{i}", category="AI" if i % 3 == 0 else "Web",
+                short_description="Short desc", description="Long desc", detailed_content="Detail",
+                tech_stack="Django", project_date="2025", featured=True, order=i,
+            )
+            for i in range(14)
+        ])
+
+    def test_home_renders_only_the_first_page(self):
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.content.decode().count('class="col-lg-4 col-md-6 isotope-item'), views.PROJECT_PAGE_SIZE)
+        self.assertContains(response, '<strong>14</strong><span>Projects</span>', html=False)
+        self.assertNotContains(response, 'data-next=""')
+
+    def test_fragment_pages_through_a_category(self):
+        url = reverse('project-cards')
+        titles, cursor = [], None
+        while True:
+            data = self.client.get(url, {'category': 'web', **({'cursor': cursor} if cursor else {})}).json()
+            titles += re.findall(r'>(Card \d+)</a></h3>', data['html'])
+            self.assertNotIn('filter-ai', data['html'])
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(titles, [f"Card {i}" for i in range(14) if i % 3])
+
+        everything = self.client.get(url, {'category': '*'}).json()
+        self.assertEqual(everything['html'].count('isotope-item'), views.PROJECT_PAGE_SIZE)
+        self.assertEqual(self.client.get(url, {'cursor': '!!'}).status_code, 400)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite-specific')
+class QueryPlanTests(TestCase):
+    """Every listing the app issues reads an index in order: no full scan, no sort."""
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f'USING INDEX {index}', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_project_listings(self):
+        self.assertUsesIndex(views._featured_projects().order_by(*PROJECT_ORDERING)[:7], 'project_featured_idx')
+        self.assertUsesIndex(views._featured_projects('ai').order_by(*PROJECT_ORDERING)[:7], 'project_featured_idx')
+        self.assertUsesIndex(Project.objects.filter(featured=True), 'project_featured_idx')
+        self.assertUsesIndex(
+            Project.objects.exclude(slug='some-slug').filter(category='AI')[:3], 'project_category_idx'
+        )
+        self.assertUsesIndex(Project.objects.order_by(*PROJECT_ORDERING)[:21], 'project_ordering_idx')
+        self.assertUsesIndex(
+            Project.objects.filter(category='AI').order_by(*PROJECT_ORDERING)[:21], 'project_category_idx'
+        )
+
+    def test_children_and_messages(self):
+        project = Project.objects.create(
+            title="Plan", slug="plan", category="Web", short_description="s", description="d",
+            detailed_content="x", tech_stack="Django", project_date="2025",
+        )
+        self.assertUsesIndex(project.images.all(), 'projectimage_project_order_idx')
+        self.assertUsesIndex(RelatedToken.objects.filter(kind='tag', token__in=['ml', 'api']), 'relatedtoken_lookup_idx')
+        self.assertUsesIndex(ContactMessage.objects.all()[:100], 'contact_created_idx')
+        self.assertUsesIndex(ContactMessage.objects.filter(read=False)[:100], 'contact_unread_idx')
+
+
+class QueryBudgetTests(TestCase):
+    """Each public view runs a fixed number of queries however much content exists."""
+    HOME_BUDGET = 9
+    DETAILS_BUDGET = 5
+
+    def setUp(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        # Two projects, so the detail page has a related card to render
+        self.project = self.add_projects(2)[0]
+
+    def add_projects(self, count, tags=3, images=2):
+        start = Project.objects.count()
+        projects = Project.objects.bulk_create([
+            Project(
+                title=f"Project {i}", slug=f"project-{i}", category="Web",
+                short_description="Short desc", description="Long desc",
+                tech_stack="Django", project_date="2025", featured=True,
+            )
+            for i in range(start, start + count)
+        ])
+        ProjectTag.objects.bulk_create([
+            ProjectTag(project=p, name=f"Tag {n}") for p in projects for n in range(tags)
+        ])
+        ProjectImage.objects.bulk_create([
+            ProjectImage(project=p, image=f"projects/gallery/{p.slug}-{n}.jpg", order=n)
+            for p in projects for n in range(images)
+        ])
+        # bulk_create skips the signals that maintain the neighbour table
+        related.rebuild_related()
+        return projects
+
+    def assertQueryBudget(self, url, budget):
+        """GET ``url`` uncached and fail with the repeated statements if it exceeds ``budget``."""
+        # A fresh version misses the page cache without the cold-cache seeding queries
+        bump_content_version()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if len(queries) != budget:
+            repeated = Counter(query_fingerprint(q['sql']) for q in queries)
+            details = '\n'.join(f'  {n}x {sql}' for sql, n in repeated.most_common())
+            self.fail(f'{url} ran {len(queries)} queries, budget is {budget}:\n{details}')
+
+    def test_home_budget_is_independent_of_content(self):
+        self.assertQueryBudget(reverse('home'), self.HOME_BUDGET)
+        self.add_projects(20, tags=5)
+        self.assertQueryBudget(reverse('home'), self.HOME_BUDGET)
+
+    def test_details_budget_is_independent_of_content(self):
+        url = reverse('portfolio-details', args=[self.project.slug])
+        self.assertQueryBudget(url, self.DETAILS_BUDGET)
+        self.add_projects(10, tags=5, images=6)
+        ProjectImage.objects.bulk_create([
+            ProjectImage(project=self.project, image=f"projects/gallery/extra-{n}.jpg") for n in range(8)
+        ])
+        self.assertQueryBudget(url, self.DETAILS_BUDGET)
+
+    @override_settings(QUERY_STATS_HEADERS=True)
+    async def test_async_requests_count_their_queries(self):
+        """Under ASGI the queries run on the ORM's worker thread and are still counted"""
+        await sync_to_async(bump_content_version)()
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Query-Count'], str(self.HOME_BUDGET))
+        self.assertEqual(response['X-Query-Duplicates'], '0')
+
+    @override_settings(QUERY_DUPLICATES_WARNING=1)
+    def test_only_many_duplicates_are_warnings(self):
+        def cards():
+            # One tag query per project: an N+1 loop.
+            return HttpResponse(str([list(p.tags.all()) for p in Project.objects.all()]))
+
+        middleware = QueryInstrumentationMiddleware(lambda request: cards())
+        request = RequestFactory().get('/')
+        with self.assertLogs('portfolio.middleware', 'DEBUG') as logs:
+            middleware(request)
+        self.assertEqual(logs.records[0].levelname, 'DEBUG')
+        self.assertIn('1 duplicate(s)', logs.output[0])
+        self.add_projects(1)
+        with self.assertLogs('portfolio.middleware', 'DEBUG') as logs:
+            middleware(request)
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+
+    @override_settings(QUERY_STATS_HEADERS=True)
+    def test_middleware_reports_queries_in_headers(self):
+        response = self.client.get(reverse('portfolio-details', args=[self.project.slug]))
+        self.assertEqual(response['X-Query-Count'], str(self.DETAILS_BUDGET))
+        self.assertEqual(response['X-Query-Duplicates'], '0')
+        self.assertTrue(response['Server-Timing'].startswith('db;dur='))
+
+
+class AssetPipelineTests(TestCase):
+    def test_minify_css_keeps_strings_calc_and_licenses(self):
+        css = '/*! keep */\n/* drop */\n.a > .b ,  .c {\n  width: calc(100% - 2px);\n  content: "a  /* b */";\n}\n'
+        self.assertEqual(
+            assets.minify_css(css), '/*! keep */.a>.b,.c{width:calc(100% - 2px);content:"a  /* b */"}'
+        )
+
+    def test_prune_keeps_only_used_selectors(self):
+        nodes = assets.parse_css(
+            '.used,.unused{color:red}.btn:not(.gone){margin:0}table{border:0}'
+            '[role=dialog]{z-index:1}@media (min-width:1px){.unused{x:y}.used{x:z}}'
+        )
+        self.assertEqual(
+            assets.serialize_css(assets.prune_css(nodes, {'used', 'btn'})),
+            '.used{color:red}.btn:not(.gone){margin:0}table{border:0}@media (min-width:1px){.used{x:z}}',
+        )
+        self.assertEqual(
+            assets.serialize_css(assets.prune_css(nodes, {'used', 'btn', 'role', 'dialog'}, elements=True)),
+            '.used{color:red}.btn:not(.gone){margin:0}[role=dialog]{z-index:1}@media (min-width:1px){.used{x:z}}',
+        )
+
+    def test_minify_js_respects_literals(self):
+        js = (
+            '// comment\n'
+            'var url = "http://x"; /* block */\n'
+            'var re = /\\/\\/[/]/g;   var half = a / 2 / b;\n'
+            'var t = `line\n  two ${ "}" + c /* in */ }`;\n'
+        )
+        self.assertEqual(assets.minify_js(js), (
+            'var url = "http://x";\n'
+            'var re = /\\/\\/[/]/g; var half = a / 2 / b;\n'
+            'var t = `line\n  two ${ "}" + c }`;\n'
+        ))
+
+    def test_rewrite_urls_relative_to_bundle(self):
+        css = 'src:url("fonts/x.woff2?v=1"),url(data:abc);b:url(/abs.png)'
+        self.assertEqual(
+            assets.rewrite_urls(css, 'vendor/icons/icons.css', 'dist/home.css'),
+            'src:url("../vendor/icons/fonts/x.woff2?v=1"),url(data:abc);b:url(/abs.png)',
+        )
+
+    def test_built_bundles_replace_the_source_files(self):
+        output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output)
+        call_command('build_assets', output=output, stdout=StringIO(), stderr=StringIO())
+        for name in assets.BUNDLES:
+            for suffix in ('css', 'js', 'critical.css'):
+                self.assertTrue((Path(output) / 'dist' / f'{name}.{suffix}').stat().st_size)
+        # Bootstrap rules for components the templates never use are gone.
+        self.assertNotIn('.carousel-item', (Path(output) / 'dist' / 'home.css').read_text())
+
+        def render():
+            cache.clear()
+            portfolio_assets.built_file.cache_clear()
+            portfolio_assets._inline_css.cache_clear()
+            return self.client.get(reverse('home')).content.decode()
+
+        self.addCleanup(portfolio_assets.built_file.cache_clear)
+        self.addCleanup(portfolio_assets._inline_css.cache_clear)
+        with override_settings(STATICFILES_DIRS=[*settings.STATICFILES_DIRS, output], ASSET_BUNDLES=True):
+            html = render()
+        self.assertIn('<style>', html)
+        self.assertIn('rel="preload" href="/static/dist/home.css"', html)
+        self.assertEqual(html.count('<script src='), 1)
+        self.assertNotIn('bootstrap.min.css', html)
+
+        with override_settings(ASSET_BUNDLES=False):
+            html = render()
+        self.assertIn('vendor/bootstrap/css/bootstrap.min.css', html)
+        self.assertNotIn('dist/home', html)
+
+
+class ExportSiteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Profile.objects.create(name="Test User", email="test@example.com", bio="Test Bio")
+        self.project = Project.objects.create(
+            title="Exported Project",
+            slug="exported-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Detailed content here",
+            tech_stack="Django",
+            project_date="2025",
+            featured=True
+        )
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+
+    def export(self):
+        out = StringIO()
+        call_command('export_site', output=str(self.output), skip_static=True, skip_media=True, stdout=out)
+        return out.getvalue()
+
+    def test_export_writes_pages_with_compressed_siblings(self):
+        """Every public page is written as index.html plus a .gz variant"""
+        self.export()
+        home = self.output / 'index.html'
+        detail = self.output / 'project' / 'exported-project' / 'index.html'
+        self.assertIn("Exported Project", home.read_text())
+        self.assertIn("Exported Project", detail.read_text())
+        self.assertTrue((self.output / 'index.html.gz').exists())
+
+    def test_export_only_rerenders_changed_pages(self):
+        """A second run skips unchanged pages and removes deleted ones"""
+        self.export()
+        self.assertIn("0 page(s) rendered, 2 unchanged", self.export())
+
+        ProjectTag.objects.create(project=self.project, name="Fresh")
+        self.assertIn("2 page(s) rendered, 0 unchanged", self.export())
+
+        self.project.delete()
+        self.assertIn("1 removed", self.export())
+        self.assertFalse((self.output / 'project' / 'exported-project').exists())
+
+    def test_export_renders_the_whole_gallery(self):
+        """A file server has no project_cards endpoint: the home page holds every card"""
+        Project.objects.bulk_create([
+            Project(
+                title=f"Gallery {i}", slug=f"gallery-{i}", category="AI", short_description="s",
+                description="d", detailed_content="x", tech_stack="Go", project_date="2025", featured=True,
+            )
+            for i in range(views.PROJECT_PAGE_SIZE + 2)
+        ])
+        self.export()
+        home = (self.output / 'index.html').read_text()
+        self.assertEqual(home.count('isotope-item'), views.PROJECT_PAGE_SIZE + 3)
+        self.assertIn('data-cards-url=""', home)
+
+        # The live page (and its cache) still pages.
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.content.decode().count('isotope-item'), views.PROJECT_PAGE_SIZE)
+        self.assertContains(response, f'data-cards-url="{reverse("project-cards")}"')
+
+
+
+class RichtextStorageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(
+            title="Rich Project",
+            slug="rich-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Features:\n• Fast\n• Small",
+            tech_stack="Django",
+            project_date="2025",
+        )
+
+    def test_html_rendered_on_save_and_only_when_source_changes(self):
+        """detailed_content_html follows detailed_content and nothing else"""
+        self.assertEqual(
+            self.project.detailed_content_html,
+            '<h4 class="fk-rich-heading">Features</h4>\n'
+            '<ul class="fk-rich-list"><li>Fast</li><li>Small</li></ul>',
+        )
+        self.assertFalse(self.project.refresh_detailed_content_html())
+
+        self.project.detailed_content = "Just a paragraph"
+        self.project.save(update_fields=['detailed_content'])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.detailed_content_html, '<p>Just a paragraph</p>')
+
+    def test_backfill_command_fills_missing_html(self):
+        """render_richtext renders rows that were written without save()"""
+        Project.objects.filter(pk=self.project.pk).update(detailed_content_html='', detailed_content_hash='')
+        out = StringIO()
+        call_command('render_richtext', stdout=out)
+        self.assertIn("1 project(s)", out.getvalue())
+        self.project.refresh_from_db()
+        self.assertIn('<li>Fast</li>', self.project.detailed_content_html)
+
+        response = self.client.get(reverse('portfolio-details', args=[self.project.slug]))
+        self.assertContains(response, '<ul class="fk-rich-list"><li>Fast</li><li>Small</li></ul>', html=False)
+
+
+
+def legacy_richtext(value):
+    """The original block-splitting richtext filter, kept as the test oracle."""
+    if not value:
+        return ''
+
+    value = escape(value)
+    blocks = re.split(r'\n\s*\n', value.strip())
+    output = []
+
+    for block in blocks:
+        lines = [line.strip() for line in block.strip().split('\n') if line.strip()]
+        if not lines:
+            continue
+
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if line.endswith(':') and len(line) < 80:
+                output.append(f'<h4 class="fk-rich-heading">{line[:-1]}</h4>')
+                i += 1
+                continue
+            if line.startswith('•') or line.startswith('- '):
+                items = []
+                while i < len(lines) and (lines[i].startswith('•') or lines[i].startswith('- ')):
+                    items.append(re.sub(r'^[•\-]\s*', '', lines[i]))
+                    i += 1
+                output.append('<ul class="fk-rich-list">' + ''.join(f'<li>{item}</li>' for item in items) + '</ul>')
+                continue
+            if re.match(r'^\d+[\.\)]\s', line):
+                items = []
+                while i < len(lines) and re.match(r'^\d+[\.\)]\s', lines[i]):
+                    items.append(re.sub(r'^\d+[\.\)]\s*', '', lines[i]))
+                    i += 1
+                output.append('<ol class="fk-rich-list">' + ''.join(f'<li>{item}</li>' for item in items) + '</ol>')
+                continue
+            output.append(f'<p>{line}</p>')
+            i += 1
+
+    return mark_safe('\n'.join(output))
+
+
+class RichtextEngineTests(TestCase):
+    CORPUS = [
+        '',
+        '   \n\t\n',
+        'Plain paragraph',
+        'The Problem:\nSomething is slow.\n\nCore Features:\n• One\n• Two\n- Three\n\nSteps:\n1. First\n2) Second\n10. Tenth',
+        '- a\n\n- b',
+        '- a\n \t \n- b',
+        '• a\n1. b\n• c',
+        '1. a\n2. b:\n3. c',
+        '- Heading like:\n- item:',
+        '1.no space\n1. \n•\n-\n- ',
+        '<script>alert("x")</script> & \'quotes\':',
+        'x' * 79 + ':\n' + 'y' * 80 + ':',
+        '&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&&:',
+        'a\r\n\r\nb\r\n- c\r\n- d',
+        'a\x0b\n\x1c\nb\u2028c\n\u00a0\n• d',
+        '٣. Arabic-Indic digit\n٤) another',
+    ]
+
+    def test_corpus_matches_legacy_output(self):
+        """The single-pass engine is byte-identical to the original filter"""
+        for text in self.CORPUS:
+            with self.subTest(text=text):
+                expected = legacy_richtext(text)
+                self.assertEqual(render_richtext(text), expected)
+                self.assertEqual(type(render_richtext(text)), type(expected))
+
+    def test_fuzzed_inputs_match_legacy_output(self):
+        """Random mixes of list markers, whitespace and HTML stay identical"""
+        alphabet = [
+            'a', 'b', ' ', '\n', '\n', '\t', '\r', '•', '-', '- ', '1', '2', '. ', ')',
+            ':', '<', '&', '"', "'", '\x0b', '\x1c', '\u2028', '\u00a0', 'x' * 80,
+        ]
+        rng = random.Random(2024)
+        for _ in range(3000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+            self.assertEqual(render_richtext(text), legacy_richtext(text), repr(text))
+
+    def test_streaming_yields_blocks(self):
+        """iter_richtext streams one HTML block element at a time"""
+        blocks = list(iter_richtext('Intro:\n- a\n- b\n\nOutro'))
+        self.assertEqual(blocks, [
+            '<h4 class="fk-rich-heading">Intro</h4>',
+            '<ul class="fk-rich-list"><li>a</li><li>b</li></ul>',
+            '<p>Outro</p>',
+        ])
+
+
+
+@override_settings(CONTACT_EMAIL='me@example.com', DEFAULT_FROM_EMAIL='site@example.com')
+class OutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.post(reverse('contact'), data={
+            'name': 'Recruiter',
+            'email': 'job@company.com',
+            'subject': 'Job Offer',
+            'message': 'We want to hire you.'
+        })
+
+    def test_worker_sends_queued_emails(self):
+        """send_outbox delivers both emails and marks them sent"""
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox), ['job@company.com', 'me@example.com']
+        )
+        self.assertEqual(OutboxEmail.objects.filter(status='sent').count(), 2)
+
+    def test_failures_back_off_then_dead_letter(self):
+        """A failing server reschedules emails and dead-letters them after max attempts"""
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=ConnectionError('smtp down'),
+        ):
+            call_command('send_outbox', max_attempts=2, stdout=StringIO())
+            email = OutboxEmail.objects.get(to='me@example.com')
+            self.assertEqual(email.status, 'pending')
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.last_error, 'smtp down')
+            self.assertGreater(email.next_attempt_at, email.created_at)
+
+            # Not due yet, so a second run does nothing
+            call_command('send_outbox', max_attempts=2, stdout=StringIO())
+            self.assertEqual(OutboxEmail.objects.get(pk=email.pk).attempts, 1)
+
+            OutboxEmail.objects.update(next_attempt_at=email.created_at)
+            call_command('send_outbox', max_attempts=2, stdout=StringIO())
+        self.assertEqual(OutboxEmail.objects.filter(status='dead').count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_two_workers_never_claim_the_same_email(self):
+        """Of two claims that read the same due rows, only the first leases them"""
+        due = outbox._due_ids(10, timezone.now())
+        self.assertEqual(len(due), 2)
+        first = outbox.claim_batch(10)
+        with mock.patch.object(outbox, '_due_ids', return_value=due):
+            second = outbox.claim_batch(10)
+        self.assertEqual(sorted(email.pk for email in first), sorted(due))
+        self.assertEqual(second, [])
+
+        # Once the lease runs out the rows are claimable again.
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(len(outbox.claim_batch(10)), 2)
+
+
+
+class ResponsiveImageTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.project = Project.objects.create(
+            title="Pictured Project",
+            slug="pictured-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Detailed content here",
+            tech_stack="Django",
+            project_date="2025",
+            thumbnail=make_image_upload(),
+            featured=True
+        )
+
+    def render(self, field_file):
+        return Template(
+            '{% load portfolio_images %}'
+            '{% responsive_image image sizes="50vw" alt="Alt" css_class="thumb" loading="lazy" %}'
+        ).render(Context({'image': field_file}))
+
+    def test_picture_markup_lists_webp_and_jpeg_variants(self):
+        """The thumbnail (800px stored) gets 400w and 800w sources in both formats"""
+        html = self.render(self.project.thumbnail)
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertRegex(html, r'srcset="[^"]+\.webp 400w, [^"]+\.webp 800w"')
+        self.assertRegex(html, r'<img src="[^"]+\.jpg" srcset="[^"]+\.jpg 400w, [^"]+\.jpg 800w" sizes="50vw"')
+        self.assertIn('alt="Alt" class="thumb" loading="lazy"', html)
+
+    def test_variants_are_written_once_to_disk(self):
+        """Reading the variant URLs generates files that are reused afterwards"""
+        self.render(self.project.thumbnail)
+        generated = sorted(p for p in (self.media_root / 'CACHE').rglob('*') if p.is_file())
+        self.assertEqual([p.suffix for p in generated].count('.webp'), 2)
+        with Image.open([p for p in generated if p.suffix == '.webp'][0]) as variant:
+            self.assertIn(variant.width, (400, 800))
+
+        mtimes = [p.stat().st_mtime_ns for p in generated]
+        self.render(Project.objects.get(pk=self.project.pk).thumbnail)
+        self.assertEqual([p.stat().st_mtime_ns for p in generated], mtimes)
+
+    def test_stored_width_spares_reading_the_image(self):
+        """Given the stored width, the tag never measures the source file"""
+        thumbnail = Project.objects.get(pk=self.project.pk).thumbnail
+        with mock.patch('django.core.files.images.ImageFile._get_image_dimensions') as measure:
+            html = Template(
+                '{% load portfolio_images %}{% responsive_image image width=800 height=600 %}'
+            ).render(Context({'image': thumbnail}))
+        measure.assert_not_called()
+        self.assertRegex(html, r'srcset="[^"]+\.jpg 400w, [^"]+\.jpg 800w"')
+
+        with mock.patch('django.core.files.images.ImageFile._get_image_dimensions', return_value=(800, 600)) as measure:
+            self.render(Project.objects.get(pk=self.project.pk).thumbnail)
+        measure.assert_called()
+
+    def test_profile_images_render_from_their_stored_sizes(self):
+        """Profile uploads record their processed size; the home page never measures them"""
+        profile = Profile.objects.create(
+            name="Test User", email="test@example.com", bio="Bio",
+            profile_image=make_image_upload('me.jpg'), hero_image=make_image_upload('hero.jpg', size=(2400, 1200)),
+        )
+        profile.refresh_from_db()
+        self.assertEqual((profile.profile_image_width, profile.profile_image_height), (500, 500))
+        self.assertEqual((profile.hero_image_width, profile.hero_image_height), (1920, 960))
+
+        with mock.patch('django.core.files.images.ImageFile._get_image_dimensions') as measure:
+            html = self.client.get(reverse('home')).content.decode()
+        measure.assert_not_called()
+        self.assertRegex(html, r'srcset="[^"]+\.jpg 640w, [^"]+\.jpg 1280w, [^"]+\.jpg 1920w"')
+
+    def test_missing_file_falls_back_to_plain_img(self):
+        """A thumbnail missing from storage still renders an <img>"""
+        (self.media_root / self.project.thumbnail.name).unlink()
+        html = self.render(Project.objects.get(pk=self.project.pk).thumbnail)
+        self.assertTrue(html.startswith('<img src="/media/projects/'))
+
+    def test_upload_records_size_placeholder_and_colour(self):
+        """Saving an upload stores the processed size, a data URI and the dominant colour"""
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.thumbnail_width, project.thumbnail_height), (800, 600))
+        self.assertTrue(project.thumbnail_placeholder.startswith('data:image/jpeg;base64,'))
+        r, g, b = (int(project.thumbnail_color[i:i + 2], 16) for i in (1, 3, 5))
+        self.assertTrue(abs(r - 200) < 10 and abs(g - 60) < 10 and abs(b - 30) < 10)
+
+        project.thumbnail = None
+        project.save()
+        project.refresh_from_db()
+        self.assertIsNone(project.thumbnail_width)
+        self.assertEqual(project.thumbnail_placeholder, '')
+
+    def test_card_reserves_space_with_placeholder(self):
+        """The home page card carries width/height and the inline placeholder"""
+        html = self.client.get(reverse('home')).content.decode()
+        self.assertIn('width="800" height="600" style="background-color:#', html)
+        self.assertIn('background-image:url(data:image/jpeg;base64,', html)
+
+
+
+class RegenerateImagesTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(
+            title="Pictured Project",
+            slug="pictured-project",
+            category="Web",
+            short_description="Short desc",
+            description="Long desc",
+            detailed_content="Detailed content here",
+            tech_stack="Django",
+            project_date="2025",
+            thumbnail=make_image_upload(),
+        )
+        self.state_file = str(self.media_root / 'state.json')
+
+    def regenerate(self):
+        out = StringIO()
+        call_command('regenerate_images', workers=2, state_file=self.state_file, stdout=out)
+        return out.getvalue()
+
+    def test_reprocesses_with_new_spec_and_skips_unchanged(self):
+        """A changed processor spec is applied once; the next run skips the file"""
+        field = Project._meta.get_field('thumbnail')
+        with mock.patch.object(field._original_spec, 'processors', [ResizeToFill(400, 300)]):
+            self.assertIn("1 processed, 0 unchanged", self.regenerate())
+            self.project.refresh_from_db()
+            with Image.open(self.media_root / self.project.thumbnail.name) as img:
+                self.assertEqual(img.size, (400, 300))
+            self.assertIn("0 processed, 1 unchanged", self.regenerate())
+        # Back to the declared spec: processed again
+        self.assertIn("1 processed, 0 unchanged", self.regenerate())
+        self.project.refresh_from_db()
+        with Image.open(self.media_root / self.project.thumbnail.name) as img:
+            self.assertEqual(img.size, (800, 600))
+
+    def test_hashed_image_is_saved_under_a_new_name(self):
+        """Reprocessing never rewrites a hashed file; the row moves to the new name"""
+        old_name = self.project.thumbnail.name
+        field = Project._meta.get_field('thumbnail')
+        with mock.patch.object(field._original_spec, 'processors', [ResizeToFill(400, 300)]):
+            self.regenerate()
+        self.project.refresh_from_db()
+        self.assertNotEqual(self.project.thumbnail.name, old_name)
+        self.assertTrue(media.is_hashed(self.project.thumbnail.name))
+        with Image.open(self.media_root / old_name) as img:
+            self.assertEqual(img.size, (800, 600))
+
+    def test_metadata_follows_reprocessed_file_and_is_backfilled(self):
+        """Reprocessed rows and rows without metadata get it recomputed"""
+        Project.objects.filter(pk=self.project.pk).update(thumbnail_width=None, thumbnail_placeholder='')
+        field = Project._meta.get_field('thumbnail')
+        with mock.patch.object(field._original_spec, 'processors', [ResizeToFill(400, 300)]):
+            self.assertIn("1 metadata row(s) updated", self.regenerate())
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.thumbnail_width, project.thumbnail_height), (400, 300))
+        self.assertTrue(project.thumbnail_placeholder)
+
+
+class HashedMediaTests(MediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.pdf = b'%PDF-1.4\n' + b'0123456789abcdef' * 4096
+        self.profile = Profile.objects.create(
+            name="Test User", email="test@example.com", bio="Test Bio",
+            cv_file=SimpleUploadedFile('cv.pdf', self.pdf, content_type='application/pdf'),
+        )
+
+    def get(self, name, **headers):
+        return self.client.get(f'/media/{name}', headers=headers)
+
+    def test_upload_names_carry_the_content_hash(self):
+        """Uploads get name.<hash>.ext; identical bytes reuse the same file"""
+        name = self.profile.cv_file.name
+        self.assertRegex(name, r'^docs/cv\.[0-9a-f]{12}\.pdf$')
+        again = default_storage.save('docs/cv.pdf', ContentFile(self.pdf))
+        self.assertEqual(again, name)
+        self.assertNotEqual(default_storage.save('docs/cv.pdf', ContentFile(self.pdf + b'%')), name)
+        self.assertEqual(default_storage.save('synthetic/a.txt', ContentFile(b'x')), 'synthetic/a.txt')
+
+    def test_hashed_files_are_immutable_and_precompressed(self):
+        """A hashed PDF is cached for a year and sent pre-compressed when accepted"""
+        name = self.profile.cv_file.name
+        response = self.get(name)
+        self.assertEqual(response['Cache-Control'], media.IMMUTABLE)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf)
+
+        response = self.get(name, accept_encoding='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.pdf)
+
+        self.assertEqual(self.get(name, if_none_match=response['ETag'], accept_encoding='gzip').status_code, 304)
+
+        (self.media_root / 'legacy.pdf').write_bytes(self.pdf)
+        self.assertEqual(self.get('legacy.pdf')['Cache-Control'], media.REVALIDATE)
+
+    def test_byte_ranges(self):
+        """Single ranges get a 206 slice; unsatisfiable ones a 416"""
+        name = self.profile.cv_file.name
+        response = self.get(name, range='bytes=9-24', accept_encoding='br')
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Content-Range'], f'bytes 9-24/{len(self.pdf)}')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf[9:25])
+
+        response = self.get(name, range='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), self.pdf[-4:])
+
+        response = self.get(name, range=f'bytes={len(self.pdf)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.pdf)}')
+
+        # A stale If-Range gets the whole file.
+        response = self.get(name, range='bytes=0-1', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_hidden_and_outside_files_are_not_served(self):
+        (self.media_root / '.regenerate-images.json').write_text('{}')
+        self.assertEqual(self.get('.regenerate-images.json').status_code, 404)
+        self.assertEqual(self.get('../etc/passwd').status_code, 404)
+        self.assertEqual(self.client.post(f'/media/{self.profile.cv_file.name}').status_code, 405)
+
+
+class ContactMessageAdminTests(TestCase):
+    def setUp(self):
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f'Sender {i}', email=f's{i}@example.com', subject='Hi', message=f'Line "{i}",\nnext')
+            for i in range(5)
+        ])
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(self.user)
+        self.url = reverse('admin:portfolio_contactmessage_changelist')
+
+    def action(self, action, pks=None, client=None):
+        data = {'action': action, '_selected_action': pks or [ContactMessage.objects.first().pk]}
+        if pks is None:
+            data['select_across'] = '1'
+        return (client or self.client).post(self.url, data)
+
+    def test_bulk_actions_are_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.action('mark_read')
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(ContactMessage.objects.filter(read=True).count(), 5)
+
+        pks = list(ContactMessage.objects.values_list('pk', flat=True)[:2])
+        self.action('archive', pks)
+        self.action('mark_unread', pks)
+        self.assertEqual(ContactMessage.objects.filter(archived=True, read=False).count(), 2)
+
+    def test_changelist_never_counts_the_whole_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Sender 4')
+        counts = [q['sql'] for q in queries.captured_queries if 'COUNT(' in q['sql']]
+        self.assertTrue(counts)
+        self.assertTrue(all('LIMIT' in sql for sql in counts), counts)
+
+    def test_estimated_count_paginator(self):
+        messages = ContactMessage.objects.all()
+        with mock.patch.object(EstimatedCountPaginator, 'exact_limit', 3):
+            # Unfiltered: the table estimate (the largest rowid on SQLite).
+            self.assertEqual(EstimatedCountPaginator(messages, 2).count, max(messages.values_list('pk', flat=True)))
+            self.assertEqual(EstimatedCountPaginator(messages.filter(read=False), 2).count, 4)
+            self.assertEqual(EstimatedCountPaginator(messages.filter(name='Sender 1'), 2).count, 1)
+
+    def test_exports_stream_every_row(self):
+        response = self.action('export_csv')
+        self.assertTrue(response.streaming)
+        self.assertIn('contact-messages.csv', response['Content-Disposition'])
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ContactMessageAdmin.export_fields)
+        self.assertEqual(len(rows), 6)
+        self.assertIn('Line "4",\nnext', [row[5] for row in rows])
+
+        response = self.action('export_jsonl')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['email'], 's4@example.com')
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(self.url, {
+            'action': 'export_jsonl', 'select_across': '1', '_selected_action': ['1'],
+        })
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.decode().splitlines()), 5)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(CONTACT_ARCHIVE_DIR=directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.directory = Path(directory)
+
+        now = timezone.now()
+        for i in range(5):
+            message = ContactMessage.objects.create(
+                name=f'Old {i}', email=f'old{i}@example.com', subject='Hi', message=f'Question {i}',
+            )
+            ContactMessage.objects.filter(pk=message.pk).update(created_at=now - timedelta(days=100 - i))
+        ContactMessage.objects.create(name='Recent', email='new@example.com', subject='Hi', message='Hello')
+
+    def archive(self, **options):
+        call_command('archive_messages', older_than=30, batch_size=2, format='gzip', stdout=StringIO(), **options)
+
+    def test_old_messages_move_to_indexed_segments(self):
+        self.archive()
+        self.assertEqual(list(ContactMessage.objects.values_list('name', flat=True)), ['Recent'])
+        blocks = archive.read_index()
+        self.assertEqual([block.rows for block in blocks], [2, 2, 1])
+        self.assertEqual(len({block.segment for block in blocks}), 1)
+        self.assertTrue((self.directory / blocks[0].segment).name.endswith('.jsonl.gz'))
+        self.assertEqual([row['name'] for row in archive.read_block(blocks[1])], ['Old 2', 'Old 3'])
+
+        # Appending: a second run adds blocks without touching the first ones.
+        ContactMessage.objects.filter(name='Recent').update(created_at=timezone.now() - timedelta(days=40))
+        self.archive()
+        self.assertEqual(len(archive.read_index()), 4)
+        self.assertFalse(ContactMessage.objects.exists())
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command('archive_messages', older_than=30, dry_run=True, stdout=out)
+        self.assertIn('5 message(s)', out.getvalue())
+        self.assertEqual(ContactMessage.objects.count(), 6)
+        self.assertEqual(archive.read_index(), [])
+
+    def test_search_reads_only_overlapping_blocks(self):
+        self.archive()
+        result = archive.search('question 4')
+        self.assertEqual([row['name'] for row in result.rows], ['Old 4'])
+
+        old_1 = timezone.now() - timedelta(days=99)
+        result = archive.search(since=old_1 - timedelta(hours=1), until=old_1 + timedelta(hours=1))
+        self.assertEqual([row['name'] for row in result.rows], ['Old 1'])
+        self.assertEqual(result.blocks_read, 1)
+
+        result = archive.search(limit=3)
+        self.assertEqual([row['name'] for row in result.rows], ['Old 4', 'Old 3', 'Old 2'])
+        self.assertTrue(result.truncated)
+
+    def test_admin_searches_the_archive(self):
+        self.archive()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        url = reverse('admin:portfolio_contactmessage_archive')
+        response = self.client.get(url, {'q': 'old3@'})
+        self.assertContains(response, 'Question 3')
+        self.assertNotContains(response, 'Question 2')
+        self.assertContains(self.client.get(reverse('admin:portfolio_contactmessage_changelist')), url)
+
+
+class ContentSyncTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / 'content.json'
+        self.content = {
+            'profile': {'name': 'Test User', 'email': 'test@example.com', 'bio': 'Bio', 'phone': '1'},
+            'skills': [{'name': 'Python', 'percentage': 80, 'order': 1}, {'name': 'Excel', 'percentage': 70}],
+            'projects': [
+                {
+                    'slug': 'alpha', 'title': 'Alpha', 'category': 'Web', 'short_description': 'A',
+                    'description': 'About alpha', 'detailed_content': 'Overview:\nFirst', 'tech_stack': 'Django',
+                    'project_date': '2025', 'tags': ['Django', 'Python'],
+                },
+                {
+                    'slug': 'beta', 'title': 'Beta', 'category': 'Web', 'short_description': 'B',
+                    'description': 'About beta', 'detailed_content': 'Second', 'tech_stack': 'Django',
+                    'project_date': '2025', 'tags': ['Django'],
+                },
+            ],
+        }
+
+    def sync(self, **options):
+        self.path.write_text(json.dumps(self.content))
+        out = StringIO()
+        # Related-project updates run on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('my_details', str(self.path), stdout=out, **options)
+        return out.getvalue()
+
+    def test_unchanged_content_writes_nothing(self):
+        self.sync()
+        self.assertEqual(Project.objects.count(), 2)
+        self.assertEqual(ProjectTag.objects.count(), 3)
+        self.assertIn('fk-rich-heading', Project.objects.get(slug='alpha').detailed_content_html)
+        self.assertTrue(RelatedProject.objects.filter(project__slug='alpha', related__slug='beta').exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            out = self.sync()
+        self.assertIn('Already up to date', out)
+        self.assertFalse([q['sql'] for q in queries.captured_queries if not q['sql'].startswith('SELECT')])
+
+    def test_diff_keeps_rows_and_unmanaged_fields(self):
+        self.sync()
+        alpha = Project.objects.get(slug='alpha')
+        Project.objects.filter(pk=alpha.pk).update(thumbnail='projects/alpha.jpg')
+        version = get_content_state()
+
+        self.content['projects'][0].update(detailed_content='Results:\nShipped', tags=['Python', 'React'])
+        del self.content['projects'][1]
+        self.content['skills'] = [{'name': 'Python', 'percentage': 90, 'order': 1}]
+        del self.content['profile']
+        out = self.sync()
+        self.assertIn('~ projects: Alpha (detailed_content)', out)
+        self.assertIn('- projects: Beta', out)
+
+        updated = Project.objects.get(slug='alpha')
+        self.assertEqual(updated.pk, alpha.pk)
+        self.assertEqual(updated.thumbnail.name, 'projects/alpha.jpg')
+        self.assertIn('Shipped', updated.detailed_content_html)
+        self.assertGreater(updated.updated_at, alpha.updated_at)
+        self.assertEqual(sorted(updated.tags.values_list('name', flat=True)), ['Python', 'React'])
+        self.assertFalse(RelatedProject.objects.exists())
+        self.assertEqual(list(Skill.objects.values_list('name', 'percentage')), [('Python', 90)])
+        # A section left out of the file is not touched.
+        self.assertEqual(Profile.objects.count(), 1)
+        self.assertNotEqual(get_content_state(), version)
+
+    def test_invalid_content_changes_nothing(self):
+        self.sync()
+        self.content['skills'].append({'name': 'Python', 'percentage': 10})
+        with self.assertRaisesMessage(CommandError, 'listed twice'):
+            self.sync()
+        self.content['skills'].pop()
+        self.content['projects'][0]['category'] = 'Sports'
+        self.content['skills'][0]['percentage'] = 50
+        with self.assertRaisesMessage(CommandError, "'Sports' is not a valid choice"):
+            self.sync()
+        self.assertEqual(Skill.objects.get(name='Python').percentage, 80)
+
+    def test_dry_run_and_shipped_content(self):
+        self.assertIn('+ skills: Python', self.sync(dry_run=True))
+        self.assertFalse(Skill.objects.exists())
+
+        call_command('my_details', stdout=StringIO())
+        self.assertEqual(Profile.objects.count(), 1)
+        self.assertEqual(Project.objects.count(), 3)
+        self.assertEqual(
+            sorted(Project.objects.values_list('category', flat=True)), ['Accounting', 'Finance', 'Investment'],
+        )
+        out = StringIO()
+        call_command('my_details', stdout=out)
+        self.assertIn('Already up to date', out.getvalue())
@@ -1,7 +1,12 @@
 from django.urls import path
-from portfolio import views
+from portfolio import api, views
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('project/<slug:slug>/', views.portfolio_details, name='portfolio-details'),
-]
\ No newline at end of file
+    path('contact/', views.contact, name='contact'),
+    path('projects/cards/', views.project_cards, name='project-cards'),
+    path('api/v1/projects/', api.project_list, name='api-project-list'),
+    path('api/v1/projects/<slug:slug>/', api.project_detail, name='api-project-detail'),
+    path('api/v1/search/', api.project_search, name='api-search'),
+]
@@ -1,56 +1,96 @@
-from django.shortcuts import render, get_object_or_404, redirect
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, aget_object_or_404, redirect
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.http import JsonResponse
-import logging
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_http_methods, require_safe
 
 from .models import (
     Profile, Skill, Education, Certification, Interest,
     Project, CareerGoal
 )
+from . import ratelimit
 from .forms import ContactForm 
+from .api import PROJECT_ORDERING
+from .cache import cache_rendered_page, conditional_page, is_static_export
+from .outbox import queue_notification_emails
+from .pagination import InvalidCursor, keyset_page
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
-def home(request):
-    # Guard: if no profile exists render a minimal page
-    profile = Profile.objects.first()
 
-    # 1. Handle Form Submission
-    if request.method == 'POST':
-        form = ContactForm(request.POST)
-        if form.is_valid():
-            # Save to DB
-            contact_msg = form.save()
-            
-            # Send Emails (Logic separated for clarity)
-            send_notification_emails(contact_msg)
-            
-            messages.success(request, 'Your message has been sent successfully!')
-            
-            # Handle AJAX (if used by your frontend JS)
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'success': True, 'message': 'Message sent!'})
-            
-            return redirect('home')
-        else:
-            # Form is invalid
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'success': False, 'errors': form.errors})
-            messages.error(request, 'Please correct the errors below.')
-    else:
-        form = ContactForm()
+# Cards rendered per page of the home gallery / project_cards fragment.
+PROJECT_PAGE_SIZE = 6
+
+
+async def _list(queryset):
+    return [obj async for obj in queryset]
+
+
+def _featured_projects(category=None):
+    projects = Project.objects.filter(featured=True).prefetch_related('tags')
+    if category:
+        projects = projects.filter(category__iexact=category)
+    return projects
+
+
+@sync_to_async
+def _project_page(category=None, cursor=None):
+    return keyset_page(_featured_projects(category), PROJECT_ORDERING, cursor, PROJECT_PAGE_SIZE)
+
+
+@sync_to_async
+def _all_projects():
+    return list(_featured_projects().order_by(*PROJECT_ORDERING)), None
+
+
+@sync_to_async
+def _save_contact_message(form):
+    # Save to DB and queue the emails atomically; the send_outbox
+    # worker delivers them outside the request.
+    with transaction.atomic():
+        contact_msg = form.save()
+        queue_notification_emails(contact_msg)
+    return contact_msg
+
+
+def _is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+@require_safe
+@conditional_page
+@cache_rendered_page
+async def home(request):
+    # The contact form posts to ``contact``: nothing here reads or sets a
+    # cookie, so the page is the same for everyone and shared caches keep it.
+    # The independent queries are issued together.
+    static_export = is_static_export(request)
+    (
+        profile, skills, education, certifications, interests,
+        (projects, projects_next), project_count, career_goals,
+    ) = await asyncio.gather(
+        # Guard: if no profile exists render a minimal page
+        Profile.objects.afirst(),
+        _list(Skill.objects.all()),
+        _list(Education.objects.all()),
+        _list(Certification.objects.all()),
+        _list(Interest.objects.all()),
+        # Only the first page of the gallery; the rest comes from project_cards,
+        # which a static export does not have.
+        _all_projects() if static_export else _project_page(),
+        Project.objects.filter(featured=True).acount(),
+        _list(CareerGoal.objects.all()),
+    )
 
-    # 2. Get Data
-    skills = Skill.objects.all()
-    education = Education.objects.all()
-    certifications = Certification.objects.all()
-    interests = Interest.objects.all()
-    projects = Project.objects.filter(featured=True).prefetch_related('tags') 
-    career_goals = CareerGoal.objects.all()
-    
     context = {
         'profile': profile,
         'skills': skills,
@@ -58,46 +98,87 @@ def home(request):
         'certifications': certifications,
         'interests': interests,
         'projects': projects,
+        'projects_next': projects_next,
+        'static_export': static_export,
+        'project_count': project_count,
         'career_goals': career_goals,
-        'form': form, 
+        'form': ContactForm(),
     }
     
-    return render(request, 'index.html', context)
+    return await sync_to_async(render)(request, 'index.html', context)
+
 
-def portfolio_details(request, slug):
-    project = get_object_or_404(Project, slug=slug)
-    profile = Profile.objects.first()
-    related_projects = (
+@never_cache
+@require_http_methods(['GET', 'POST'])
+async def contact(request):
+    """The contact form: JSON for the page script, a plain page without it.
+
+    The only view that issues a CSRF token or flash messages, and the only
+    one rate limited (``portfolio.ratelimit``). A scripted GET
+    (``X-Requested-With``) returns ``{"csrfToken": ...}`` for the form on the
+    home page, which cannot carry one.
+    """
+    if request.method == 'POST':
+        # Shed floods before validating or writing anything.
+        rejected = await ratelimit.acheck_contact(request)
+        if rejected:
+            return rejected
+        form = ContactForm(request.POST)
+        if form.is_valid():
+            await _save_contact_message(form)
+            if _is_ajax(request):
+                return JsonResponse({'success': True, 'message': 'Message sent!'})
+            messages.success(request, 'Your message has been sent successfully!')
+            return redirect('contact')
+        if _is_ajax(request):
+            return JsonResponse({'success': False, 'errors': form.errors})
+        messages.error(request, 'Please correct the errors below.')
+    elif _is_ajax(request):
+        return JsonResponse({'csrfToken': get_token(request)})
+    else:
+        form = ContactForm()
+
+    profile = await Profile.objects.afirst()
+    return await sync_to_async(render)(request, 'contact.html', {'profile': profile, 'form': form})
+
+
+@conditional_page
+@cache_rendered_page
+async def portfolio_details(request, slug):
+    project, profile = await asyncio.gather(
+        aget_object_or_404(Project.objects.prefetch_related('images'), slug=slug),
+        Profile.objects.afirst(),
+    )
+    # Precomputed by portfolio.related: a key lookup on the neighbour table.
+    related_projects = await _list(
         Project.objects
-        .exclude(slug=slug)
-        .filter(category=project.category)
-        .prefetch_related('tags')[:3]
+        .filter(neighbour_of__project=project)
+        .order_by('neighbour_of__rank')
     )
+    # One tag query for the project and its related cards.
+    await sync_to_async(prefetch_related_objects)([project, *related_projects], 'tags')
     context = {
         'project': project,
         'profile': profile,
         'related_projects': related_projects,
     }
-    return render(request, 'portfolio-details.html', context)
+    return await sync_to_async(render)(request, 'portfolio-details.html', context)
+
 
-def send_notification_emails(instance):
-    """Helper function to handle email sending logic"""
+@conditional_page
+@cache_rendered_page(query=('category', 'cursor'))
+async def project_cards(request):
+    """One page of rendered gallery cards: ``{"html": ..., "next": cursor or null}``.
+
+    ``category`` is the filter button's class suffix (``ai``, ``web``, ...);
+    empty or ``*`` means every featured project.
+    """
+    category = request.GET.get('category', '').strip('*')
     try:
-        # Email to Admin
-        send_mail(
-            f'Portfolio Contact: {instance.subject}',
-            f"From: {instance.name}\nEmail: {instance.email}\n\n{instance.message}",
-            settings.DEFAULT_FROM_EMAIL,
-            [settings.CONTACT_EMAIL],
-            fail_silently=False,
-        )
-        # Email to User
-        send_mail(
-            f'Thank you for contacting me - {instance.subject}',
-            f"Hi {instance.name},\n\nI received your message. I'll get back to you shortly.",
-            settings.DEFAULT_FROM_EMAIL,
-            [instance.email],
-            fail_silently=True,
-        )
-    except Exception as e:
-        logger.error(f"Email sending failed: {e}")
\ No newline at end of file
+        projects, next_cursor = await _project_page(category, request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    html = await sync_to_async(render_to_string)(
+        'includes/project_grid_items.html', {'projects': projects}, request=request,
+    )
+    return JsonResponse({'html': html, 'next': next_cursor})
@@ -173,7 +173,9 @@
   }
 
   /* ============================================================
-     ISOTOPE — Portfolio filter
+     ISOTOPE — Portfolio filter + server-side paging
+     The page ships the first page of cards; the filter buttons and
+     the "load more" sentinel fetch further pages from project_cards.
      ============================================================ */
   const isotopeGrid = document.querySelector('.isotope-container');
   if (isotopeGrid && typeof Isotope !== 'undefined' && typeof imagesLoaded !== 'undefined') {
@@ -184,14 +186,76 @@
         percentPosition: true,
       });
 
+      const cardsUrl  = isotopeGrid.dataset.cardsUrl;
+      const loadMore  = document.querySelector('.fk-load-more');
+      let filter      = '*';
+      let category    = '';
+      let nextCursor  = isotopeGrid.dataset.next || '';
+      let loading     = null;   // AbortController of the fetch in flight
+      let generation  = 0;      // bumped by every filter click
+
+      function setNext(cursor) {
+        nextCursor = cursor || '';
+        if (loadMore) loadMore.classList.toggle('d-none', !nextCursor);
+      }
+
+      // Fetch one page of cards; replace the grid (new filter) or append.
+      // A new filter aborts whatever is in flight, and a response from an
+      // older filter is dropped, so pages of two categories never mix.
+      function fetchCards(replace) {
+        if (!cardsUrl) return Promise.resolve();
+        if (loading) {
+          if (!replace) return Promise.resolve();
+          loading.abort();
+        }
+        if (replace) generation += 1;
+        const current    = generation;
+        const controller = new AbortController();
+        loading = controller;
+        const params = new URLSearchParams({ category: category });
+        if (!replace && nextCursor) params.set('cursor', nextCursor);
+        return fetch(cardsUrl + '?' + params.toString(), {
+          headers: { 'Accept': 'application/json' },
+          signal: controller.signal,
+        })
+          .then(response => response.ok ? response.json() : Promise.reject(response.status))
+          .then(data => {
+            if (current !== generation) return;
+            const holder = document.createElement('div');
+            holder.innerHTML = data.html;
+            const items = Array.from(holder.children);
+            if (replace) iso.remove(iso.getItemElements());
+            items.forEach(item => isotopeGrid.appendChild(item));
+            iso.insert(items);
+            imagesLoaded(isotopeGrid, () => iso.layout());
+            setNext(data.next);
+            if (typeof AOS !== 'undefined') AOS.refresh();
+          })
+          .catch(() => {})
+          .finally(() => { if (loading === controller) loading = null; });
+      }
+
       document.querySelectorAll('.fk-filter-btn').forEach(btn => {
         btn.addEventListener('click', function () {
           document.querySelectorAll('.fk-filter-btn').forEach(b => b.classList.remove('active'));
           this.classList.add('active');
-          iso.arrange({ filter: this.dataset.filter });
-          if (typeof AOS !== 'undefined') AOS.refresh();
+          // ".filter-ai" → "ai"; "*" → every category
+          filter   = this.dataset.filter;
+          category = filter === '*' ? '' : filter.replace('.filter-', '');
+          iso.arrange({ filter: filter });
+          // An aborted fetch resolves too: arrange by whichever filter is current.
+          fetchCards(true).then(() => iso.arrange({ filter: filter }));
         });
       });
+
+      if (loadMore) {
+        loadMore.querySelector('button').addEventListener('click', () => fetchCards(false));
+        if ('IntersectionObserver' in window) {
+          new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting) && nextCursor) fetchCards(false);
+          }, { rootMargin: '400px' }).observe(loadMore);
+        }
+      }
     });
   }
 
@@ -203,17 +267,70 @@
   }
 
   /* ============================================================
-     CONTACT FORM — loading spinner on submit
+     CONTACT FORM — posted to the contact endpoint as JSON
+     The home page carries no CSRF token (it is cookie-free and
+     shared-cacheable), so one is fetched right before posting.
      ============================================================ */
   const contactForm = document.getElementById('contactForm');
-  if (contactForm) {
-    contactForm.addEventListener('submit', function () {
-      const btn      = this.querySelector('button[type="submit"]');
-      const txtSpan  = btn ? btn.querySelector('.fk-btn__text') : null;
-      const spinSpan = btn ? btn.querySelector('.fk-btn__spinner') : null;
+  if (contactForm && window.fetch) {
+    const ajaxHeaders = { 'X-Requested-With': 'XMLHttpRequest' };
+
+    function csrfToken() {
+      const field = contactForm.querySelector('[name="csrfmiddlewaretoken"]');
+      if (field) return Promise.resolve(field.value);
+      return fetch(contactForm.action, { headers: ajaxHeaders, credentials: 'same-origin' })
+        .then(response => response.ok ? response.json() : Promise.reject(response.status))
+        .then(data => data.csrfToken);
+    }
+
+    function showAlert(kind, text) {
+      contactForm.parentElement.querySelectorAll('.fk-alert').forEach(el => el.remove());
+      const alert = document.createElement('div');
+      alert.className = 'fk-alert fk-alert--' + kind;
+      alert.setAttribute('role', 'status');
+      alert.textContent = text;
+      contactForm.before(alert);
+    }
+
+    function showErrors(errors) {
+      Object.keys(errors).forEach(name => {
+        const input = contactForm.elements[name];
+        if (!input) return;
+        const error = document.createElement('div');
+        error.className = 'fk-form-error';
+        error.textContent = errors[name][0];
+        input.after(error);
+      });
+    }
+
+    contactForm.addEventListener('submit', function (e) {
+      e.preventDefault();
+      const btn = this.querySelector('button[type="submit"]');
       if (btn) btn.disabled = true;
-      if (txtSpan)  txtSpan.classList.add('d-none');
-      if (spinSpan) spinSpan.classList.remove('d-none');
+      contactForm.querySelectorAll('.fk-form-error').forEach(el => el.remove());
+
+      csrfToken()
+        .then(token => fetch(contactForm.action, {
+          method: 'POST',
+          body: new FormData(contactForm),
+          headers: Object.assign({ 'X-CSRFToken': token }, ajaxHeaders),
+          credentials: 'same-origin',
+        }))
+        // 429 (rate limited) also comes back as JSON, with its own message.
+        .then(response => response.ok || response.status === 429 ? response.json() : Promise.reject(response.status))
+        .then(data => {
+          if (data.success) {
+            contactForm.reset();
+            showAlert('success', data.message);
+          } else if (data.errors) {
+            showErrors(data.errors);
+            showAlert('error', 'Please correct the errors below.');
+          } else {
+            showAlert('error', data.error);
+          }
+        })
+        .catch(() => showAlert('error', 'Your message could not be sent. Please try again later.'))
+        .finally(() => { if (btn) btn.disabled = false; });
     });
   }
 